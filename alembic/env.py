@@ -11,7 +11,7 @@ from app.database import Base
 from app.core.config import settings
 
 # IMPORT EXPLICITE DE TOUS VOS MODÈLES
-from app.models.models import Signalement, User  # ← AJOUTEZ CETTE LIGNE
+from app.models.models import Signalement, SignalementDailyStats, User  # ← AJOUTEZ CETTE LIGNE
 
 config = context.config
 config.set_main_option("sqlalchemy.url", settings.database_url_formatted)
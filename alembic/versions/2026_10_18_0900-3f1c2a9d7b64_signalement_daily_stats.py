@@ -0,0 +1,44 @@
+"""signalement_daily_stats rollup
+
+Revision ID: 3f1c2a9d7b64
+Revises: 00b302a762c4
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a9d7b64'
+down_revision: Union[str, Sequence[str], None] = '00b302a762c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('signalement_daily_stats',
+    sa.Column('date_signalement', sa.Date(), nullable=False),
+    sa.Column('type_evenement', postgresql.ENUM('REUNION_QUARTIER', 'PUBLICATION_RESEAUX', 'RASSEMBLEMENT_PUBLIC', 'AUTRE', name='typeevenement', create_type=False), nullable=False),
+    sa.Column('gravite', postgresql.ENUM('FAIBLE', 'MOYENNE', 'ELEVEE', name='graviteevenement', create_type=False), nullable=False),
+    sa.Column('source_information', postgresql.ENUM('OBSERVATION_DIRECTE', 'INFORMATEUR', 'RESEAUX_SOCIAUX', 'AUTRE', name='sourceinformation', create_type=False), nullable=False),
+    sa.Column('nombre', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('date_signalement', 'type_evenement', 'gravite', 'source_information')
+    )
+    # Remplissage initial à partir des signalements existants
+    op.execute("""
+        INSERT INTO signalement_daily_stats
+            (date_signalement, type_evenement, gravite, source_information, nombre)
+        SELECT date_signalement, type_evenement, gravite, source_information, count(*)
+        FROM signalements
+        GROUP BY date_signalement, type_evenement, gravite, source_information
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('signalement_daily_stats')
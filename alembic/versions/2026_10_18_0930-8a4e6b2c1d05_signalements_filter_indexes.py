@@ -0,0 +1,74 @@
+"""signalements filter indexes
+
+Revision ID: 8a4e6b2c1d05
+Revises: 3f1c2a9d7b64
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a4e6b2c1d05'
+down_revision: Union[str, Sequence[str], None] = '3f1c2a9d7b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (nom, colonnes). Un seul index composite par colonne filtrée, suivi de
+# created_at DESC (ordre de la liste) : il sert aussi le filtre d'égalité
+# seul, y compris gravite = 'ELEVEE'.
+INDEXES = [
+    ('ix_signalements_created_at', ['created_at DESC']),
+    ('ix_signalements_id_agent_created_at', ['id_agent', 'created_at DESC']),
+    ('ix_signalements_date_created_at', ['date_signalement', 'created_at DESC']),
+    ('ix_signalements_type_created_at', ['type_evenement', 'created_at DESC']),
+    ('ix_signalements_gravite_created_at', ['gravite', 'created_at DESC']),
+    ('ix_signalements_source_created_at', ['source_information', 'created_at DESC']),
+]
+
+
+def _index_valide(conn, name: str) -> Optional[bool]:
+    """None si l'index n'existe pas, sinon pg_index.indisvalid"""
+    return conn.execute(sa.text(
+        "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :nom AND c.relnamespace = current_schema()::regnamespace"
+    ), {"nom": name}).scalar()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY ne peut pas s'exécuter dans une transaction :
+    # la table reste accessible en écriture pendant la construction.
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        for name, columns in INDEXES:
+            valide = _index_valide(conn, name)
+            if valide:
+                continue
+            if valide is False:
+                # Reste INVALID d'une construction CONCURRENTLY interrompue :
+                # IF NOT EXISTS le garderait, il faut le reconstruire
+                op.drop_index(name, table_name='signalements', postgresql_concurrently=True)
+            op.create_index(
+                name,
+                'signalements',
+                [sa.text(column) for column in columns],
+                unique=False,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name='signalements',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,71 @@
+"""signalements full-text and trigram search
+
+Revision ID: c7d2e91f4a38
+Revises: 8a4e6b2c1d05
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2e91f4a38'
+down_revision: Union[str, Sequence[str], None] = '8a4e6b2c1d05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # unaccent() n'est que STABLE : ce wrapper IMMUTABLE permet de l'utiliser
+    # dans une colonne générée et dans des index sur expression.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+    """)
+    op.execute("""
+        ALTER TABLE signalements ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            to_tsvector('french'::regconfig, f_unaccent(
+                coalesce(lieu, '') || ' ' || coalesce(commentaire_complementaire, '') || ' ' || coalesce(nom_agent, '')
+            ))
+        ) STORED
+    """)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_signalements_search_vector', 'signalements', ['search_vector'],
+            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_signalements_lieu_trgm', 'signalements', [sa.text('f_unaccent(lieu) gin_trgm_ops')],
+            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_signalements_nom_agent_trgm', 'signalements', [sa.text('f_unaccent(nom_agent) gin_trgm_ops')],
+            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_signalements_id_agent_trgm', 'signalements', [sa.text('id_agent gin_trgm_ops')],
+            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name in (
+            'ix_signalements_id_agent_trgm',
+            'ix_signalements_nom_agent_trgm',
+            'ix_signalements_lieu_trgm',
+            'ix_signalements_search_vector',
+        ):
+            op.drop_index(name, table_name='signalements', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('signalements', 'search_vector')
+    op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
@@ -0,0 +1,47 @@
+"""signalements keyset pagination index
+
+Revision ID: 5b9f0d3e7c21
+Revises: c7d2e91f4a38
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b9f0d3e7c21'
+down_revision: Union[str, Sequence[str], None] = 'c7d2e91f4a38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # La pagination keyset trie sur (created_at DESC, id DESC) : l'index
+    # doit couvrir les deux colonnes pour servir la comparaison de tuples.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_signalements_created_at_id', 'signalements',
+            [sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_signalements_created_at', table_name='signalements',
+            postgresql_concurrently=True, if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_signalements_created_at', 'signalements', [sa.text('created_at DESC')],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_signalements_created_at_id', table_name='signalements',
+            postgresql_concurrently=True, if_exists=True,
+        )
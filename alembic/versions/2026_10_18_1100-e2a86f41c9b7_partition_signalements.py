@@ -0,0 +1,193 @@
+"""partition signalements by month of date_signalement
+
+Revision ID: e2a86f41c9b7
+Revises: 5b9f0d3e7c21
+Create Date: 2026-10-18 11:00:00.000000
+
+Déplacement en ligne : la nouvelle table partitionnée est remplie par lots
+(une transaction par lot) pendant que l'API continue d'écrire dans
+l'ancienne. Un trigger installé avant la copie journalise l'id de chaque
+ligne insérée, modifiée ou supprimée ; la dernière étape — rejeu de ce
+journal, puis échange des noms de tables et d'index — se fait sous verrou
+exclusif, dans une transaction courte. Les index de production ne sont
+pas touchés avant cette étape.
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a86f41c9b7'
+down_revision: Union[str, Sequence[str], None] = '5b9f0d3e7c21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 50_000
+MONTHS_AHEAD = 3
+
+# Journal des modifications faites pendant la copie (capture par trigger)
+LOG_TABLE = 'signalements_migration_log'
+LOG_FUNCTION = 'signalements_migration_capture'
+LOG_TRIGGER = 'signalements_migration_capture'
+
+# Index de signalements (révisions précédentes), recréés sur la table partitionnée
+INDEXES = [
+    ('ix_signalements_id', '(id)'),
+    ('ix_signalements_created_at_id', '(created_at DESC, id DESC)'),
+    ('ix_signalements_id_agent_created_at', '(id_agent, created_at DESC)'),
+    ('ix_signalements_date_created_at', '(date_signalement, created_at DESC)'),
+    ('ix_signalements_type_created_at', '(type_evenement, created_at DESC)'),
+    ('ix_signalements_gravite_created_at', '(gravite, created_at DESC)'),
+    ('ix_signalements_source_created_at', '(source_information, created_at DESC)'),
+    ('ix_signalements_search_vector', 'USING gin (search_vector)'),
+    ('ix_signalements_lieu_trgm', 'USING gin (f_unaccent(lieu) gin_trgm_ops)'),
+    ('ix_signalements_nom_agent_trgm', 'USING gin (f_unaccent(nom_agent) gin_trgm_ops)'),
+    ('ix_signalements_id_agent_trgm', 'USING gin (id_agent gin_trgm_ops)'),
+]
+
+
+def _mois_suivant(jour: date) -> date:
+    return date(jour.year + (jour.month == 12), jour.month % 12 + 1, 1)
+
+
+def _creer_partitions(conn, table: str, debut: date, fin: date) -> None:
+    """Une partition mensuelle de `debut` jusqu'au mois de `fin` inclus, plus DEFAULT"""
+    mois = date(debut.year, debut.month, 1)
+    while mois <= fin:
+        suivant = _mois_suivant(mois)
+        conn.execute(sa.text(
+            f"CREATE TABLE IF NOT EXISTS signalements_p{mois:%Y_%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{mois.isoformat()}') TO ('{suivant.isoformat()}')"
+        ))
+        mois = suivant
+    conn.execute(sa.text(f"CREATE TABLE IF NOT EXISTS signalements_default PARTITION OF {table} DEFAULT"))
+
+
+def _colonnes(conn) -> str:
+    """Colonnes à copier (la colonne générée search_vector est recalculée)"""
+    noms = conn.execute(sa.text(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = 'signalements' AND is_generated = 'NEVER' "
+        "ORDER BY ordinal_position"
+    )).scalars().all()
+    return ", ".join(noms)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    colonnes = _colonnes(conn)
+
+    # 1. Table partitionnée vide, même structure (valeurs par défaut, séquence, colonne générée)
+    op.execute("""
+        CREATE TABLE signalements_part (
+            LIKE signalements INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING CONSTRAINTS
+        ) PARTITION BY RANGE (date_signalement)
+    """)
+    op.execute("ALTER TABLE signalements_part ADD PRIMARY KEY (id, date_signalement)")
+    bornes = conn.execute(sa.text("SELECT min(date_signalement), max(date_signalement) FROM signalements")).first()
+    aujourdhui = date.today()
+    fin = aujourdhui
+    for _ in range(MONTHS_AHEAD):
+        fin = _mois_suivant(fin)
+    _creer_partitions(
+        conn, 'signalements_part',
+        min(bornes[0] or aujourdhui, aujourdhui),
+        max(bornes[1] or fin, fin),
+    )
+
+    with op.get_context().autocommit_block():
+        # 2. Capture des modifications, validée avant la copie. CREATE TRIGGER
+        #    attend la fin des écritures en cours : toute écriture validée
+        #    après cette étape est journalisée, quel que soit son updated_at
+        conn.execute(sa.text(f"CREATE TABLE {LOG_TABLE} (seq bigserial PRIMARY KEY, id integer NOT NULL)"))
+        conn.execute(sa.text(f"""
+            CREATE FUNCTION {LOG_FUNCTION}() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    INSERT INTO {LOG_TABLE} (id) VALUES (OLD.id);
+                    RETURN OLD;
+                END IF;
+                INSERT INTO {LOG_TABLE} (id) VALUES (NEW.id);
+                IF TG_OP = 'UPDATE' AND NEW.id <> OLD.id THEN
+                    INSERT INTO {LOG_TABLE} (id) VALUES (OLD.id);
+                END IF;
+                RETURN NEW;
+            END
+            $$
+        """))
+        conn.execute(sa.text(
+            f"CREATE TRIGGER {LOG_TRIGGER} AFTER INSERT OR UPDATE OR DELETE ON signalements "
+            f"FOR EACH ROW EXECUTE FUNCTION {LOG_FUNCTION}()"
+        ))
+
+        try:
+            # 3. Copie par lots, une transaction par lot : l'ancienne table reste en service.
+            #    Une ligne modifiée ou validée après la copie de son lot est dans le journal
+            max_id = conn.execute(sa.text("SELECT coalesce(max(id), 0) FROM signalements")).scalar()
+            curseur = 0
+            while curseur < max_id:
+                conn.execute(sa.text(
+                    f"INSERT INTO signalements_part ({colonnes}) "
+                    f"SELECT {colonnes} FROM signalements WHERE id > :a AND id <= :b"
+                ), {"a": curseur, "b": curseur + BATCH_SIZE})
+                curseur += BATCH_SIZE
+
+            # 4. Index sous un nom provisoire : ceux de l'ancienne table restent en place
+            for nom, definition in INDEXES:
+                conn.execute(sa.text(f"CREATE INDEX {nom}_new ON signalements_part {definition}"))
+        except Exception:
+            # Échec : l'ancienne table est laissée telle qu'avant la migration
+            conn.execute(sa.text(f"DROP TRIGGER IF EXISTS {LOG_TRIGGER} ON signalements"))
+            conn.execute(sa.text(f"DROP FUNCTION IF EXISTS {LOG_FUNCTION}()"))
+            conn.execute(sa.text(f"DROP TABLE IF EXISTS {LOG_TABLE}"))
+            conn.execute(sa.text("DROP TABLE IF EXISTS signalements_part"))
+            raise
+
+    # 5. Rejeu du journal et échange, sous verrou exclusif (transaction de la migration) :
+    #    chaque id journalisé est recopié depuis l'ancienne table, ou supprimé s'il n'y est plus
+    op.execute("LOCK TABLE signalements IN ACCESS EXCLUSIVE MODE")
+    conn.execute(sa.text(
+        f"DELETE FROM signalements_part p USING (SELECT DISTINCT id FROM {LOG_TABLE}) j WHERE p.id = j.id"
+    ))
+    conn.execute(sa.text(
+        f"INSERT INTO signalements_part ({colonnes}) "
+        f"SELECT {colonnes} FROM signalements WHERE id IN (SELECT id FROM {LOG_TABLE})"
+    ))
+
+    op.execute("ALTER TABLE signalements RENAME TO signalements_old")
+    op.execute("ALTER TABLE signalements_part RENAME TO signalements")
+    op.execute("ALTER SEQUENCE signalements_id_seq OWNED BY signalements.id")
+    # Supprime aussi le trigger et les index de l'ancienne table, dont les noms se libèrent
+    op.execute("DROP TABLE signalements_old")
+    op.execute(f"DROP FUNCTION {LOG_FUNCTION}()")
+    op.execute(f"DROP TABLE {LOG_TABLE}")
+    for nom, _ in INDEXES:
+        op.execute(f"ALTER INDEX {nom}_new RENAME TO {nom}")
+    op.execute("ALTER TABLE signalements RENAME CONSTRAINT signalements_part_pkey TO signalements_pkey")
+    op.execute("ANALYZE signalements")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    conn = op.get_bind()
+    colonnes = _colonnes(conn)
+
+    op.execute("LOCK TABLE signalements IN ACCESS EXCLUSIVE MODE")
+    op.execute("""
+        CREATE TABLE signalements_plain (
+            LIKE signalements INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING CONSTRAINTS
+        )
+    """)
+    op.execute(f"INSERT INTO signalements_plain ({colonnes}) SELECT {colonnes} FROM signalements")
+    op.execute("ALTER SEQUENCE signalements_id_seq OWNED BY signalements_plain.id")
+    op.execute("DROP TABLE signalements CASCADE")
+    op.execute("ALTER TABLE signalements_plain RENAME TO signalements")
+    op.execute("ALTER TABLE signalements ADD CONSTRAINT signalements_pkey PRIMARY KEY (id)")
+    for nom, definition in INDEXES:
+        op.execute(f"CREATE INDEX {nom} ON signalements {definition}")
@@ -0,0 +1,123 @@
+"""gazetteer and geocoded location of signalements
+
+Revision ID: 9d3b7f1e6a52
+Revises: e2a86f41c9b7
+Create Date: 2026-10-18 11:30:00.000000
+
+Table gazetteer (lieux de Djibouti, coordonnées approximatives du centre
+de chaque lieu) et colonnes latitude / longitude / geohash, NULL tant que
+le signalement n'est pas géocodé. L'index sur geohash est créé sur chaque
+partition avec CONCURRENTLY puis rattaché à l'index de la table
+partitionnée, sans bloquer les écritures.
+
+Les signalements existants sont géocodés ensuite par
+`python geocode_signalements.py`.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3b7f1e6a52'
+down_revision: Union[str, Sequence[str], None] = 'e2a86f41c9b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX = 'ix_signalements_geohash'
+DEFINITION = '(geohash varchar_pattern_ops) WHERE geohash IS NOT NULL'
+
+# (clé normalisée, nom, région, latitude, longitude)
+LIEUX = [
+    ('djibouti', 'Djibouti', 'Djibouti', 11.5886, 43.1450),
+    ('djibouti ville', 'Djibouti', 'Djibouti', 11.5886, 43.1450),
+    ('balbala', 'Balbala', 'Djibouti', 11.5570, 43.1080),
+    ('boulaos', 'Boulaos', 'Djibouti', 11.5750, 43.1500),
+    ('ras dika', 'Ras Dika', 'Djibouti', 11.5960, 43.1420),
+    ('quartier 1', 'Quartier 1', 'Djibouti', 11.5900, 43.1430),
+    ('quartier 2', 'Quartier 2', 'Djibouti', 11.5880, 43.1440),
+    ('quartier 3', 'Quartier 3', 'Djibouti', 11.5860, 43.1450),
+    ('quartier 4', 'Quartier 4', 'Djibouti', 11.5840, 43.1440),
+    ('quartier 5', 'Quartier 5', 'Djibouti', 11.5820, 43.1430),
+    ('quartier 6', 'Quartier 6', 'Djibouti', 11.5800, 43.1450),
+    ('quartier 7', 'Quartier 7', 'Djibouti', 11.5790, 43.1440),
+    ('hayableh', 'Hayableh', 'Djibouti', 11.5560, 43.1250),
+    ('arhiba', 'Arhiba', 'Djibouti', 11.5800, 43.1590),
+    ('gabode', 'Gabode', 'Djibouti', 11.5700, 43.1500),
+    ('heron', 'Héron', 'Djibouti', 11.6000, 43.1360),
+    ('plateau du serpent', 'Plateau du Serpent', 'Djibouti', 11.5980, 43.1380),
+    ('haramous', 'Haramous', 'Djibouti', 11.5790, 43.1750),
+    ('pk12', 'PK12', 'Djibouti', 11.5350, 43.0770),
+    ('pk 12', 'PK12', 'Djibouti', 11.5350, 43.0770),
+    ('doraleh', 'Doraleh', 'Arta', 11.5960, 43.0760),
+    ('damerjog', 'Damerjog', 'Djibouti', 11.5140, 43.2030),
+    ('loyada', 'Loyada', 'Djibouti', 11.4640, 43.2520),
+    ('arta', 'Arta', 'Arta', 11.5260, 42.8490),
+    ('ali sabieh', 'Ali Sabieh', 'Ali Sabieh', 11.1558, 42.7125),
+    ('ali addeh', 'Ali Addeh', 'Ali Sabieh', 11.1250, 42.8990),
+    ('holhol', 'Holhol', 'Ali Sabieh', 11.3100, 42.9290),
+    ('dikhil', 'Dikhil', 'Dikhil', 11.1045, 42.3697),
+    ('as eyla', 'As Eyla', 'Dikhil', 11.0050, 42.0870),
+    ('yoboki', 'Yoboki', 'Dikhil', 11.5120, 42.0950),
+    ('tadjourah', 'Tadjourah', 'Tadjourah', 11.7850, 42.8840),
+    ('tadjoura', 'Tadjourah', 'Tadjourah', 11.7850, 42.8840),
+    ('randa', 'Randa', 'Tadjourah', 11.8640, 42.6650),
+    ('dorra', 'Dorra', 'Tadjourah', 12.1500, 42.4800),
+    ('lac assal', 'Lac Assal', 'Tadjourah', 11.6580, 42.4190),
+    ('obock', 'Obock', 'Obock', 11.9630, 43.2890),
+    ('khor angar', 'Khor Angar', 'Obock', 12.3870, 43.3480),
+]
+
+
+def _partitions(conn):
+    return conn.execute(sa.text(
+        "SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = 'signalements'::regclass"
+    )).scalars().all()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    gazetteer = op.create_table(
+        'gazetteer',
+        sa.Column('cle', sa.String(length=200), nullable=False),
+        sa.Column('nom', sa.String(length=200), nullable=False),
+        sa.Column('region', sa.String(length=100), nullable=True),
+        sa.Column('latitude', sa.Float(), nullable=False),
+        sa.Column('longitude', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('cle'),
+    )
+    op.bulk_insert(gazetteer, [
+        {'cle': cle, 'nom': nom, 'region': region, 'latitude': latitude, 'longitude': longitude}
+        for cle, nom, region, latitude, longitude in LIEUX
+    ])
+
+    # Colonnes NULL sans défaut : modification du catalogue seulement
+    op.add_column('signalements', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('signalements', sa.Column('longitude', sa.Float(), nullable=True))
+    op.add_column('signalements', sa.Column('geohash', sa.String(length=12), nullable=True))
+
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        partitions = _partitions(conn)
+        if not partitions:
+            conn.execute(sa.text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX} ON signalements {DEFINITION}"))
+            return
+        # Index de la table partitionnée, invalide tant que toutes les partitions ne sont pas rattachées
+        conn.execute(sa.text(f"CREATE INDEX IF NOT EXISTS {INDEX} ON ONLY signalements {DEFINITION}"))
+        for partition in partitions:
+            conn.execute(sa.text(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_geohash_idx ON {partition} {DEFINITION}"
+            ))
+            conn.execute(sa.text(f"ALTER INDEX {INDEX} ATTACH PARTITION {partition}_geohash_idx"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(f"DROP INDEX IF EXISTS {INDEX}")
+    op.drop_column('signalements', 'geohash')
+    op.drop_column('signalements', 'longitude')
+    op.drop_column('signalements', 'latitude')
+    op.drop_table('gazetteer')
@@ -0,0 +1,58 @@
+"""server defaults and backfill of signalements created_at / updated_at
+
+Revision ID: 6c0e3a9f5d17
+Revises: b41e8c7a2f93
+Create Date: 2026-10-18 12:30:00.000000
+
+created_at et updated_at n'avaient qu'un défaut côté ORM : les lignes
+insérées hors ORM (SQL brut, COPY) restaient à NULL, ce qui cassait l'ETag
+(etag_for) et le curseur de pagination (encode_cursor). Ajoute DEFAULT now()
+aux deux colonnes et complète les lignes existantes par lots, hors
+transaction, sans verrou prolongé.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c0e3a9f5d17'
+down_revision: Union[str, Sequence[str], None] = 'b41e8c7a2f93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 10000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Modification du catalogue seulement : les lignes existantes ne sont pas réécrites
+    op.alter_column('signalements', 'created_at', server_default=sa.text('now()'))
+    op.alter_column('signalements', 'updated_at', server_default=sa.text('now()'))
+
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        while True:
+            modifiees = conn.execute(sa.text(
+                """
+                UPDATE signalements SET
+                    created_at = coalesce(created_at, updated_at, now()),
+                    updated_at = coalesce(updated_at, created_at, now())
+                WHERE id IN (
+                    SELECT id FROM signalements
+                    WHERE created_at IS NULL OR updated_at IS NULL
+                    LIMIT :lot
+                )
+                """
+            ), {"lot": BATCH_SIZE}).rowcount
+            if modifiees < BATCH_SIZE:
+                break
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('signalements', 'updated_at', server_default=None)
+    op.alter_column('signalements', 'created_at', server_default=None)
@@ -1,8 +1,20 @@
 from fastapi import APIRouter
 from app.api.v1.endpoints import auth, router
+from app.core.config import settings
 
 api_router = APIRouter()
 
+# Pile asynchrone : ses routes sont enregistrées en premier et prennent le pas
+# sur leurs équivalents synchrones ; les autres routes restent servies par router
+if settings.database_async:
+    from app.api.v1.endpoints import router_async
+
+    api_router.include_router(
+        router_async.router,
+        prefix="/signalements",
+        tags=["signalements"]
+    )
+
 # Inclure les routes des signalements
 api_router.include_router(
     router,
@@ -3,18 +3,28 @@
 # =====================================
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from typing import Optional
 import jwt
-import bcrypt  # ← REMPLACE passlib par bcrypt direct
+import logging
 
-from app.database import get_db
+from app.database import get_async_db, get_db
 from app.core.config import settings
+from app.core.security import (  # bcrypt direct, exécuté hors boucle d'événements
+    PasswordPoolSaturated,
+    needs_rehash,
+    password_pool,
+    verify_password,
+)
+from app.core.token_cache import principal_cache
 from app.models.models import User  
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # Configuration - UTILISE VOS SETTINGS
 SECRET_KEY = settings.secret_key
@@ -24,29 +34,15 @@ ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
 # OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Vérifie un mot de passe avec bcrypt (comme votre script)"""
-    try:
-        password_bytes = plain_password.encode('utf-8')
-        hashed_bytes = hashed_password.encode('utf-8')
-        return bcrypt.checkpw(password_bytes, hashed_bytes)
-    except Exception as e:
-        print(f"Erreur de vérification: {e}")
-        return False
-
-
-def get_password_hash(password: str) -> str:
-    """Hash un mot de passe avec bcrypt (comme votre script)"""
-    password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    return hashed.decode('utf-8')
+# Session utilisée par les endpoints async : AsyncSession si DATABASE_ASYNC=true,
+# sinon Session synchrone dont les appels sont déportés dans le threadpool
+db_dependency = get_async_db if settings.database_async else get_db
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Crée un token JWT"""
     to_encode = data.copy()
+    to_encode["iat"] = datetime.utcnow()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
@@ -73,15 +69,66 @@ def authenticate_user(db: Session, username: str, password: str):
     return user
 
 
+async def fetch_user_by_username(db, username: str):
+    """Récupère un utilisateur sans bloquer la boucle d'événements"""
+    if settings.database_async:
+        result = await db.execute(select(User).filter(User.username == username))
+        return result.scalars().first()
+    return await run_in_threadpool(get_user_by_username, db, username)
+
+
+def _save_password_hash(db: Session, user: User, hashed_password: str) -> None:
+    user.hashed_password = hashed_password
+    db.commit()
+
+
+async def authenticate_user_async(db, username: str, password: str):
+    """
+    Authentifie un utilisateur depuis un endpoint async.
+
+    bcrypt s'exécute dans le pool borné password_pool (PasswordPoolSaturated
+    si la file est pleine). Un hash au coût obsolète est recalculé et
+    enregistré de façon transparente après une connexion réussie ; si le
+    pool est saturé, le recalcul est remis à une connexion ultérieure.
+    """
+    user = await fetch_user_by_username(db, username)
+    if not user:
+        return False
+    if not user.is_active:
+        return False
+    if not await password_pool.verify(password, user.hashed_password):
+        return False
+
+    if needs_rehash(user.hashed_password):
+        try:
+            nouveau_hash = await password_pool.hash(password)
+        except PasswordPoolSaturated:
+            logger.info("Pool bcrypt saturé, recalcul du hash de %s reporté", user.username)
+            return user
+        if settings.database_async:
+            user.hashed_password = nouveau_hash
+            await db.commit()
+        else:
+            await run_in_threadpool(_save_password_hash, db, user, nouveau_hash)
+    return user
+
+
 @router.post("/login")
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db=Depends(db_dependency)
 ):
     """
     Endpoint de connexion
     """
-    user = authenticate_user(db, form_data.username, form_data.password)
+    try:
+        user = await authenticate_user_async(db, form_data.username, form_data.password)
+    except PasswordPoolSaturated:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Trop de connexions simultanées, réessayez dans un instant",
+            headers={"Retry-After": "1"},
+        )
     
     if not user:
         raise HTTPException(
@@ -113,9 +160,15 @@ async def login(
 @router.get("/me")
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db=Depends(db_dependency)
 ):
-    """Récupère l'utilisateur actuellement connecté"""
+    """
+    Récupère l'utilisateur actuellement connecté.
+
+    La signature et l'expiration du JWT sont vérifiées à chaque appel ;
+    l'utilisateur correspondant est servi depuis principal_cache tant qu'il
+    n'a pas été modifié (désactivation, rôle), sans requête en base.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Token invalide ou expiré",
@@ -129,17 +182,24 @@ async def get_current_user(
             raise credentials_exception
     except jwt.PyJWTError:
         raise credentials_exception
+
+    cle = (username, payload["iat"]) if "iat" in payload else token
+    principal = principal_cache.get(cle)
+    if principal is not None:
+        return principal
     
-    user = get_user_by_username(db, username=username)
-    if user is None:
+    user = await fetch_user_by_username(db, username=username)
+    if user is None or not user.is_active:
         raise credentials_exception
     
-    return {
+    principal = {
         "id": user.id,
         "username": user.username,
         "role": user.role,
         "is_active": user.is_active
     }
+    principal_cache.set(cle, principal, token_exp=payload.get("exp"))
+    return principal
 
 
 @router.get("/health")
@@ -147,5 +207,7 @@ def auth_health():
     """Vérifier que le module d'auth fonctionne"""
     return {
         "status": "healthy",
-        "message": "Module d'authentification opérationnel"
+        "message": "Module d'authentification opérationnel",
+        "password_pool": password_pool.stats(),
+        "token_cache": principal_cache.stats()
     }
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+Paramètres et en-têtes communs aux routes des signalements, partagés par
+router.py et sa variante asynchrone router_async.py : les deux piles
+acceptent les mêmes requêtes et renvoient les mêmes en-têtes.
+"""
+
+from datetime import date, datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Query
+
+from app.services.crud import decode_cursor, encode_cursor, parse_etag, timeseries_range
+
+STALE_DETAIL = "Le signalement a été modifié entre-temps, rechargez-le avant de le modifier"
+
+
+def signalement_filters(
+    type_evenement: Optional[str] = Query(None, description="Filtrer par type"),
+    gravite: Optional[str] = Query(None, description="Filtrer par gravité"),
+    nom_agent: Optional[str] = Query(None, description="Filtrer par nom d'agent"),
+    source_information: Optional[str] = Query(None, description="Filtrer par source"),
+    date_debut: Optional[date] = Query(None, description="Date de début (YYYY-MM-DD)"),
+    date_fin: Optional[date] = Query(None, description="Date de fin (YYYY-MM-DD)"),
+) -> dict:
+    """Dépendance : filtres de la liste, à passer tels quels au CRUD (**filtres)"""
+    return dict(
+        type_evenement=type_evenement,
+        gravite=gravite,
+        nom_agent=nom_agent,
+        source_information=source_information,
+        date_debut=date_debut,
+        date_fin=date_fin
+    )
+
+
+def cursor_position(skip: int, cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """Position décodée du curseur de pagination (400 si invalide ou combiné à skip)"""
+    if cursor and skip:
+        raise HTTPException(status_code=400, detail="skip et cursor sont incompatibles")
+    try:
+        return decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def list_headers(signalements: list, limit: int, total: bool, nombre: int) -> dict:
+    """En-têtes de la liste : X-Total-Count ou X-Total-Count-Estimate, et X-Next-Cursor si la page est pleine"""
+    headers = {"X-Total-Count" if total else "X-Total-Count-Estimate": str(nombre)}
+    if len(signalements) == limit:
+        headers["X-Next-Cursor"] = encode_cursor(signalements[-1])
+    return headers
+
+
+def timeseries_bounds(
+    bucket: str, from_: Optional[datetime], to: Optional[datetime], group_by: Optional[str]
+) -> Tuple[datetime, datetime]:
+    """Bornes de la série temporelle (400 si la plage est invalide ou trop longue)"""
+    try:
+        return timeseries_range(bucket, from_, to, group_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def if_match_version(if_match: Optional[str], signalement_id: int) -> Optional[datetime]:
+    """Version (updated_at) attendue d'après l'en-tête If-Match, ou None s'il est absent"""
+    if not if_match or if_match.strip() == "*":
+        return None
+    # If-Match impose la comparaison forte : un ETag faible ne correspond jamais
+    if if_match.strip().startswith("W/"):
+        raise HTTPException(status_code=412, detail="If-Match exige un ETag fort")
+    try:
+        etag_id, updated_at = parse_etag(if_match)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if etag_id != signalement_id:
+        raise HTTPException(status_code=412, detail="L'ETag ne correspond pas à ce signalement")
+    return updated_at
@@ -1,71 +1,230 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from datetime import date
+from datetime import datetime
+import json
 
-from app.schemas import SignalementCreate, SignalementResponse, SignalementUpdate
-from app.services.crud import crud_signalement
-from app.database import get_db
+from app.core.config import settings
+from app.core.live_feed import live_feed, sse_events
+from app.core.profiling import ProfiledRoute
+from app.schemas import BulkResponse, SignalementCreate, SignalementResponse, SignalementUpdate
+from app.services.crud import (
+    StaleSignalementError,
+    crud_signalement,
+    etag_for,
+)
+from app.services.geo import cluster_precision
+from app.services.serialization import RowsResponse
+from app.services.export import EXPORT_FORMATS, STREAMERS, iter_batches, parquet_available
+from app.database import get_db, get_read_db, get_write_db, open_read_session
+from app.api.v1.endpoints.params import (
+    STALE_DETAIL,
+    cursor_position,
+    if_match_version,
+    list_headers,
+    signalement_filters,
+    timeseries_bounds,
+)
 
-router = APIRouter()
+# ?profile=1 (admin) et échantillonnage des requêtes : voir ProfiledRoute
+router = APIRouter(route_class=ProfiledRoute)
 
 @router.post("/", response_model=SignalementResponse, status_code=201)
 def create_signalement(
     signalement: SignalementCreate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_write_db)
 ):
     """Créer un nouveau signalement"""
     return crud_signalement.create_signalement(db=db, signalement=signalement)
 
+class _LigneInvalide:
+    """Ligne NDJSON qui n'est pas du JSON : signalée comme élément invalide"""
+
+    def __init__(self, erreur: json.JSONDecodeError):
+        self.erreur = erreur
+
+def _decoder_ligne(ligne: bytes):
+    try:
+        return json.loads(ligne)
+    except json.JSONDecodeError as e:
+        return _LigneInvalide(e)
+
+def _create_bulk(db: Session, items: list) -> dict:
+    """Valide tous les éléments en une passe puis insère les valides en un lot"""
+    valides, resultats = [], []
+    for index, item in enumerate(items):
+        if isinstance(item, _LigneInvalide):
+            resultats.append({
+                "index": index,
+                "status": "invalid",
+                "errors": [{"loc": [], "msg": f"JSON invalide : {item.erreur}", "type": "json_invalid"}]
+            })
+            continue
+        try:
+            valides.append((index, SignalementCreate.model_validate(item)))
+            resultats.append({"index": index, "status": "created"})
+        except ValidationError as e:
+            resultats.append({
+                "index": index,
+                "status": "invalid",
+                "errors": [
+                    {"loc": list(err["loc"]), "msg": err["msg"], "type": err["type"]}
+                    for err in e.errors()
+                ]
+            })
+
+    ids = crud_signalement.create_signalements_bulk(db, [signalement for _, signalement in valides])
+    for (index, _), signalement_id in zip(valides, ids):
+        resultats[index]["id"] = signalement_id
+
+    return {"created": len(valides), "invalid": len(items) - len(valides), "results": resultats}
+
+@router.post("/bulk", response_model=BulkResponse, response_model_exclude_none=True)
+async def create_signalements_bulk(
+    request: Request,
+    db: Session = Depends(get_write_db)
+):
+    """
+    Créer des signalements en lot (synchronisation des rapports hors ligne).
+
+    Corps : tableau JSON d'objets SignalementCreate, ou flux NDJSON (un objet
+    par ligne, Content-Type application/x-ndjson). Les éléments valides sont
+    insérés en une seule transaction ; chaque élément reçoit son id ou ses
+    erreurs de validation, dans l'ordre d'envoi. Une ligne NDJSON illisible
+    est un élément invalide. Corps limité à BULK_MAX_BYTES (413).
+    """
+    limite = settings.bulk_max_items
+    trop_grand = HTTPException(status_code=413, detail=f"Au plus {limite} signalements par lot")
+    trop_lourd = HTTPException(status_code=413, detail=f"Corps limité à {settings.bulk_max_bytes} octets")
+
+    try:
+        if int(request.headers.get("content-length") or 0) > settings.bulk_max_bytes:
+            raise trop_lourd
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Content-Length invalide")
+
+    async def flux():
+        # Le Content-Length peut être absent (chunked) : on compte les octets reçus
+        recus = 0
+        async for bloc in request.stream():
+            recus += len(bloc)
+            if recus > settings.bulk_max_bytes:
+                raise trop_lourd
+            yield bloc
+
+    try:
+        if "ndjson" in request.headers.get("content-type", ""):
+            items, reste = [], b""
+            async for bloc in flux():
+                *lignes, reste = (reste + bloc).split(b"\n")
+                items.extend(_decoder_ligne(ligne) for ligne in lignes if ligne.strip())
+                if len(items) > limite:
+                    raise trop_grand
+            if reste.strip():
+                items.append(_decoder_ligne(reste))
+        else:
+            items = json.loads(b"".join([bloc async for bloc in flux()]))
+            if not isinstance(items, list):
+                raise HTTPException(status_code=400, detail="Un tableau JSON est attendu")
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"JSON invalide : {e}")
+
+    if len(items) > limite:
+        raise trop_grand
+
+    return await run_in_threadpool(_create_bulk, db, items)
+
 @router.get("/", response_model=List[SignalementResponse])
 def list_signalements(
     skip: int = Query(0, ge=0, description="Nombre d'éléments à sauter"),
     limit: int = Query(100, ge=1, le=500, description="Nombre max d'éléments"),
-    type_evenement: Optional[str] = Query(None, description="Filtrer par type"),
-    gravite: Optional[str] = Query(None, description="Filtrer par gravité"),
-    nom_agent: Optional[str] = Query(None, description="Filtrer par nom d'agent"),
-    source_information: Optional[str] = Query(None, description="Filtrer par source"),
-    date_debut: Optional[date] = Query(None, description="Date de début (YYYY-MM-DD)"),
-    date_fin: Optional[date] = Query(None, description="Date de fin (YYYY-MM-DD)"),
-    db: Session = Depends(get_db)
+    filtres: dict = Depends(signalement_filters),
+    cursor: Optional[str] = Query(None, description="Curseur X-Next-Cursor de la page précédente"),
+    total: bool = Query(False, description="Calculer le nombre total exact (X-Total-Count)"),
+    db: Session = Depends(get_read_db)
 ):
     """
     Liste tous les signalements avec pagination et filtres optionnels.
     
-    Retourne également le nombre total dans les headers.
+    Pagination par `skip` (OFFSET) ou par `cursor` : chaque réponse pleine
+    renvoie l'en-tête X-Next-Cursor à repasser pour obtenir la page suivante,
+    à coût constant quelle que soit la profondeur.
+
+    Le total exact est renvoyé dans X-Total-Count si `total=true`, sinon une
+    estimation du planificateur est renvoyée dans X-Total-Count-Estimate.
     """
-    # Compter le total
-    total = crud_signalement.count_signalements(
-        db=db,
-        type_evenement=type_evenement,
-        gravite=gravite,
-        nom_agent=nom_agent,
-        source_information=source_information,
-        date_debut=date_debut,
-        date_fin=date_fin
-    )
-    
+    position = cursor_position(skip, cursor)
+
     # Récupérer les signalements
     signalements = crud_signalement.get_signalements(
         db=db,
         skip=skip,
         limit=limit,
-        type_evenement=type_evenement,
-        gravite=gravite,
-        nom_agent=nom_agent,
-        source_information=source_information,
-        date_debut=date_debut,
-        date_fin=date_fin
+        cursor=position,
+        as_rows=True,
+        **filtres
     )
+
+    if total:
+        nombre = crud_signalement.count_signalements(db=db, **filtres)
+    else:
+        nombre = crud_signalement.estimate_signalements(db=db, **filtres)
+    headers = list_headers(signalements, limit, total, nombre)
     
-    # Note: Pour retourner le total dans un header, vous pouvez utiliser Response
-    # from fastapi import Response
-    # response.headers["X-Total-Count"] = str(total)
-    
-    return signalements
+    # Lignes encodées directement (orjson) : ni objets ORM ni revalidation Pydantic
+    return RowsResponse(signalements, headers=headers)
+
+@router.get("/export")
+def export_signalements(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$", description="csv, ndjson ou parquet"),
+    filtres: dict = Depends(signalement_filters),
+):
+    """
+    Export complet des signalements filtrés, en flux.
+
+    Mêmes filtres que la liste, sans pagination : les lignes sont lues par
+    lots depuis un curseur serveur et envoyées au fil de l'eau, la mémoire
+    utilisée reste constante quelle que soit la taille de l'export. La
+    lecture se fait sur un réplica si possible.
+    """
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Export Parquet indisponible (pyarrow non installé)")
+
+    media_type, extension = EXPORT_FORMATS[format]
+    batches = iter_batches(
+        session_factory=lambda: open_read_session(request),
+        **filtres
+    )
+    return StreamingResponse(
+        STREAMERS[format](batches),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="signalements.{extension}"'}
+    )
+
+@router.get("/stream")
+async def stream_signalements(request: Request):
+    """
+    Flux temps réel (Server-Sent Events) des créations, modifications et
+    suppressions de signalements, avec les deltas des statistiques.
+
+    Alimenté par PostgreSQL LISTEN/NOTIFY : une seule connexion d'écoute par
+    worker, quel que soit le nombre de clients connectés.
+    """
+    if not settings.live_feed:
+        raise HTTPException(status_code=503, detail="Flux temps réel désactivé (LIVE_FEED=false)")
+    queue = live_feed.subscribe()
+    return StreamingResponse(
+        sse_events(queue, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/statistiques")
-def get_statistiques(db: Session = Depends(get_db)):
+def get_statistiques(db: Session = Depends(get_read_db)):
     """
     Statistiques complètes des signalements.
     
@@ -74,67 +233,202 @@ def get_statistiques(db: Session = Depends(get_db)):
     """
     return crud_signalement.get_signalements_stats(db=db)
 
-@router.get("/recent")
+@router.get("/timeseries")
+def get_timeseries(
+    bucket: str = Query("day", pattern="^(hour|day|week)$", description="Intervalle : hour, day ou week"),
+    from_: Optional[datetime] = Query(None, alias="from", description="Début (défaut : selon l'intervalle)"),
+    to: Optional[datetime] = Query(None, description="Fin (défaut : maintenant)"),
+    group_by: Optional[str] = Query(
+        None, pattern="^(gravite|type_evenement|source_information)$", description="Une série par valeur"
+    ),
+    filtres: dict = Depends(signalement_filters),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Nombre de signalements par heure, jour ou semaine, pour les graphiques
+    de tendance. Mêmes filtres que la liste.
+
+    Réponse en colonnes : `timestamps` (début de chaque intervalle), `total`
+    et, avec `group_by`, `series` (un tableau par valeur). Les intervalles
+    sans signalement valent 0.
+    """
+    debut, fin = timeseries_bounds(bucket, from_, to, group_by)
+    return crud_signalement.get_timeseries(
+        db=db,
+        bucket=bucket,
+        debut=debut,
+        fin=fin,
+        group_by=group_by,
+        **filtres
+    )
+
+@router.get("/geo/bbox")
+def get_map_points(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    limit: int = Query(5000, ge=1, le=20000, description="Nombre max de points"),
+    filtres: dict = Depends(signalement_filters),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Signalements géocodés dans une boîte (carte), les plus récents d'abord.
+
+    Au-delà de quelques milliers de points, utiliser /geo/clusters.
+    """
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=400, detail="Boîte invalide (min > max)")
+    return RowsResponse(crud_signalement.get_map_points(
+        db=db, min_lat=min_lat, min_lon=min_lon, max_lat=max_lat, max_lon=max_lon, limit=limit, **filtres
+    ))
+
+@router.get("/geo/near")
+def get_nearby_signalements(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_m: float = Query(1000, gt=0, le=100_000, description="Rayon en mètres"),
+    limit: int = Query(500, ge=1, le=5000, description="Nombre max de points"),
+    filtres: dict = Depends(signalement_filters),
+    db: Session = Depends(get_read_db)
+):
+    """Signalements à moins de `radius_m` mètres d'un point, du plus proche au plus lointain"""
+    return RowsResponse(crud_signalement.get_nearby(
+        db=db, latitude=lat, longitude=lon, rayon_m=radius_m, limit=limit, **filtres
+    ))
+
+@router.get("/geo/clusters")
+def get_map_clusters(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    precision: Optional[int] = Query(None, ge=1, le=9, description="Longueur de geohash (défaut : selon la boîte)"),
+    filtres: dict = Depends(signalement_filters),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Regroupement des signalements de la boîte par cellule de geohash,
+    calculé en base : la carte affiche quelques centaines de groupes au
+    lieu de dizaines de milliers de points.
+
+    Réponse en colonnes : `geohash`, `count`, `lat` / `lon` (barycentre)
+    et `elevee` (signalements de gravité élevée) ; un indice par groupe.
+    """
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=400, detail="Boîte invalide (min > max)")
+    if precision is None:
+        precision = cluster_precision(min_lat, min_lon, max_lat, max_lon)
+    return crud_signalement.get_clusters(
+        db=db, min_lat=min_lat, min_lon=min_lon, max_lat=max_lat, max_lon=max_lon, precision=precision, **filtres
+    )
+
+@router.get("/recent", response_model=List[SignalementResponse])
 def get_recent_signalements(
     days: int = Query(7, ge=1, le=90, description="Nombre de jours"),
     limit: int = Query(20, ge=1, le=100, description="Nombre max de résultats"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Signalements des X derniers jours"""
-    return crud_signalement.get_recent_signalements(db=db, days=days, limit=limit)
+    return RowsResponse(crud_signalement.get_recent_signalements(db=db, days=days, limit=limit, as_rows=True))
 
-@router.get("/search")
+@router.get("/search", response_model=List[SignalementResponse])
 def search_signalements(
     q: str = Query(..., min_length=2, description="Terme de recherche"),
     limit: int = Query(50, ge=1, le=200, description="Nombre max de résultats"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Recherche par mot-clé dans lieu, commentaires et agents"""
-    return crud_signalement.search_signalements(db=db, search_term=q, limit=limit)
+    return RowsResponse(crud_signalement.search_signalements(db=db, search_term=q, limit=limit, as_rows=True))
 
 @router.get("/agent/{id_agent}", response_model=List[SignalementResponse])
 def get_signalements_by_agent(
     id_agent: str,
     limit: int = Query(100, ge=1, le=500),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Tous les signalements d'un agent spécifique"""
-    return crud_signalement.get_signalements_by_agent(db=db, id_agent=id_agent, limit=limit)
+    return RowsResponse(crud_signalement.get_signalements_by_agent(db=db, id_agent=id_agent, limit=limit, as_rows=True))
 
+# Lu sur le primaire : l'ETag sert aux modifications (If-Match), il doit
+# refléter la dernière version et non celle d'un réplica en retard
 @router.get("/{signalement_id}", response_model=SignalementResponse)
 def get_signalement(
     signalement_id: int,
+    response: Response,
     db: Session = Depends(get_db)
 ):
-    """Détails d'un signalement spécifique"""
+    """Détails d'un signalement spécifique (avec ETag pour les modifications concurrentes)"""
     signalement = crud_signalement.get_signalement(db=db, signalement_id=signalement_id)
     if not signalement:
         raise HTTPException(status_code=404, detail="Signalement non trouvé")
+    response.headers["ETag"] = etag_for(signalement)
     return signalement
 
-@router.put("/{signalement_id}", response_model=SignalementResponse)
-def update_signalement(
+def _update_signalement(
+    db: Session,
     signalement_id: int,
     signalement: SignalementUpdate,
-    db: Session = Depends(get_db)
+    response: Response,
+    if_match: Optional[str]
 ):
-    """Mettre à jour un signalement"""
-    updated = crud_signalement.update_signalement(
-        db=db,
-        signalement_id=signalement_id,
-        signalement_update=signalement
-    )
+    try:
+        updated = crud_signalement.update_signalement(
+            db=db,
+            signalement_id=signalement_id,
+            signalement_update=signalement,
+            if_match=if_match_version(if_match, signalement_id)
+        )
+    except StaleSignalementError:
+        raise HTTPException(status_code=412, detail=STALE_DETAIL)
     if not updated:
         raise HTTPException(status_code=404, detail="Signalement non trouvé")
+    response.headers["ETag"] = etag_for(updated)
     return updated
 
+@router.put("/{signalement_id}", response_model=SignalementResponse)
+def update_signalement(
+    signalement_id: int,
+    signalement: SignalementUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_write_db)
+):
+    """Mettre à jour un signalement (If-Match optionnel)"""
+    return _update_signalement(db, signalement_id, signalement, response, if_match)
+
+@router.patch("/{signalement_id}", response_model=SignalementResponse)
+def patch_signalement(
+    signalement_id: int,
+    signalement: SignalementUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="ETag obtenu lors de la lecture"),
+    db: Session = Depends(get_write_db)
+):
+    """
+    Modifier partiellement un signalement.
+
+    Seules les colonnes envoyées sont écrites, en une seule requête. Avec
+    If-Match, la modification est refusée (412) si le signalement a changé
+    depuis sa lecture : pas de verrou à tenir entre lecture et écriture.
+    """
+    return _update_signalement(db, signalement_id, signalement, response, if_match)
+
 @router.delete("/{signalement_id}")
 def delete_signalement(
     signalement_id: int,
-    db: Session = Depends(get_db)
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_write_db)
 ):
-    """Supprimer un signalement"""
-    deleted = crud_signalement.delete_signalement(db=db, signalement_id=signalement_id)
+    """Supprimer un signalement (If-Match optionnel)"""
+    try:
+        deleted = crud_signalement.delete_signalement(
+            db=db,
+            signalement_id=signalement_id,
+            if_match=if_match_version(if_match, signalement_id)
+        )
+    except StaleSignalementError:
+        raise HTTPException(status_code=412, detail=STALE_DETAIL)
     if not deleted:
         raise HTTPException(status_code=404, detail="Signalement non trouvé")
     return {"message": "Signalement supprimé avec succès", "id": signalement_id}
\ No newline at end of file
@@ -0,0 +1,193 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import datetime
+
+from app.schemas import SignalementCreate, SignalementResponse, SignalementUpdate
+from app.api.v1.endpoints.params import (
+    STALE_DETAIL,
+    cursor_position,
+    if_match_version,
+    list_headers,
+    signalement_filters,
+    timeseries_bounds,
+)
+from app.core.profiling import ProfiledRoute
+from app.services.serialization import RowsResponse
+from app.services.crud import StaleSignalementError, etag_for
+from app.services.crud_async import async_crud_signalement
+from app.database import get_async_db, get_async_read_db, get_async_write_db
+
+# Variante asynchrone de router.py, activée par DATABASE_ASYNC=true : les
+# routes servies par les deux piles partagent paramètres, en-têtes et choix
+# de la session (réplica, read-your-writes) via params.py et app.database.
+# Les identifiants utilisent le convertisseur {...:int} : les routes qui
+# n'existent que dans router.py (bulk, export, stream, geo, incluses après
+# celui-ci) restent joignables.
+# Même classe de route que router.py : ?profile=1 et échantillonnage
+router = APIRouter(route_class=ProfiledRoute)
+
+@router.post("/", response_model=SignalementResponse, status_code=201)
+async def create_signalement(
+    signalement: SignalementCreate,
+    db: AsyncSession = Depends(get_async_write_db)
+):
+    """Créer un nouveau signalement"""
+    return await async_crud_signalement.create_signalement(db=db, signalement=signalement)
+
+@router.get("/", response_model=List[SignalementResponse])
+async def list_signalements(
+    skip: int = Query(0, ge=0, description="Nombre d'éléments à sauter"),
+    limit: int = Query(100, ge=1, le=500, description="Nombre max d'éléments"),
+    filtres: dict = Depends(signalement_filters),
+    cursor: Optional[str] = Query(None, description="Curseur X-Next-Cursor de la page précédente"),
+    total: bool = Query(False, description="Calculer le nombre total exact (X-Total-Count)"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Liste des signalements (voir router.list_signalements pour la pagination)"""
+    position = cursor_position(skip, cursor)
+
+    signalements = await async_crud_signalement.get_signalements(
+        db=db,
+        skip=skip,
+        limit=limit,
+        cursor=position,
+        as_rows=True,
+        **filtres
+    )
+
+    if total:
+        nombre = await async_crud_signalement.count_signalements(db=db, **filtres)
+    else:
+        nombre = await async_crud_signalement.estimate_signalements(db=db, **filtres)
+    return RowsResponse(signalements, headers=list_headers(signalements, limit, total, nombre))
+
+@router.get("/statistiques")
+async def get_statistiques(db: AsyncSession = Depends(get_async_read_db)):
+    """Statistiques complètes des signalements"""
+    return await async_crud_signalement.get_signalements_stats(db=db)
+
+@router.get("/timeseries")
+async def get_timeseries(
+    bucket: str = Query("day", pattern="^(hour|day|week)$", description="Intervalle : hour, day ou week"),
+    from_: Optional[datetime] = Query(None, alias="from", description="Début (défaut : selon l'intervalle)"),
+    to: Optional[datetime] = Query(None, description="Fin (défaut : maintenant)"),
+    group_by: Optional[str] = Query(
+        None, pattern="^(gravite|type_evenement|source_information)$", description="Une série par valeur"
+    ),
+    filtres: dict = Depends(signalement_filters),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Nombre de signalements par heure, jour ou semaine (voir router.py)"""
+    debut, fin = timeseries_bounds(bucket, from_, to, group_by)
+    return await async_crud_signalement.get_timeseries(
+        db=db,
+        bucket=bucket,
+        debut=debut,
+        fin=fin,
+        group_by=group_by,
+        **filtres
+    )
+
+@router.get("/recent", response_model=List[SignalementResponse])
+async def get_recent_signalements(
+    days: int = Query(7, ge=1, le=90, description="Nombre de jours"),
+    limit: int = Query(20, ge=1, le=100, description="Nombre max de résultats"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Signalements des X derniers jours"""
+    return RowsResponse(await async_crud_signalement.get_recent_signalements(db=db, days=days, limit=limit, as_rows=True))
+
+@router.get("/search", response_model=List[SignalementResponse])
+async def search_signalements(
+    q: str = Query(..., min_length=2, description="Terme de recherche"),
+    limit: int = Query(50, ge=1, le=200, description="Nombre max de résultats"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Recherche par mot-clé dans lieu, commentaires et agents"""
+    return RowsResponse(await async_crud_signalement.search_signalements(db=db, search_term=q, limit=limit, as_rows=True))
+
+@router.get("/agent/{id_agent}", response_model=List[SignalementResponse])
+async def get_signalements_by_agent(
+    id_agent: str,
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Tous les signalements d'un agent spécifique"""
+    return RowsResponse(await async_crud_signalement.get_signalements_by_agent(db=db, id_agent=id_agent, limit=limit, as_rows=True))
+
+# Lu sur le primaire, comme dans router.py : l'ETag sert aux modifications
+@router.get("/{signalement_id:int}", response_model=SignalementResponse)
+async def get_signalement(
+    signalement_id: int,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Détails d'un signalement spécifique (avec ETag)"""
+    signalement = await async_crud_signalement.get_signalement(db=db, signalement_id=signalement_id)
+    if not signalement:
+        raise HTTPException(status_code=404, detail="Signalement non trouvé")
+    response.headers["ETag"] = etag_for(signalement)
+    return signalement
+
+async def _update_signalement(
+    db: AsyncSession,
+    signalement_id: int,
+    signalement: SignalementUpdate,
+    response: Response,
+    if_match: Optional[str]
+):
+    try:
+        updated = await async_crud_signalement.update_signalement(
+            db=db,
+            signalement_id=signalement_id,
+            signalement_update=signalement,
+            if_match=if_match_version(if_match, signalement_id)
+        )
+    except StaleSignalementError:
+        raise HTTPException(status_code=412, detail=STALE_DETAIL)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Signalement non trouvé")
+    response.headers["ETag"] = etag_for(updated)
+    return updated
+
+@router.put("/{signalement_id:int}", response_model=SignalementResponse)
+async def update_signalement(
+    signalement_id: int,
+    signalement: SignalementUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_write_db)
+):
+    """Mettre à jour un signalement (If-Match optionnel)"""
+    return await _update_signalement(db, signalement_id, signalement, response, if_match)
+
+@router.patch("/{signalement_id:int}", response_model=SignalementResponse)
+async def patch_signalement(
+    signalement_id: int,
+    signalement: SignalementUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="ETag obtenu lors de la lecture"),
+    db: AsyncSession = Depends(get_async_write_db)
+):
+    """Modifier partiellement un signalement (voir router.patch_signalement)"""
+    return await _update_signalement(db, signalement_id, signalement, response, if_match)
+
+@router.delete("/{signalement_id:int}")
+async def delete_signalement(
+    signalement_id: int,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_write_db)
+):
+    """Supprimer un signalement (If-Match optionnel)"""
+    try:
+        deleted = await async_crud_signalement.delete_signalement(
+            db=db,
+            signalement_id=signalement_id,
+            if_match=if_match_version(if_match, signalement_id)
+        )
+    except StaleSignalementError:
+        raise HTTPException(status_code=412, detail=STALE_DETAIL)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Signalement non trouvé")
+    return {"message": "Signalement supprimé avec succès", "id": signalement_id}
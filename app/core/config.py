@@ -26,6 +26,66 @@ class Settings:
     
     # Configuration de la base de données
     database_url: str = os.getenv("DATABASE_URL", "")
+    # Pile asynchrone (asyncpg + AsyncSession) pour les endpoints signalements et auth
+    database_async: bool = os.getenv("DATABASE_ASYNC", "False").lower() == "true"
+    
+    # Réplicas en lecture (réplication en flux), URLs séparées par des virgules ; vide = tout sur le primaire
+    database_replica_urls: List[str] = [
+        url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+    ]
+    # Retard de réplication au-delà duquel un réplica ne sert plus de lectures (secondes)
+    replica_max_lag: float = float(os.getenv("REPLICA_MAX_LAG", "5"))
+    # Intervalle des sondes de santé et de retard des réplicas (secondes)
+    replica_check_interval: float = float(os.getenv("REPLICA_CHECK_INTERVAL", "2"))
+    # Après une écriture, les lectures du même client restent sur le primaire pendant ce délai
+    # (cookie) : au moins REPLICA_MAX_LAG + REPLICA_CHECK_INTERVAL
+    read_your_writes_seconds: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+    
+    # Pool de connexions (par processus) : pool_size + max_overflow connexions au plus
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    db_pool_timeout: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", "300"))
+    # Test des connexions au checkout : always, idle (après DB_PRE_PING_IDLE s d'inactivité) ou off
+    db_pre_ping: str = os.getenv("DB_PRE_PING", "idle").lower()
+    db_pre_ping_idle: float = float(os.getenv("DB_PRE_PING_IDLE", "30"))
+    # Durée maximale d'une instruction SQL en millisecondes (0 = illimitée)
+    db_statement_timeout_ms: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+    # Connexion via PgBouncer en mode transaction : pas d'instructions préparées
+    db_pgbouncer: bool = os.getenv("DB_PGBOUNCER", "False").lower() == "true"
+    # Connexion directe à PostgreSQL pour les LISTEN (invalidations, flux temps réel,
+    # réveil de l'outbox), que PgBouncer en mode transaction ne supporte pas ;
+    # vide = DATABASE_URL
+    listen_database_url: str = os.getenv("LISTEN_DATABASE_URL", "")
+    
+    # Géocodage de lieu : chaînes déjà résolues gardées en mémoire, rechargement du gazetteer (s)
+    geocode_cache_size: int = int(os.getenv("GEOCODE_CACHE_SIZE", "10000"))
+    geocode_reload_seconds: float = float(os.getenv("GEOCODE_RELOAD_SECONDS", "3600"))
+    
+    # Outbox : traitements différés des écritures, exécutés par outbox_worker.py
+    outbox_enabled: bool = os.getenv("OUTBOX_ENABLED", "True").lower() == "true"
+    outbox_batch_size: int = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+    # Attente maximale entre deux lectures de la file sans NOTIFY (secondes)
+    outbox_poll_seconds: float = float(os.getenv("OUTBOX_POLL_SECONDS", "5"))
+    # Tentatives avant passage en dead letter, délai de reprise exponentiel borné (secondes)
+    outbox_max_attempts: int = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+    outbox_retry_base: float = float(os.getenv("OUTBOX_RETRY_BASE", "5"))
+    outbox_retry_max: float = float(os.getenv("OUTBOX_RETRY_MAX", "3600"))
+    
+    # Serveur de production (gunicorn.conf.py) : nombre de workers, 0 = nombre de cœurs
+    web_concurrency: int = int(os.getenv("WEB_CONCURRENCY", "0"))
+    # Recyclage d'un worker après N requêtes (0 = jamais), avec un décalage aléatoire
+    max_requests: int = int(os.getenv("MAX_REQUESTS", "10000"))
+    max_requests_jitter: int = int(os.getenv("MAX_REQUESTS_JITTER", "1000"))
+    # Délai laissé aux requêtes en cours lors d'un arrêt ou d'un recyclage (secondes)
+    graceful_timeout: int = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+    
+    # Partitions mensuelles de signalements créées à l'avance (manage_partitions.py ensure)
+    partition_months_ahead: int = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+    # Nombre maximal de signalements par appel à POST /signalements/bulk
+    bulk_max_items: int = int(os.getenv("BULK_MAX_ITEMS", "5000"))
+    # Taille maximale du corps de POST /signalements/bulk (octets)
+    bulk_max_bytes: int = int(os.getenv("BULK_MAX_BYTES", str(16 * 1024 * 1024)))
     
     # Configuration CORS
     cors_origins: List[str] = [
@@ -40,9 +100,48 @@ class Settings:
     secret_key: str = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
     algorithm: str = os.getenv("ALGORITHM", "HS256")
     access_token_expire_minutes: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    # Coût bcrypt : les hashes plus faibles sont recalculés à la connexion
+    bcrypt_rounds: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    # Threads dédiés à bcrypt (0 = min(4, nombre de CPU))
+    password_hash_workers: int = int(os.getenv("PASSWORD_HASH_WORKERS", "0"))
+    # Vérifications en attente au-delà desquelles /auth/login répond 503
+    login_max_pending: int = int(os.getenv("LOGIN_MAX_PENDING", "64"))
+    # Cache des utilisateurs validés par token (0 = désactivé)
+    token_cache_size: int = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+    token_cache_ttl: float = float(os.getenv("TOKEN_CACHE_TTL", "60"))
+    # Propagation des invalidations entre workers via PostgreSQL LISTEN/NOTIFY
+    token_cache_pubsub: bool = os.getenv("TOKEN_CACHE_PUBSUB", "False").lower() == "true"
+    
+    # Cache des réponses GET /signalements : memory (par worker), redis (partagé) ou off
+    response_cache_backend: str = os.getenv("RESPONSE_CACHE_BACKEND", "memory").lower()
+    response_cache_size: int = int(os.getenv("RESPONSE_CACHE_SIZE", "1000"))
+    response_cache_ttl: float = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+    # Réponses plus volumineuses (octets) relayées sans être mises en cache
+    response_cache_max_body: int = int(os.getenv("RESPONSE_CACHE_MAX_BODY", "1000000"))
+    redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    
+    # Flux temps réel GET /signalements/stream (NOTIFY émis par le CRUD)
+    live_feed: bool = os.getenv("LIVE_FEED", "True").lower() == "true"
+    # Événements en attente par client avant resynchronisation forcée
+    live_feed_queue_size: int = int(os.getenv("LIVE_FEED_QUEUE_SIZE", "100"))
+    live_feed_heartbeat: float = float(os.getenv("LIVE_FEED_HEARTBEAT", "15"))
+    live_feed_retry_ms: int = int(os.getenv("LIVE_FEED_RETRY_MS", "3000"))
     
     # Configuration de logging
     log_level: str = os.getenv("LOG_LEVEL", "INFO")
+    # Format des journaux : text (lisible) ou json (une ligne par événement)
+    log_format: str = os.getenv("LOG_FORMAT", "text").lower()
+    # Délai maximal du SELECT 1 de /ready (secondes)
+    ready_timeout: float = float(os.getenv("READY_TIMEOUT", "2"))
+    
+    # Profilage : journal des requêtes SQL lentes (ms, 0 = désactivé)
+    slow_query_ms: float = float(os.getenv("SLOW_QUERY_MS", "0"))
+    # Fraction des requêtes échantillonnées par le profileur statistique (0 = désactivé)
+    profile_sample_rate: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    profile_interval_ms: float = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+    profile_dir: str = os.getenv("PROFILE_DIR", "profiles")
+    # ?profile=1 : en-tête Server-Timing pour les jetons ADMIN
+    profile_admin: bool = os.getenv("PROFILE_ADMIN", "True").lower() == "true"
     
     @property
     def database_url_formatted(self) -> str:
@@ -54,13 +153,48 @@ class Settings:
         # Sinon, construire à partir des composants
         return f"postgresql://{self.postgres_user}:{self.postgres_password}@{self.postgres_server}:{self.postgres_port}/{self.postgres_db}"
 
+    @property
+    def listen_url(self) -> str:
+        """URL des connexions LISTEN : LISTEN_DATABASE_URL, sinon celle de l'application"""
+        return self.listen_database_url or self.database_url_formatted
+
+    def check_listen_url(self, logger) -> bool:
+        """
+        Faux (et erreur journalisée) si les LISTEN passeraient par PgBouncer
+        en mode transaction : DB_PGBOUNCER sans LISTEN_DATABASE_URL
+        """
+        if self.db_pgbouncer and not self.listen_database_url:
+            logger.error(
+                "DB_PGBOUNCER=true sans LISTEN_DATABASE_URL : LISTEN n'est pas supporté par PgBouncer "
+                "en mode transaction, définir une URL directe vers PostgreSQL pour les écoutes"
+            )
+            return False
+        return True
+
+    @property
+    def workers(self) -> int:
+        """Nombre de workers : WEB_CONCURRENCY ou cœurs disponibles pour le processus"""
+        if self.web_concurrency > 0:
+            return self.web_concurrency
+        if hasattr(os, "sched_getaffinity"):
+            return len(os.sched_getaffinity(0))
+        return os.cpu_count() or 1
+
+    @property
+    def database_url_async(self) -> str:
+        """URL de base de données pour le driver asyncpg"""
+        return self.database_url_formatted.replace("postgresql://", "postgresql+asyncpg://", 1)
+
 # Instance globale des paramètres
 settings = Settings()
 
-# Debug info
-if settings.debug:
-    print(f"🔧 Configuration chargée:")
-    print(f"   - App: {settings.app_name} v{settings.app_version}")
-    print(f"   - Debug: {settings.debug}")
-    print(f"   - Database URL: postgresql://{settings.postgres_user}:***@{settings.postgres_server}:{settings.postgres_port}/{settings.postgres_db}")
-    print(f"   - CORS origins: {len(settings.cors_origins)} autorisées")
\ No newline at end of file
+def log_settings(logger) -> None:
+    """Résumé de la configuration (mode debug), journalisé au démarrage et non à l'import"""
+    if not settings.debug:
+        return
+    logger.info(
+        "Configuration chargée : %s v%s, debug=%s, base postgresql://%s:***@%s:%s/%s, %d origines CORS",
+        settings.app_name, settings.app_version, settings.debug,
+        settings.postgres_user, settings.postgres_server, settings.postgres_port, settings.postgres_db,
+        len(settings.cors_origins),
+    )
\ No newline at end of file
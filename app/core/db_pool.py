@@ -0,0 +1,155 @@
+# =====================================
+# app/core/db_pool.py - Configuration et instrumentation des pools de connexions
+# =====================================
+
+import math
+import time
+from uuid import uuid4
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from app.core.config import settings
+from app.core.metrics import counter, gauge, histogram
+
+POOL_WAIT = histogram(
+    "db_pool_checkout_wait_seconds",
+    "Attente pour obtenir une connexion du pool",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0),
+)
+POOL_TIMEOUTS = counter("db_pool_checkout_timeouts_total", "Attentes de connexion abandonnées (pool_timeout)")
+POOL_CONNECTS = counter("db_pool_connections_created_total", "Connexions PostgreSQL ouvertes par le pool")
+POOL_OVERFLOW_CONNECTS = counter(
+    "db_pool_overflow_connections_total", "Connexions ouvertes au-delà de pool_size (max_overflow)"
+)
+POOL_PINGS_FAILED = counter("db_pool_pre_ping_failures_total", "Connexions mortes détectées au checkout")
+POOL_IN_USE = gauge("db_pool_connections_in_use", "Connexions empruntées au pool")
+POOL_IDLE = gauge("db_pool_connections_idle", "Connexions ouvertes et disponibles dans le pool")
+POOL_OVERFLOW = gauge("db_pool_overflow", "Connexions en excès courantes (négatif : places libres sous pool_size)")
+POOL_MAX = gauge("db_pool_max_connections", "Connexions maximales du pool (pool_size + max_overflow)")
+
+
+class _TimedCheckout:
+    """Mesure l'attente de _do_get, appelée par le pool pour chaque emprunt"""
+
+    metric_name = "primary"
+
+    def _do_get(self):
+        debut = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            POOL_TIMEOUTS.inc(pool=self.metric_name)
+            raise
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - debut, pool=self.metric_name)
+
+    def recreate(self):
+        # engine.dispose() remplace le pool : le nom des métriques est conservé
+        nouveau = super().recreate()
+        nouveau.metric_name = self.metric_name
+        return nouveau
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def _connect_args(asyncpg: bool) -> dict:
+    """Paramètres de connexion : timeout, application_name, statement_timeout, PgBouncer"""
+    if asyncpg:
+        server_settings = {"application_name": "event_form_api"}
+        args = {"timeout": 10, "server_settings": server_settings}
+        if settings.db_pgbouncer:
+            # Mode transaction de PgBouncer : pas de cache d'instructions préparées,
+            # et des noms uniques pour celles qu'asyncpg prépare malgré tout, sans
+            # collision entre clients qui partagent une même connexion serveur
+            args.update(
+                statement_cache_size=0,
+                prepared_statement_cache_size=0,
+                prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__",
+            )
+        elif settings.db_statement_timeout_ms:
+            server_settings["statement_timeout"] = str(settings.db_statement_timeout_ms)
+        return args
+
+    args = {"connect_timeout": 10, "application_name": "event_form_api"}
+    # PgBouncer refuse le paramètre de démarrage "options" : le timeout se règle
+    # alors côté serveur (ALTER ROLE ... SET statement_timeout) ou query_timeout
+    if settings.db_statement_timeout_ms and not settings.db_pgbouncer:
+        args["options"] = f"-c statement_timeout={settings.db_statement_timeout_ms}"
+    return args
+
+
+def engine_options(asyncpg: bool = False) -> dict:
+    """Arguments de create_engine / create_async_engine tirés de Settings"""
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if asyncpg else InstrumentedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pre_ping == "always",
+        "connect_args": _connect_args(asyncpg),
+    }
+
+
+def probe_options(timeout: float, asyncpg: bool = False) -> dict:
+    """
+    Arguments d'un engine de sonde (/ready) : sans pool (une sonde ne
+    dépend pas des connexions libres) et connexion bornée par `timeout`
+    """
+    args = _connect_args(asyncpg)
+    if asyncpg:
+        args["timeout"] = timeout
+    else:
+        # libpq : secondes entières, 2 au minimum
+        args["connect_timeout"] = max(2, math.ceil(timeout))
+    return {"poolclass": NullPool, "connect_args": args}
+
+
+def instrument_engine(engine, name: str) -> None:
+    """
+    Expose l'état du pool de `engine` sous le label pool=`name`, et applique
+    la stratégie DB_PRE_PING=idle : seules les connexions restées inactives
+    plus de DB_PRE_PING_IDLE secondes sont testées au checkout, au lieu d'un
+    aller-retour supplémentaire pour chaque emprunt (DB_PRE_PING=always).
+    """
+    pool = engine.pool
+    pool.metric_name = name
+    dialect = engine.dialect
+
+    # engine.pool est relu à chaque rendu : il change après engine.dispose()
+    POOL_IN_USE.set_function(lambda: engine.pool.checkedout(), pool=name)
+    POOL_IDLE.set_function(lambda: engine.pool.checkedin(), pool=name)
+    POOL_OVERFLOW.set_function(lambda: engine.pool.overflow(), pool=name)
+    POOL_MAX.set(settings.db_pool_size + settings.db_max_overflow, pool=name)
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        POOL_CONNECTS.inc(pool=name)
+        if engine.pool.overflow() > 0:
+            POOL_OVERFLOW_CONNECTS.inc(pool=name)
+
+    if settings.db_pre_ping != "idle":
+        return
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        rendue_a = connection_record.info.get("checked_in_at")
+        if rendue_a is None or time.monotonic() - rendue_a < settings.db_pre_ping_idle:
+            return
+        try:
+            dialect.do_ping(dbapi_connection)
+        except Exception:
+            POOL_PINGS_FAILED.inc(pool=name)
+            # Le pool remplace la connexion et retente l'emprunt
+            raise exc.DisconnectionError()
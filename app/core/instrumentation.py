@@ -0,0 +1,162 @@
+# =====================================
+# app/core/instrumentation.py - Métriques des requêtes HTTP et SQL
+# =====================================
+
+import logging
+import sys
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+
+from app.core.config import settings
+from app.core.metrics import counter, gauge, histogram
+
+logger = logging.getLogger("app.slow_query")
+
+HTTP_REQUESTS = counter("http_requests_total", "Requêtes HTTP traitées, par route et statut")
+HTTP_LATENCY = histogram("http_request_duration_seconds", "Durée de traitement des requêtes HTTP")
+HTTP_IN_FLIGHT = gauge("http_requests_in_flight", "Requêtes HTTP en cours de traitement")
+HTTP_DB_QUERIES = histogram(
+    "http_request_db_queries",
+    "Requêtes SQL émises par requête HTTP (N+1, requêtes multiples)",
+    buckets=(0, 1, 2, 3, 4, 5, 7, 10, 15, 20, 50, 100),
+)
+DB_QUERY_DURATION = histogram("db_query_duration_seconds", "Durée des instructions SQL, par type")
+
+# Premier mot-clé des instructions suivies ; les autres sont regroupés sous OTHER
+_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "EXPLAIN", "LOCK"}
+
+# Fichiers dont les fonctions sont citées comme appelantes des requêtes lentes
+_CRUD_FILES = ("crud.py", "crud_async.py")
+
+
+class RequestSQL:
+    """Requêtes SQL de la requête HTTP courante (nombre, durée cumulée)"""
+
+    __slots__ = ("route", "queries", "seconds")
+
+    def __init__(self, route: str):
+        self.route = route
+        self.queries = 0
+        self.seconds = 0.0
+
+
+# L'objet est partagé par référence avec les threads du threadpool
+# (contexte copié par Starlette) : leurs requêtes y sont aussi comptées
+_sql_en_cours: ContextVar[Optional[RequestSQL]] = ContextVar("sql_en_cours", default=None)
+
+
+def current_request_sql() -> Optional[RequestSQL]:
+    return _sql_en_cours.get()
+
+
+def _operation(statement: str) -> str:
+    mot = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return mot if mot in _OPERATIONS else "OTHER"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+    requete = _sql_en_cours.get()
+    if requete is not None:
+        requete.queries += 1
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    debuts = conn.info.get("query_start")
+    if not debuts:
+        return
+    duree = time.perf_counter() - debuts.pop()
+    DB_QUERY_DURATION.observe(duree, operation=_operation(statement))
+    requete = _sql_en_cours.get()
+    if requete is not None:
+        requete.seconds += duree
+    if settings.slow_query_ms and duree * 1000 >= settings.slow_query_ms:
+        _log_slow_query(duree, statement, parameters, requete)
+
+
+def _crud_caller() -> str:
+    """Première méthode du CRUD dans la pile d'appels (coût payé seulement pour les requêtes lentes)"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        if frame.f_code.co_filename.endswith(_CRUD_FILES):
+            instance = frame.f_locals.get("self")
+            classe = f"{type(instance).__name__}." if instance is not None else ""
+            return f"{classe}{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "?"
+
+
+def _log_slow_query(duree: float, statement: str, parameters, requete: Optional[RequestSQL]) -> None:
+    logger.warning(
+        "Requête lente %.1f ms [%s] route=%s\n%s\nparamètres=%.2000r",
+        duree * 1000,
+        _crud_caller(),
+        requete.route if requete is not None else "-",
+        statement,
+        parameters,
+    )
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
+
+
+def route_template(scope) -> str:
+    """Chemin déclaré de la route (/signalements/{signalement_id}) : cardinalité bornée"""
+    app = scope.get("app")
+    partiel = None
+    for route in getattr(app, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partiel is None:
+            partiel = route.path
+    return partiel or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI : nombre de requêtes, latence et requêtes en cours par
+    route, et nombre de requêtes SQL émises pendant chaque requête HTTP.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        methode = scope["method"]
+        route = route_template(scope)
+        statut = 500
+        requete = RequestSQL(route)
+        jeton = _sql_en_cours.set(requete)
+
+        async def send_avec_statut(message):
+            nonlocal statut
+            if message["type"] == "http.response.start":
+                statut = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(method=methode, route=route)
+        debut = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_avec_statut)
+        finally:
+            HTTP_IN_FLIGHT.dec(method=methode, route=route)
+            HTTP_LATENCY.observe(time.perf_counter() - debut, method=methode, route=route)
+            HTTP_REQUESTS.inc(method=methode, route=route, status=str(statut))
+            HTTP_DB_QUERIES.observe(requete.queries, method=methode, route=route)
+            _sql_en_cours.reset(jeton)
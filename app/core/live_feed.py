@@ -0,0 +1,132 @@
+# =====================================
+# app/core/live_feed.py - Flux temps réel des signalements (SSE)
+# =====================================
+
+import asyncio
+import json
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import text
+
+from app.core.config import settings
+
+# Canal PostgreSQL NOTIFY alimenté par le CRUD à chaque écriture validée
+SIGNALEMENTS_CHANNEL = "signalements_events"
+# Limite de PostgreSQL pour un payload NOTIFY (8000 octets), avec une marge
+MAX_PAYLOAD = 7800
+
+# Colonnes du signalement incluses dans les événements (pas les textes longs)
+EVENT_COLUMNS = (
+    "id", "date_signalement", "heure_signalement", "lieu", "latitude", "longitude", "type_evenement",
+    "gravite", "source_information", "nom_agent", "created_at", "updated_at",
+)
+
+
+def _valeur(valeur):
+    if hasattr(valeur, "isoformat"):
+        return valeur.isoformat()
+    if hasattr(valeur, "value"):
+        return valeur.value
+    return valeur
+
+
+def build_event(action: str, signalement=None, ids=None, stats_deltas: Optional[Dict[Tuple, int]] = None) -> str:
+    """
+    Payload JSON d'un événement : action (created, updated, deleted, bulk_created),
+    résumé du signalement ou liste d'ids, et deltas du rollup de statistiques.
+    Au-delà de la taille permise par NOTIFY, l'événement est réduit à une
+    demande de resynchronisation.
+    """
+    evenement = {"action": action}
+    if signalement is not None:
+        evenement["signalement"] = {col: _valeur(getattr(signalement, col)) for col in EVENT_COLUMNS}
+    if ids is not None:
+        evenement["ids"] = list(ids)
+    if stats_deltas:
+        evenement["stats_delta"] = [
+            [*(_valeur(v) for v in cle), delta] for cle, delta in stats_deltas.items() if delta
+        ]
+    payload = json.dumps(evenement, separators=(",", ":"))
+    if len(payload.encode()) > MAX_PAYLOAD:
+        payload = json.dumps({"action": action, "resync": True})
+    return payload
+
+
+def notify_signalements(db, payload: str) -> None:
+    """NOTIFY dans la transaction courante : livré aux workers au commit, jamais après un rollback"""
+    if settings.live_feed:
+        db.execute(text("SELECT pg_notify(:canal, :payload)"), {"canal": SIGNALEMENTS_CHANNEL, "payload": payload})
+
+
+async def notify_signalements_async(db, payload: str) -> None:
+    if settings.live_feed:
+        await db.execute(text("SELECT pg_notify(:canal, :payload)"), {"canal": SIGNALEMENTS_CHANNEL, "payload": payload})
+
+
+class LiveFeed:
+    """
+    Diffusion des événements aux clients connectés d'un worker.
+
+    Le worker n'a qu'une connexion LISTEN (pg_listener), quel que soit le
+    nombre de tableaux de bord connectés : chaque NOTIFY est recopié dans
+    la file de chaque abonné. Un abonné trop lent (file pleine) est vidé
+    et reçoit un événement resync pour recharger ses données.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._abonnes: Set[asyncio.Queue] = set()
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._abonnes.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._abonnes.discard(queue)
+
+    def publish(self, payload: str) -> None:
+        """Callback de pg_listener (boucle d'événements) : ne bloque jamais"""
+        self.published += 1
+        for queue in self._abonnes:
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                self._resync(queue)
+
+    def resync_all(self) -> None:
+        """Après une coupure de l'écoute : des événements ont pu être perdus"""
+        for queue in self._abonnes:
+            self._resync(queue)
+
+    def _resync(self, queue: asyncio.Queue) -> None:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(json.dumps({"action": "resync", "resync": True}))
+
+    def stats(self) -> dict:
+        return {"clients": len(self._abonnes), "published": self.published, "dropped": self.dropped}
+
+
+live_feed = LiveFeed(settings.live_feed_queue_size)
+
+
+async def sse_events(queue: asyncio.Queue, is_disconnected):
+    """Flux text/event-stream d'un abonné, avec commentaires de maintien de connexion"""
+    try:
+        yield f"retry: {settings.live_feed_retry_ms}\n\n"
+        yield "event: ready\ndata: {}\n\n"
+        while True:
+            try:
+                payload = await asyncio.wait_for(queue.get(), timeout=settings.live_feed_heartbeat)
+            except asyncio.TimeoutError:
+                if await is_disconnected():
+                    break
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: signalement\ndata: {payload}\n\n"
+    finally:
+        live_feed.unsubscribe(queue)
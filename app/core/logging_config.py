@@ -0,0 +1,45 @@
+# =====================================
+# app/core/logging_config.py - Journalisation structurée
+# =====================================
+
+import json
+import logging
+import time
+
+from app.core.config import settings
+
+# Attributs standard d'un LogRecord : tout le reste vient de extra={...}
+_ATTRIBUTS_STANDARD = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par événement ; les champs passés via extra={...} sont inclus"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        evenement = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for cle, valeur in vars(record).items():
+            if cle not in _ATTRIBUTS_STANDARD:
+                evenement[cle] = valeur
+        if record.exc_info:
+            evenement["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(evenement, ensure_ascii=False, default=str)
+
+
+def configure_logging() -> None:
+    """Configure le logger racine (LOG_LEVEL, LOG_FORMAT=text|json) ; idempotent"""
+    racine = logging.getLogger()
+    if any(getattr(handler, "_app_handler", False) for handler in racine.handlers):
+        return
+    handler = logging.StreamHandler()
+    handler._app_handler = True
+    if settings.log_format == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    racine.addHandler(handler)
+    racine.setLevel(settings.log_level.upper())
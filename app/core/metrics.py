@@ -0,0 +1,177 @@
+# =====================================
+# app/core/metrics.py - Métriques au format texte Prometheus
+# =====================================
+
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Bornes (secondes) adaptées aux latences d'une API et de ses requêtes SQL
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(valeur) -> str:
+    return str(valeur).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{nom}="{_escape(valeur)}"' for nom, valeur in labels) + "}"
+
+
+def _format_value(valeur: float) -> str:
+    if valeur == float("inf"):
+        return "+Inf"
+    return repr(float(valeur)) if isinstance(valeur, float) else str(valeur)
+
+
+class Metric:
+    """Métrique nommée dont chaque combinaison de labels est une série"""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+        return tuple(sorted(labels.items()))
+
+    def samples(self) -> Iterable[Tuple[str, Tuple[Tuple[str, str], ...], float]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lignes = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for nom, labels, valeur in self.samples():
+            lignes.append(f"{nom}{_format_labels(labels)} {_format_value(valeur)}")
+        return lignes
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, valeur) for key, valeur in self._values.items()]
+
+
+class Gauge(Metric):
+    """Valeur instantanée, fixée par set()/inc()/dec() ou lue au rendu par set_function()"""
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str):
+        super().__init__(name, documentation)
+        self._values: Dict[tuple, float] = {}
+        self._functions: Dict[tuple, Callable[[], float]] = {}
+
+    def set(self, valeur: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = valeur
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, fonction: Callable[[], float], **labels) -> None:
+        with self._lock:
+            self._functions[self._key(labels)] = fonction
+
+    def samples(self):
+        with self._lock:
+            series = [(self.name, key, valeur) for key, valeur in self._values.items()]
+            fonctions = list(self._functions.items())
+        for key, fonction in fonctions:
+            try:
+                series.append((self.name, key, fonction()))
+            except Exception:
+                continue
+        return series
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets))
+        # Par série : compte de chaque intervalle (dernier = +Inf), somme, total
+        self._values: Dict[tuple, list] = {}
+
+    def observe(self, valeur: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, valeur)
+        with self._lock:
+            serie = self._values.get(key)
+            if serie is None:
+                serie = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][index] += 1
+            serie[1] += valeur
+            serie[2] += 1
+
+    def samples(self):
+        with self._lock:
+            copies = [(key, list(serie[0]), serie[1], serie[2]) for key, serie in self._values.items()]
+        series = []
+        for key, comptes, somme, total in copies:
+            cumul = 0
+            for borne, compte in zip(self.buckets + (float("inf"),), comptes):
+                cumul += compte
+                series.append((f"{self.name}_bucket", key + (("le", _format_value(borne)),), cumul))
+            series.append((f"{self.name}_sum", key, somme))
+            series.append((f"{self.name}_count", key, total))
+        return series
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        """Enregistre une métrique ; retourne l'existante si le nom est déjà pris"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lignes: List[str] = []
+        for metric in metrics:
+            lignes.extend(metric.render())
+        return "\n".join(lignes) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def counter(name: str, documentation: str) -> Counter:
+    return REGISTRY.register(Counter(name, documentation))
+
+
+def gauge(name: str, documentation: str) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation))
+
+
+def histogram(name: str, documentation: str, buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, buckets))
@@ -0,0 +1,237 @@
+# =====================================
+# app/core/profiling.py - Profilage des requêtes (échantillonnage, ?profile=1)
+# =====================================
+
+import asyncio
+import functools
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional, Set
+
+import jwt
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.instrumentation import current_request_sql
+
+# Feuilles de pile d'un thread inactif (attente de travail, boucle d'événements)
+_FICHIERS_INACTIFS = ("threading.py", "selectors.py", "queue.py")
+
+
+class StackSampler:
+    """
+    Profileur statistique : un thread relève la pile de tous les threads du
+    processus (sys._current_frames) toutes les `interval` secondes, tant
+    qu'au moins une session est ouverte. Les piles sont comptées au format
+    « replié » (frame;frame;frame N) lu par flamegraph.pl et speedscope.
+
+    Toutes les requêtes en cours sur le worker apparaissent dans les piles
+    d'une session : le profil décrit le worker pendant la requête.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._sessions: Set[int] = set()
+        self._piles = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._numeros = itertools.count()
+
+    def start(self) -> int:
+        with self._lock:
+            session = next(self._numeros)
+            self._sessions.add(session)
+            self._piles[session] = Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+            return session
+
+    def stop(self, session: int) -> Counter:
+        with self._lock:
+            self._sessions.discard(session)
+            return self._piles.pop(session, Counter())
+
+    def _run(self) -> None:
+        moi = threading.get_ident()
+        while True:
+            with self._lock:
+                if not self._sessions:
+                    self._thread = None
+                    return
+                compteurs = [self._piles[session] for session in self._sessions]
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == moi:
+                    continue
+                pile = _folded(frame)
+                if pile is not None:
+                    for compteur in compteurs:
+                        compteur[pile] += 1
+            time.sleep(self.interval)
+
+
+def _folded(frame) -> Optional[str]:
+    if frame.f_code.co_filename.endswith(_FICHIERS_INACTIFS):
+        return None
+    noms = []
+    while frame is not None:
+        noms.append(f"{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)})")
+        frame = frame.f_back
+    return ";".join(reversed(noms))
+
+
+sampler = StackSampler(settings.profile_interval_ms / 1000)
+
+
+def write_profile(piles: Counter, route: str) -> Optional[str]:
+    """Écrit un fichier .folded dans PROFILE_DIR ; retourne son chemin"""
+    if not piles:
+        return None
+    os.makedirs(settings.profile_dir, exist_ok=True)
+    nom = "".join(c if c.isalnum() else "_" for c in route).strip("_") or "racine"
+    chemin = os.path.join(
+        settings.profile_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{nom}.folded"
+    )
+    with open(chemin, "w") as fichier:
+        for pile, compte in piles.most_common():
+            fichier.write(f"{pile} {compte}\n")
+    return chemin
+
+
+# =====================================
+# Décomposition du temps d'une requête (?profile=1)
+# =====================================
+
+class Profile:
+    __slots__ = ("endpoint_start", "endpoint_end")
+
+    def __init__(self):
+        self.endpoint_start = None
+        self.endpoint_end = None
+
+
+_profil_en_cours: ContextVar[Optional[Profile]] = ContextVar("profil_en_cours", default=None)
+
+
+def _timed(endpoint):
+    """Enveloppe l'endpoint pour dater son exécution quand un profil est demandé"""
+    # include_router recrée les routes à partir de l'endpoint déjà enveloppé
+    if getattr(endpoint, "_profiled", False):
+        return endpoint
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            profil = _profil_en_cours.get()
+            if profil is None:
+                return await endpoint(*args, **kwargs)
+            profil.endpoint_start = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                profil.endpoint_end = time.perf_counter()
+        wrapper._profiled = True
+        return wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        profil = _profil_en_cours.get()
+        if profil is None:
+            return endpoint(*args, **kwargs)
+        profil.endpoint_start = time.perf_counter()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            profil.endpoint_end = time.perf_counter()
+    wrapper._profiled = True
+    return wrapper
+
+
+def _is_admin(request) -> bool:
+    schema, _, token = request.headers.get("authorization", "").partition(" ")
+    if schema.lower() != "bearer" or not token:
+        return False
+    try:
+        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+    except jwt.PyJWTError:
+        return False
+    return payload.get("role") == "ADMIN"
+
+
+def server_timing(debut: float, fin: float, profil: Profile, db_seconds: float, db_queries: int) -> str:
+    """En-tête Server-Timing : validation, base, code applicatif, sérialisation (ms)"""
+    def mesure(nom, secondes, desc=None):
+        valeur = f"{nom};dur={secondes * 1000:.2f}"
+        return valeur + (f';desc="{desc}"' if desc else "")
+
+    mesures = []
+    if profil.endpoint_start is not None and profil.endpoint_end is not None:
+        endpoint = profil.endpoint_end - profil.endpoint_start
+        mesures += [
+            mesure("validation", profil.endpoint_start - debut, "paramètres et dépendances"),
+            mesure("db", db_seconds, f"{db_queries} requêtes"),
+            mesure("app", max(0.0, endpoint - db_seconds)),
+            mesure("serialization", fin - profil.endpoint_end),
+        ]
+    mesures.append(mesure("total", fin - debut))
+    return ", ".join(mesures)
+
+
+class ProfiledRoute(APIRoute):
+    """
+    Route FastAPI profilable :
+
+    - ?profile=1 (jeton ADMIN, PROFILE_ADMIN=true) ajoute un en-tête
+      Server-Timing décomposant la requête (affiché par les outils de
+      développement du navigateur) ;
+    - une fraction PROFILE_SAMPLE_RATE des requêtes est échantillonnée par
+      StackSampler et écrite dans PROFILE_DIR.
+
+    Hors de ces cas, le coût se limite à une lecture de ContextVar et à un
+    test sur la chaîne de requête.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _timed(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def profiled_handler(request):
+            decomposition = (
+                settings.profile_admin
+                and b"profile=" in request.scope["query_string"]
+                and request.query_params.get("profile") == "1"
+                and _is_admin(request)
+            )
+            echantillon = settings.profile_sample_rate > 0 and random.random() < settings.profile_sample_rate
+            if not (decomposition or echantillon):
+                return await handler(request)
+
+            profil = Profile()
+            jeton = _profil_en_cours.set(profil)
+            sql = current_request_sql()
+            db_avant = (sql.seconds, sql.queries) if sql is not None else (0.0, 0)
+            session = sampler.start() if echantillon else None
+            debut = time.perf_counter()
+            try:
+                response = await handler(request)
+            finally:
+                fin = time.perf_counter()
+                _profil_en_cours.reset(jeton)
+                if session is not None:
+                    await run_in_threadpool(write_profile, sampler.stop(session), self.path)
+
+            if decomposition:
+                db_seconds = sql.seconds - db_avant[0] if sql is not None else 0.0
+                db_queries = sql.queries - db_avant[1] if sql is not None else 0
+                response.headers["Server-Timing"] = server_timing(debut, fin, profil, db_seconds, db_queries)
+            return response
+
+        return profiled_handler
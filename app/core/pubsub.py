@@ -0,0 +1,156 @@
+# =====================================
+# app/core/pubsub.py - Écoute PostgreSQL LISTEN/NOTIFY
+# =====================================
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, List
+
+import psycopg2
+import psycopg2.extensions
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_DELAY = 2.0
+# Délai de connexion (secondes, libpq) : une base injoignable ne retient pas
+# indéfiniment un thread de connexion
+CONNECT_TIMEOUT = 5
+
+
+class PgListener:
+    """
+    Une connexion LISTEN par worker, intégrée à la boucle asyncio.
+
+    Les callbacks enregistrés avec subscribe() reçoivent le payload (str)
+    de chaque NOTIFY sur leur canal. Ils s'exécutent dans la boucle
+    d'événements et doivent donc rester brefs et non bloquants.
+
+    La connexion et les LISTEN initiaux s'exécutent hors de la boucle
+    (executor) : une panne de la base ne bloque pas les requêtes du worker.
+    Les notifications émises pendant une coupure sont perdues : les callbacks
+    enregistrés avec on_reconnect() permettent de resynchroniser un état
+    local (vider un cache, par exemple) après reconnexion.
+    """
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self._callbacks: Dict[str, List[Callable[[str], None]]] = defaultdict(list)
+        self._reconnect_callbacks: List[Callable[[], None]] = []
+        self._has_connected = False
+        self._conn = None
+        self._loop = None
+        self._task = None
+        self._stopped = True
+
+    def subscribe(self, channel: str, callback: Callable[[str], None]) -> None:
+        nouveau = channel not in self._callbacks
+        self._callbacks[channel].append(callback)
+        if nouveau and self._conn is not None:
+            try:
+                self._listen(self._conn, [channel])
+            except psycopg2.Error as e:
+                # La reconnexion réécoute tous les canaux, y compris celui-ci
+                logger.warning("LISTEN %s impossible, reconnexion : %s", channel, e)
+                self._disconnect()
+                self._schedule_reconnect()
+
+    def on_reconnect(self, callback: Callable[[], None]) -> None:
+        self._reconnect_callbacks.append(callback)
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stopped = False
+        self._connect()
+
+    async def stop(self) -> None:
+        self._stopped = True
+        self._disconnect()
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    def _connect(self) -> None:
+        """Lance la connexion en tâche de fond (au démarrage et par call_later)"""
+        self._task = self._loop.create_task(self._open())
+
+    def _connect_blocking(self, channels: List[str]):
+        """Connexion et LISTEN (bloquant : exécuté dans l'executor)"""
+        conn = psycopg2.connect(
+            self.dsn, application_name="event_form_api_listener", connect_timeout=CONNECT_TIMEOUT
+        )
+        try:
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            self._listen(conn, channels)
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    async def _open(self) -> None:
+        channels = list(self._callbacks)
+        conn = None
+        try:
+            conn = await self._loop.run_in_executor(None, self._connect_blocking, channels)
+            # Canaux abonnés pendant la connexion
+            nouveaux = [channel for channel in self._callbacks if channel not in channels]
+            if nouveaux:
+                await self._loop.run_in_executor(None, self._listen, conn, nouveaux)
+        except psycopg2.Error as e:
+            if conn is not None:
+                conn.close()
+            logger.warning("Écoute NOTIFY indisponible : %s", e)
+            self._schedule_reconnect()
+            return
+        if self._stopped:
+            conn.close()
+            return
+        # Connexion publiée seulement une fois tous les LISTEN en place
+        self._conn = conn
+        self._loop.add_reader(conn.fileno(), self._on_readable)
+        if self._has_connected:
+            for callback in self._reconnect_callbacks:
+                callback()
+        self._has_connected = True
+
+    @staticmethod
+    def _listen(conn, channels: List[str]) -> None:
+        with conn.cursor() as cursor:
+            for channel in channels:
+                cursor.execute(f'LISTEN "{channel}"')
+
+    def _disconnect(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            self._loop.remove_reader(self._conn.fileno())
+            self._conn.close()
+        except Exception:
+            pass
+        self._conn = None
+
+    def _schedule_reconnect(self) -> None:
+        if not self._stopped:
+            self._loop.call_later(RECONNECT_DELAY, self._connect)
+
+    def _on_readable(self) -> None:
+        try:
+            self._conn.poll()
+        except psycopg2.Error as e:
+            logger.warning("Connexion NOTIFY perdue : %s", e)
+            self._disconnect()
+            self._schedule_reconnect()
+            return
+        while self._conn.notifies:
+            notification = self._conn.notifies.pop(0)
+            for callback in self._callbacks.get(notification.channel, ()):
+                try:
+                    callback(notification.payload)
+                except Exception as e:
+                    logger.exception("Erreur dans un abonné NOTIFY (%s) : %s", notification.channel, e)
+
+
+pg_listener = PgListener(settings.listen_url)
@@ -0,0 +1,343 @@
+# =====================================
+# app/core/response_cache.py - Cache des réponses GET des signalements
+# =====================================
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Routes mises en cache : lectures de /signalements, hors flux et exports
+CACHED_PREFIX = "/api/v1/signalements"
+UNCACHED_PATHS = ("/export", "/stream")
+
+# Instant (time.monotonic) de la dernière écriture connue du worker : validée
+# par lui, ou signalée par le NOTIFY du flux temps réel
+_dernier_changement = float("-inf")
+
+
+def note_signalements_changed() -> None:
+    global _dernier_changement
+    _dernier_changement = time.monotonic()
+
+
+def changed_within(seconds: float) -> bool:
+    return time.monotonic() - _dernier_changement < seconds
+
+
+class CachedResponse(NamedTuple):
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    etag: str
+
+
+class MemoryCacheBackend:
+    """
+    Cache LRU borné, propre au processus (backend par défaut).
+
+    Le compteur de version est propre au worker : les écritures servies par
+    les autres workers l'incrémentent via le NOTIFY du flux temps réel
+    (LIVE_FEED), sinon elles ne sont visibles qu'après expiration (ttl).
+    """
+
+    blocking = False
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[CachedResponse, float]]" = OrderedDict()
+        self._version = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            reponse, expire_a = entry
+            if expire_a <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return reponse
+
+    def set(self, key: str, reponse: CachedResponse, ttl: float) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (reponse, time.monotonic() + ttl)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def version(self) -> int:
+        return self._version
+
+    def bump_version(self) -> int:
+        with self._lock:
+            self._version += 1
+            # Les entrées des versions précédentes ne seront plus jamais lues
+            self._entries.clear()
+            return self._version
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "size": len(self._entries), "max_size": self.max_size}
+
+
+class RedisCacheBackend:
+    """
+    Cache partagé entre workers (et entre instances) dans Redis.
+
+    `client` est un client synchrone compatible redis-py (get/set/incr) :
+    redis.Redis, ou un substitut local comme fakeredis.FakeRedis pour les
+    essais. Le compteur de version est une clé INCR commune à tous les
+    workers ; les entrées des anciennes versions expirent d'elles-mêmes.
+    """
+
+    blocking = True
+
+    def __init__(self, client, prefix: str = "event_form:cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisCacheBackend":
+        import redis  # dépendance optionnelle
+
+        return cls(redis.Redis.from_url(url, socket_timeout=0.5))
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        brut = self.client.get(self.prefix + key)
+        if brut is None:
+            return None
+        entete, _, body = brut.partition(b"\n")
+        meta = json.loads(entete)
+        headers = [(nom.encode("latin-1"), valeur.encode("latin-1")) for nom, valeur in meta["headers"]]
+        return CachedResponse(meta["status"], headers, body, meta["etag"])
+
+    def set(self, key: str, reponse: CachedResponse, ttl: float) -> None:
+        meta = {
+            "status": reponse.status,
+            "headers": [(nom.decode("latin-1"), valeur.decode("latin-1")) for nom, valeur in reponse.headers],
+            "etag": reponse.etag,
+        }
+        self.client.set(self.prefix + key, json.dumps(meta).encode() + b"\n" + reponse.body, ex=max(1, int(ttl)))
+
+    def version(self) -> int:
+        return int(self.client.get(self.prefix + "version") or 0)
+
+    def bump_version(self) -> int:
+        return self.client.incr(self.prefix + "version")
+
+    def stats(self) -> dict:
+        return {"backend": "redis", "version": self.version()}
+
+
+def build_backend():
+    """Backend choisi par RESPONSE_CACHE_BACKEND (memory, redis ou off)"""
+    if settings.response_cache_backend == "off" or settings.response_cache_size <= 0:
+        return None
+    if settings.response_cache_backend == "redis":
+        return RedisCacheBackend.from_url(settings.redis_url)
+    return MemoryCacheBackend(settings.response_cache_size)
+
+
+response_cache = build_backend()
+compteurs: Counter = Counter()
+
+
+def cache_stats() -> dict:
+    """Compteurs du worker courant, pour /health"""
+    if response_cache is None:
+        return {"backend": "off"}
+    total = compteurs["hits"] + compteurs["misses"]
+    return {
+        **response_cache.stats(),
+        "hits": compteurs["hits"],
+        "misses": compteurs["misses"],
+        "not_modified": compteurs["not_modified"],
+        "hit_rate": round(compteurs["hits"] / total, 4) if total else 0.0,
+    }
+
+
+def cache_key(version: int, path: str, query_string: bytes) -> str:
+    """Clé : version des données + chemin + paramètres non vides triés"""
+    params = sorted(parse_qsl(query_string.decode("latin-1")))
+    return f"v{version}:{path}?{urlencode(params)}"
+
+
+def strong_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidats = [valeur.strip() for valeur in if_none_match.split(",")]
+    return "*" in candidats or etag in candidats
+
+
+class ResponseCacheMiddleware:
+    """
+    Middleware ASGI de cache des GET sur /signalements.
+
+    Une réponse 200 est conservée sous une clé qui inclut la version des
+    données : toute écriture (voir mark_signalements_changed) incrémente la
+    version et rend les entrées précédentes inaccessibles. Les réponses
+    portent un ETag fort (celui posé par la route, sinon un hash du corps) ;
+    un If-None-Match correspondant à une entrée en cache reçoit un 304 sans
+    aucune requête PostgreSQL.
+
+    Une réponse lue sur un réplica (request.state.db_source) peut précéder
+    la dernière écriture tant que le réplica n'a pas rejoué celle-ci : elle
+    n'est pas conservée si une écriture date de moins de
+    READ_YOUR_WRITES_SECONDS, sinon elle resterait sous la nouvelle version.
+    """
+
+    def __init__(self, app, backend=None, ttl: Optional[float] = None, max_body: Optional[int] = None):
+        self.app = app
+        self.backend = backend
+        self.ttl = settings.response_cache_ttl if ttl is None else ttl
+        self.max_body = settings.response_cache_max_body if max_body is None else max_body
+
+    def _cacheable(self, scope) -> bool:
+        if scope["type"] != "http" or scope["method"] != "GET" or self.backend is None:
+            return False
+        path = scope["path"]
+        # ?profile=1 mesure un vrai traitement : jamais servi depuis le cache
+        if b"profile=" in scope["query_string"]:
+            return False
+        return path.startswith(CACHED_PREFIX) and not path.endswith(UNCACHED_PATHS)
+
+    def _storable(self, scope) -> bool:
+        source = scope.get("state", {}).get("db_source", "primary")
+        return source == "primary" or not changed_within(settings.read_your_writes_seconds)
+
+    async def _backend(self, methode, *args):
+        if not self.backend.blocking:
+            return methode(*args)
+        try:
+            return await run_in_threadpool(methode, *args)
+        except Exception as e:
+            # Cache partagé indisponible : la requête est servie sans cache
+            logger.warning("Cache des réponses indisponible : %s", e)
+            return None
+
+    async def __call__(self, scope, receive, send):
+        if not self._cacheable(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        version = await self._backend(self.backend.version)
+        if version is None:
+            await self.app(scope, receive, send)
+            return
+        key = cache_key(version, scope["path"], scope["query_string"])
+
+        entree = await self._backend(self.backend.get, key)
+        if entree is not None:
+            compteurs["hits"] += 1
+            await self._send_cached(send, entree, if_none_match, b"HIT")
+            return
+        compteurs["misses"] += 1
+
+        start = None
+        morceaux: List[bytes] = []
+        taille = 0
+        transparent = False
+
+        async def capture(message):
+            nonlocal start, taille, transparent
+            if transparent:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                if start["status"] != 200:
+                    transparent = True
+                    await send(message)
+                return
+            morceaux.append(message.get("body", b""))
+            taille += len(morceaux[-1])
+            if taille > self.max_body:
+                # Trop volumineux pour le cache : on relaie tel quel
+                transparent = True
+                await send(start)
+                await send({
+                    "type": "http.response.body",
+                    "body": b"".join(morceaux),
+                    "more_body": message.get("more_body", False),
+                })
+                return
+            if not message.get("more_body", False):
+                body = b"".join(morceaux)
+                headers = MutableHeaders(raw=list(start["headers"]))
+                etag = headers.get("etag") or strong_etag(body)
+                headers["ETag"] = etag
+                headers["Cache-Control"] = "no-cache"
+                entree = CachedResponse(200, headers.raw, body, etag)
+                if self._storable(scope):
+                    await self._backend(self.backend.set, key, entree, self.ttl)
+                await self._send_cached(send, entree, if_none_match, b"MISS")
+
+        await self.app(scope, receive, capture)
+
+    async def _send_cached(self, send, entree: CachedResponse, if_none_match: Optional[str], statut_cache: bytes):
+        if etag_matches(if_none_match, entree.etag):
+            compteurs["not_modified"] += 1
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [
+                    (b"etag", entree.etag.encode("latin-1")),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-cache", statut_cache),
+                ],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await send({
+            "type": "http.response.start",
+            "status": entree.status,
+            "headers": entree.headers + [(b"x-cache", statut_cache)],
+        })
+        await send({"type": "http.response.body", "body": entree.body})
+
+
+# =====================================
+# Invalidation sur écriture des signalements
+# =====================================
+
+def mark_signalements_changed(session) -> None:
+    """À appeler avant le commit d'une écriture : la version change au commit"""
+    session.info["signalements_modifies"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_version(session):
+    if not session.info.pop("signalements_modifies", False):
+        return
+    note_signalements_changed()
+    if response_cache is not None:
+        try:
+            response_cache.bump_version()
+        except Exception as e:
+            # L'écriture est validée : les entrées expireront au bout du ttl
+            logger.warning("Invalidation du cache des réponses impossible : %s", e)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_version(session):
+    session.info.pop("signalements_modifies", None)
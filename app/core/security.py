@@ -0,0 +1,115 @@
+# =====================================
+# app/core/security.py - Hachage des mots de passe (bcrypt)
+# =====================================
+
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from app.core.config import settings
+from app.core.metrics import counter, gauge
+
+logger = logging.getLogger(__name__)
+
+HASH_PENDING = gauge("login_hash_pending", "Opérations bcrypt en cours ou en attente dans le pool")
+HASH_MAX_PENDING = gauge("login_hash_max_pending", "Opérations bcrypt admises au plus (LOGIN_MAX_PENDING)")
+HASH_REJECTED = counter("login_hash_rejected_total", "Opérations bcrypt refusées, pool saturé")
+
+
+class PasswordPoolSaturated(Exception):
+    """Trop de vérifications de mot de passe en attente (tempête de connexions)"""
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Vérifie un mot de passe avec bcrypt"""
+    try:
+        password_bytes = plain_password.encode('utf-8')
+        hashed_bytes = hashed_password.encode('utf-8')
+        return bcrypt.checkpw(password_bytes, hashed_bytes)
+    except Exception as e:
+        logger.warning("Erreur de vérification du mot de passe : %s", e)
+        return False
+
+
+def get_password_hash(password: str) -> str:
+    """Hash un mot de passe avec bcrypt (coût BCRYPT_ROUNDS)"""
+    password_bytes = password.encode('utf-8')
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
+    hashed = bcrypt.hashpw(password_bytes, salt)
+    return hashed.decode('utf-8')
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Vrai si le hash a été produit avec un coût inférieur à BCRYPT_ROUNDS"""
+    try:
+        # Format : $2b$<coût>$<sel+hash>
+        return int(hashed_password.split("$")[2]) < settings.bcrypt_rounds
+    except (IndexError, ValueError):
+        return False
+
+
+class PasswordHasherPool:
+    """
+    Pool borné de threads pour bcrypt.
+
+    bcrypt libère le GIL pendant le calcul : quelques threads suffisent à
+    occuper les cœurs sans bloquer la boucle d'événements. Au-delà de
+    `max_pending` opérations en cours ou en attente, les nouvelles demandes
+    sont refusées (PasswordPoolSaturated) au lieu de s'accumuler.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def pending(self) -> int:
+        """Profondeur de la file : opérations en cours + en attente"""
+        return self._pending
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                HASH_REJECTED.inc()
+                raise PasswordPoolSaturated()
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+password_pool = PasswordHasherPool(
+    workers=settings.password_hash_workers or min(4, os.cpu_count() or 1),
+    max_pending=settings.login_max_pending,
+)
+HASH_PENDING.set_function(lambda: password_pool.pending)
+HASH_MAX_PENDING.set(password_pool.max_pending)
@@ -0,0 +1,148 @@
+# =====================================
+# app/core/token_cache.py - Cache des utilisateurs authentifiés
+# =====================================
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Set
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.models.models import User
+
+# Canal PostgreSQL NOTIFY utilisé pour propager les invalidations entre workers
+INVALIDATION_CHANNEL = "auth_invalidation"
+
+
+class TokenCache:
+    """
+    Cache LRU borné avec expiration des utilisateurs validés par token.
+
+    La clé est (sub, iat) du JWT : un même token n'interroge la base qu'une
+    fois par période `ttl`. Une entrée n'est jamais conservée au-delà de
+    l'expiration du token. invalidate_user() purge toutes les entrées d'un
+    utilisateur (désactivation, changement de rôle).
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._par_utilisateur: Dict[str, Set[Hashable]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[dict]:
+        if self.max_size <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            principal, expire_a = entry
+            if expire_a <= time.monotonic():
+                self._retirer(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return principal
+
+    def set(self, key: Hashable, principal: dict, token_exp: Optional[float] = None) -> None:
+        if self.max_size <= 0:
+            return
+        expire_a = time.monotonic() + self.ttl
+        if token_exp is not None:
+            expire_a = min(expire_a, time.monotonic() + (token_exp - time.time()))
+        with self._lock:
+            self._retirer(key)
+            self._entries[key] = (principal, expire_a)
+            self._par_utilisateur.setdefault(principal["username"], set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._retirer(next(iter(self._entries)))
+
+    def invalidate_user(self, username: str) -> None:
+        with self._lock:
+            for key in list(self._par_utilisateur.get(username, ())):
+                self._retirer(key)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._par_utilisateur.clear()
+
+    def _retirer(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        cles = self._par_utilisateur.get(entry[0]["username"])
+        if cles is not None:
+            cles.discard(key)
+            if not cles:
+                del self._par_utilisateur[entry[0]["username"]]
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+principal_cache = TokenCache(settings.token_cache_size, settings.token_cache_ttl)
+
+
+# =====================================
+# Invalidation sur modification d'un utilisateur
+# =====================================
+
+_CHAMPS_SENSIBLES = ("is_active", "role", "username")
+
+
+def _a_invalider(session: Session, username: str, connection) -> None:
+    """Invalide localement après commit, et publie sur le canal si activé"""
+    session.info.setdefault("auth_invalidations", set()).add(username)
+    if settings.token_cache_pubsub:
+        # NOTIFY est transactionnel : livré aux autres workers au commit
+        connection.execute(
+            text("SELECT pg_notify(:canal, :username)"),
+            {"canal": INVALIDATION_CHANNEL, "username": username}
+        )
+
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target):
+    etat = inspect(target)
+    if not any(etat.attrs[champ].history.has_changes() for champ in _CHAMPS_SENSIBLES):
+        return
+    session = object_session(target)
+    anciens_noms = etat.attrs.username.history.deleted or []
+    for username in {target.username, *anciens_noms}:
+        _a_invalider(session, username, connection)
+
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target):
+    _a_invalider(object_session(target), target.username, connection)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session):
+    for username in session.info.pop("auth_invalidations", ()):
+        principal_cache.invalidate_user(username)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session):
+    session.info.pop("auth_invalidations", None)
@@ -1,24 +1,113 @@
 from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+from starlette.responses import Response
 from app.core.config import settings
+from app.core.db_pool import engine_options, instrument_engine, probe_options
+from app.core.metrics import counter, gauge
+import itertools
+import logging
+import math
 import time
 
+logger = logging.getLogger(__name__)
+
 # Configuration de la base de données
 DATABASE_URL = settings.database_url_formatted
 
-engine = create_engine(
-    DATABASE_URL,
-    #echo=settings.debug,
-    pool_pre_ping=True,
-    pool_recycle=300,
-    connect_args={
-        "connect_timeout": 10,  # Timeout de connexion
-        "application_name": "event_form_api"
-    }
-)
-
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Les engines sont créés au premier usage et non à l'import : l'import de
+# l'application reste sans effet de bord (démarrage des workers, fork)
+_engine = None
+_async_engine = None
+
+def get_engine():
+    """Engine synchrone, créé au premier appel"""
+    global _engine
+    if _engine is None:
+        # Taille du pool, pre-ping et statement_timeout : voir Settings (DB_POOL_*, DB_PRE_PING...)
+        _engine = create_engine(
+            DATABASE_URL,
+            #echo=settings.debug,
+            **engine_options()
+        )
+        instrument_engine(_engine, "primary")
+    return _engine
+
+def get_async_engine():
+    """Engine asyncpg (DATABASE_ASYNC=true), créé au premier appel"""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            settings.database_url_async,
+            **engine_options(asyncpg=True)
+        )
+        instrument_engine(_async_engine.sync_engine, "async")
+    return _async_engine
+
+_replica_engines = None
+
+def get_replica_engines() -> list:
+    """Engines des réplicas en lecture (DATABASE_REPLICA_URLS), créés au premier appel"""
+    global _replica_engines
+    if _replica_engines is None:
+        engines = []
+        for numero, url in enumerate(settings.database_replica_urls, start=1):
+            replica = create_engine(url, **engine_options())
+            instrument_engine(replica, f"replica{numero}")
+            engines.append(replica)
+        _replica_engines = engines
+    return _replica_engines
+
+_async_replica_engines = None
+
+def get_async_replica_engines() -> list:
+    """Engines asyncpg des réplicas (DATABASE_ASYNC=true), créés au premier appel"""
+    global _async_replica_engines
+    if _async_replica_engines is None:
+        engines = []
+        for numero, url in enumerate(settings.database_replica_urls, start=1):
+            replica = create_async_engine(
+                url.replace("postgresql://", "postgresql+asyncpg://", 1),
+                **engine_options(asyncpg=True)
+            )
+            instrument_engine(replica.sync_engine, f"async_replica{numero}")
+            engines.append(replica)
+        _async_replica_engines = engines
+    return _async_replica_engines
+
+def __getattr__(name):
+    # Compatibilité : `from app.database import engine` crée l'engine à ce moment
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        return get_async_engine() if settings.database_async else None
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class LazySessionmaker(sessionmaker):
+    """sessionmaker lié à l'engine lors de la première session ouverte"""
+
+    def __init__(self, engine_factory, **kw):
+        super().__init__(**kw)
+        self._engine_factory = engine_factory
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=self._engine_factory())
+        return super().__call__(**local_kw)
+
+class LazyAsyncSessionmaker(async_sessionmaker):
+    def __init__(self, engine_factory, **kw):
+        super().__init__(**kw)
+        self._engine_factory = engine_factory
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=self._engine_factory())
+        return super().__call__(**local_kw)
+
+SessionLocal = LazySessionmaker(get_engine, autocommit=False, autoflush=False)
 Base = declarative_base()
 
 def get_db():
@@ -28,43 +117,347 @@ def get_db():
     finally:
         db.close()
 
-def check_database_health(max_retries=5, retry_delay=2):
+# =====================================
+# Routage des lectures vers les réplicas
+# =====================================
+
+READ_ROUTED = counter("db_read_sessions_total", "Sessions de lecture ouvertes, par destination (primary, replicaN)")
+REPLICA_LAG = gauge("db_replica_lag_seconds", "Retard de réplication mesuré par la dernière sonde")
+REPLICA_USABLE = gauge("db_replica_usable", "1 si le réplica reçoit des lectures (sain, à jour, sonde récente)")
+
+# Retard de rejeu : nul si tout le WAL reçu est rejoué et que la réception est
+# active ; sinon âge de la dernière transaction rejouée. Un serveur qui n'est
+# pas en recovery (instance indépendante, essais) est considéré à jour.
+REPLICA_LAG_SQL = text("""
+SELECT pg_is_in_recovery() AS en_recovery,
+       CASE
+           WHEN NOT pg_is_in_recovery() THEN 0
+           WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+                AND EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN 0
+           ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+       END AS retard
+""")
+
+# Jeton read-your-writes posé par les écritures : horodatage Unix jusqu'auquel
+# les lectures du client restent sur le primaire. Renvoyé par le client dans
+# l'en-tête X-Read-After (appels fetch cross-origin, sans cookies) ou, pour
+# les clients qui gardent les cookies, dans le cookie rw_primary
+READ_YOUR_WRITES_HEADER = "X-Read-After"
+READ_YOUR_WRITES_COOKIE = "rw_primary"
+
+
+class ReplicaState:
+    def __init__(self, name: str, engine, async_engine=None):
+        self.name = name
+        self.engine = engine
+        self.async_engine = async_engine
+        self.healthy = False
+        self.in_recovery = None
+        self.lag = None
+        self.checked_at = None
+        self.error = None
+
+    def usable(self) -> bool:
+        """Sain, retard sous REPLICA_MAX_LAG, et sondé récemment (une sonde bloquée ne garde pas le réplica)"""
+        return (
+            self.healthy
+            and self.lag is not None
+            and self.lag <= settings.replica_max_lag
+            and self.checked_at is not None
+            and time.monotonic() - self.checked_at <= 3 * settings.replica_check_interval
+        )
+
+
+class ReplicaRouter:
+    """
+    Choix de l'engine des sessions de lecture.
+
+    Chaque worker sonde ses réplicas toutes les REPLICA_CHECK_INTERVAL
+    secondes (run(), démarré au startup) : disponibilité et retard de
+    réplication. Les lectures sont réparties à tour de rôle entre les
+    réplicas utilisables ; sans réplica utilisable (aucun configuré, tous
+    en panne ou en retard), elles vont au primaire. Un réplica dont la
+    connexion échoue pendant une requête est écarté jusqu'à la sonde
+    suivante réussie.
+    """
+
+    def __init__(self):
+        self._replicas = None
+        self._tour = itertools.count()
+        self._task = None
+
+    @property
+    def replicas(self) -> list:
+        if self._replicas is None:
+            engines = get_replica_engines()
+            async_engines = get_async_replica_engines() if settings.database_async else [None] * len(engines)
+            self._replicas = [
+                ReplicaState(f"replica{numero}", replica, async_replica)
+                for numero, (replica, async_replica) in enumerate(zip(engines, async_engines), start=1)
+            ]
+            for replica in self._replicas:
+                REPLICA_LAG.set_function(lambda r=replica: r.lag if r.lag is not None else -1, replica=replica.name)
+                REPLICA_USABLE.set_function(lambda r=replica: 1 if r.usable() else 0, replica=replica.name)
+        return self._replicas
+
+    def choose(self):
+        utilisables = [replica for replica in self.replicas if replica.usable()]
+        if not utilisables:
+            return None
+        return utilisables[next(self._tour) % len(utilisables)]
+
+    def mark_failed(self, replica: ReplicaState, error: Exception) -> None:
+        if replica.healthy:
+            logger.warning("Réplica %s écarté : %s", replica.name, error)
+        replica.healthy = False
+        replica.error = str(error) or type(error).__name__
+
+    def check(self) -> None:
+        """Sonde chaque réplica (bloquant : appelé dans un thread par run())"""
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as connection:
+                    row = connection.execute(REPLICA_LAG_SQL).one()
+            except Exception as e:
+                self.mark_failed(replica, e)
+            else:
+                if not replica.healthy:
+                    logger.info("Réplica %s disponible (retard %.1fs)", replica.name, row.retard)
+                replica.healthy = True
+                replica.in_recovery = row.en_recovery
+                replica.lag = float(row.retard)
+                replica.error = None
+            replica.checked_at = time.monotonic()
+
+    async def run(self) -> None:
+        import asyncio
+        from starlette.concurrency import run_in_threadpool
+
+        while True:
+            try:
+                await run_in_threadpool(self.check)
+            except Exception:
+                logger.exception("Sonde des réplicas interrompue")
+            await asyncio.sleep(settings.replica_check_interval)
+
+    def start(self) -> None:
+        """Lance les sondes dans la boucle d'événements du worker (si des réplicas sont configurés)"""
+        import asyncio
+
+        if self.replicas and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> list:
+        return [
+            {
+                "name": replica.name,
+                "usable": replica.usable(),
+                "healthy": replica.healthy,
+                "in_recovery": replica.in_recovery,
+                "lag_seconds": None if replica.lag is None else round(replica.lag, 3),
+                "error": replica.error,
+            }
+            for replica in self.replicas
+        ]
+
+
+replica_router = ReplicaRouter()
+
+
+def wrote_recently(jeton) -> bool:
+    """Vrai si le jeton read-your-writes n'a pas expiré (au plus READ_YOUR_WRITES_SECONDS à venir)"""
+    try:
+        reste = float(jeton) - time.time()
+    except (TypeError, ValueError):
+        return False
+    return 0 < reste <= settings.read_your_writes_seconds
+
+
+def reads_on_primary(request: Request) -> bool:
+    """Vrai si le client vient d'écrire (en-tête X-Read-After ou cookie rw_primary)"""
+    return (
+        wrote_recently(request.headers.get(READ_YOUR_WRITES_HEADER))
+        or wrote_recently(request.cookies.get(READ_YOUR_WRITES_COOKIE))
+    )
+
+
+def mark_write(response: Response) -> None:
+    """
+    Avec des réplicas, pose le jeton read-your-writes (en-tête X-Read-After
+    et cookie) qui garde les lectures du client sur le primaire pendant
+    READ_YOUR_WRITES_SECONDS.
+    """
+    if settings.database_replica_urls:
+        jeton = f"{time.time() + settings.read_your_writes_seconds:.3f}"
+        response.headers[READ_YOUR_WRITES_HEADER] = jeton
+        response.set_cookie(
+            READ_YOUR_WRITES_COOKIE,
+            jeton,
+            max_age=math.ceil(settings.read_your_writes_seconds),
+            httponly=True,
+            samesite="lax",
+        )
+
+
+def open_read_session(request: Request):
+    """
+    Session de lecture pour `request` : un réplica utilisable, sinon le
+    primaire. Un client qui vient d'écrire (en-tête X-Read-After ou cookie
+    rw_primary) lit sur le primaire. La connexion est prise dès l'ouverture : un réplica
+    injoignable bascule la requête sur le primaire au lieu d'échouer.
+    Retourne une session à fermer par l'appelant ; la destination est
+    notée dans request.state.db_source.
+    """
+    replica = None
+    if settings.database_replica_urls and not reads_on_primary(request):
+        replica = replica_router.choose()
+    if replica is not None:
+        db = SessionLocal(bind=replica.engine)
+        try:
+            db.connection()
+        except Exception as e:
+            db.close()
+            replica_router.mark_failed(replica, e)
+        else:
+            request.state.db_source = replica.name
+            READ_ROUTED.inc(source=replica.name)
+            return db
+    request.state.db_source = "primary"
+    READ_ROUTED.inc(source="primary")
+    return SessionLocal()
+
+
+def get_read_db(request: Request):
+    """Dépendance des routes GET : session de lecture (voir open_read_session)"""
+    db = open_read_session(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_write_db(response: Response):
+    """Dépendance des routes d'écriture : session sur le primaire (voir mark_write)"""
+    mark_write(response)
+    yield from get_db()
+
+# Pile asynchrone (asyncpg), utilisée uniquement si DATABASE_ASYNC=true
+AsyncSessionLocal = None
+
+if settings.database_async:
+    AsyncSessionLocal = LazyAsyncSessionmaker(
+        get_async_engine, autoflush=False, expire_on_commit=False
+    )
+
+def dispose_engines():
+    """Ferme les connexions des pools (arrêt du worker, après un fork)"""
+    if _engine is not None:
+        _engine.dispose()
+    if _async_engine is not None:
+        _async_engine.sync_engine.dispose()
+    for replica in _replica_engines or []:
+        replica.dispose()
+    for replica in _async_replica_engines or []:
+        replica.sync_engine.dispose()
+
+def reset_engines_after_fork():
+    """
+    À appeler dans un processus fils (post_fork de gunicorn) : les connexions
+    héritées du parent sont abandonnées sans être fermées (elles restent au
+    parent) et le fils ouvre les siennes dans un pool neuf.
+    """
+    if _engine is not None:
+        _engine.dispose(close=False)
+    if _async_engine is not None:
+        _async_engine.sync_engine.dispose(close=False)
+    for replica in _replica_engines or []:
+        replica.dispose(close=False)
+    for replica in _async_replica_engines or []:
+        replica.sync_engine.dispose(close=False)
+
+_probe_engines = {}
+
+def _probe_engine(timeout: float, asyncpg: bool):
+    """Engine de la sonde /ready (sans pool), créé au premier appel"""
+    if asyncpg not in _probe_engines:
+        if asyncpg:
+            _probe_engines[asyncpg] = create_async_engine(settings.database_url_async, **probe_options(timeout, True))
+        else:
+            _probe_engines[asyncpg] = create_engine(DATABASE_URL, **probe_options(timeout))
+    return _probe_engines[asyncpg]
+
+async def check_database_ready(timeout: float = 2.0) -> dict:
     """
-    Vérifier la santé de la base de données avec retry automatique
+    Sonde de disponibilité (/ready) : SELECT 1 borné par `timeout`, sans
+    bloquer la boucle d'événements ni réessayer. La sonde ouvre sa propre
+    connexion, hors pool : la connexion et la requête sont elles-mêmes
+    bornées (connect_timeout, statement_timeout), un thread de sonde ne
+    reste donc pas bloqué au-delà du délai pendant une panne.
     """
-    for attempt in range(max_retries):
+    import asyncio
+    from starlette.concurrency import run_in_threadpool
+
+    limite = text(f"SET LOCAL statement_timeout = {max(1, int(timeout * 1000))}")
+
+    def ping_sync():
+        with _probe_engine(timeout, False).connect() as connection:
+            connection.execute(limite)
+            connection.execute(text("SELECT 1"))
+
+    async def ping_async():
+        async with _probe_engine(timeout, True).connect() as connection:
+            await connection.execute(limite)
+            await connection.execute(text("SELECT 1"))
+
+    debut = time.perf_counter()
+    try:
+        if settings.database_async:
+            await asyncio.wait_for(ping_async(), timeout)
+        else:
+            await asyncio.wait_for(run_in_threadpool(ping_sync), timeout)
+    except Exception as e:
+        return {"status": "unavailable", "error": str(e) or type(e).__name__}
+    return {"status": "ok", "latency_ms": round((time.perf_counter() - debut) * 1000, 2)}
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def open_async_read_session(request: Request):
+    """Variante asynchrone de open_read_session (DATABASE_ASYNC=true)"""
+    replica = None
+    if settings.database_replica_urls and not reads_on_primary(request):
+        replica = replica_router.choose()
+    if replica is not None:
+        db = AsyncSessionLocal(bind=replica.async_engine)
         try:
-            print(f"Tentative de connexion {attempt + 1}/{max_retries}...")
-            
-            # Tenter une connexion et une requête simple
-            with engine.connect() as connection:
-                result = connection.execute(text("SELECT 1 as health_check"))
-                row = result.fetchone()
-                
-                if row and row[0] == 1:
-                    return {
-                        "status": "healthy",
-                        "message": f"Base de données accessible (tentative {attempt + 1})",
-                        "database_url": DATABASE_URL.replace(settings.postgres_password, "***"),
-                        "attempt": attempt + 1
-                    }
-        
+            await db.connection()
         except Exception as e:
-            print(f"Erreur tentative {attempt + 1}: {str(e)}")
-            
-            if attempt < max_retries - 1:
-                print(f"Attente de {retry_delay} secondes avant nouvelle tentative...")
-                time.sleep(retry_delay)
-            else:
-                return {
-                    "status": "unhealthy", 
-                    "message": f"Erreur après {max_retries} tentatives: {str(e)}",
-                    "database_url": DATABASE_URL.replace(settings.postgres_password, "***"),
-                    "attempts": max_retries
-                }
-    
-    return {
-        "status": "unhealthy",
-        "message": "Échec après toutes les tentatives",
-        "attempts": max_retries
-    }
\ No newline at end of file
+            await db.close()
+            replica_router.mark_failed(replica, e)
+        else:
+            request.state.db_source = replica.name
+            READ_ROUTED.inc(source=replica.name)
+            return db
+    request.state.db_source = "primary"
+    READ_ROUTED.inc(source="primary")
+    return AsyncSessionLocal()
+
+async def get_async_read_db(request: Request):
+    """Dépendance des routes GET de la pile asynchrone (voir open_read_session)"""
+    db = await open_async_read_session(request)
+    try:
+        yield db
+    finally:
+        await db.close()
+
+async def get_async_write_db(response: Response):
+    """Dépendance des routes d'écriture de la pile asynchrone (voir mark_write)"""
+    mark_write(response)
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,10 +1,25 @@
+import logging
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.database import engine, Base
-from app.core.config import settings
+from app.database import check_database_ready, dispose_engines, replica_router
+from app.core.config import log_settings, settings
+from app.core.logging_config import configure_logging
+from app.core.instrumentation import MetricsMiddleware
+from app.core.live_feed import SIGNALEMENTS_CHANNEL, live_feed
+from app.core.metrics import CONTENT_TYPE, REGISTRY
+from app.core.pubsub import pg_listener
+from app.core.response_cache import (
+    MemoryCacheBackend, ResponseCacheMiddleware, cache_stats, note_signalements_changed, response_cache
+)
+from app.core.token_cache import INVALIDATION_CHANNEL, principal_cache
+from app.services.geocoding import geocoder
 from app.api.v1.api import api_router
 
+logger = logging.getLogger("app")
+
 app = FastAPI(
     title=settings.app_name,
     description="API pour le système de signalement - République de Djibouti",
@@ -13,8 +28,9 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
-print(f"🔧 CORS Origins: {settings.cors_origins}")
-print(f"🔧 CORS Credentials: {'*' not in settings.cors_origins}")
+# Cache des GET /signalements (ajouté avant CORS : les en-têtes CORS sont
+# posés par-dessus les réponses servies depuis le cache)
+app.add_middleware(ResponseCacheMiddleware, backend=response_cache)
 
 # Configuration CORS
 app.add_middleware(
@@ -23,14 +39,53 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "X-Total-Count", "X-Total-Count-Estimate", "X-Next-Cursor", "ETag", "Server-Timing", "X-Read-After"
+    ],
 )
 
+# Métriques par route (ajouté en dernier : englobe CORS et le cache)
+app.add_middleware(MetricsMiddleware)
+
 # Inclure le routeur principal API v1
 if api_router is not None:
     app.include_router(api_router, prefix="/api/v1")
-    print("✅ Routeurs API inclus")
 else:
-    print("⚠️ Routeurs API non inclus - mode minimal")
+    logger.warning("Routeurs API non inclus - mode minimal")
+
+@app.on_event("startup")
+async def start_listeners():
+    configure_logging()
+    log_settings(logger)
+    logger.info("CORS : origines %s", settings.cors_origins)
+    # Invalidation du cache des tokens partagée entre workers
+    if settings.token_cache_pubsub:
+        pg_listener.subscribe(INVALIDATION_CHANNEL, principal_cache.invalidate_user)
+        pg_listener.on_reconnect(principal_cache.clear)
+    # Flux temps réel : diffusion aux clients SSE du worker
+    if settings.live_feed:
+        pg_listener.subscribe(SIGNALEMENTS_CHANNEL, live_feed.publish)
+        pg_listener.on_reconnect(live_feed.resync_all)
+        # Écritures des autres workers : lectures sur réplica non mises en cache juste après
+        pg_listener.subscribe(SIGNALEMENTS_CHANNEL, lambda payload: note_signalements_changed())
+        # Le cache mémoire de ce worker suit aussi les écritures des autres workers
+        if isinstance(response_cache, MemoryCacheBackend):
+            pg_listener.subscribe(SIGNALEMENTS_CHANNEL, lambda payload: response_cache.bump_version())
+            pg_listener.on_reconnect(response_cache.bump_version)
+    # LISTEN via PgBouncer (mode transaction) : aucune notification ne serait reçue
+    if (settings.token_cache_pubsub or settings.live_feed) and settings.check_listen_url(logger):
+        await pg_listener.start()
+    # Sondes de santé et de retard des réplicas en lecture (DATABASE_REPLICA_URLS)
+    replica_router.start()
+    # Gazetteer du géocodeur rechargé hors des requêtes d'écriture
+    geocoder.start()
+
+@app.on_event("shutdown")
+async def stop_listeners():
+    await geocoder.stop()
+    await replica_router.stop()
+    await pg_listener.stop()
+    dispose_engines()
 
 @app.get("/")
 def read_root():
@@ -46,9 +101,42 @@ def health_check():
     return {
         "status": "healthy", 
         "message": "API Système de Signalement",
-        "version": settings.app_version
+        "version": settings.app_version,
+        "response_cache": cache_stats(),
+        "live_feed": live_feed.stats(),
+        "replicas": replica_router.stats()
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Disponibilité (readiness) : la base répond à un SELECT 1 borné dans le
+    temps. /health reste une simple vivacité (liveness) sans accès à la base.
+    """
+    base = await check_database_ready(settings.ready_timeout)
+    ecoute = settings.token_cache_pubsub or settings.live_feed
+    pret = base["status"] == "ok"
+    return JSONResponse(
+        {
+            "status": "ready" if pret else "not_ready",
+            "database": base,
+            "pg_listener": {"enabled": ecoute, "connected": pg_listener.connected},
+        },
+        status_code=200 if pret else 503,
+    )
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Métriques du worker au format texte Prometheus"""
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
 if __name__ == "__main__":
+    # Production : gunicorn -c gunicorn.conf.py app.main:app (préchargement, N workers)
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=settings.debug,
+        workers=1 if settings.debug else settings.workers,
+    )
\ No newline at end of file
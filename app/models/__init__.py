@@ -1,4 +1,4 @@
 # app/models/__init__.py
 
-from app.models.models import Signalement, User
-__all__ = ["Signalement", "User"]
\ No newline at end of file
+from app.models.models import Gazetteer, OutboxDeadLetter, OutboxEvent, Signalement, SignalementDailyStats, User
+__all__ = ["Gazetteer", "OutboxDeadLetter", "OutboxEvent", "Signalement", "SignalementDailyStats", "User"]
\ No newline at end of file
@@ -1,4 +1,6 @@
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, Enum as SQLEnum, Text, Date, Time
+from sqlalchemy import BigInteger, Boolean, Column, Computed, Float, Index, Integer, String, DateTime, Enum as SQLEnum, Text, Date, Time, text
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
@@ -54,10 +56,131 @@ class Signalement(Base):
     # Commentaire
     commentaire_complementaire = Column(Text, nullable=True)
     
+    # Position géocodée à partir de lieu (table gazetteer), NULL si inconnue
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geohash = Column(String(12), nullable=True)
+    
     # Métadonnées automatiques
-    created_at = Column(DateTime, default=func.now())
-    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    created_at = Column(DateTime, default=func.now(), server_default=func.now())
+    updated_at = Column(DateTime, default=func.now(), server_default=func.now(), onupdate=func.now())
+
+    # Recherche plein texte (français, insensible aux accents), calculée par PostgreSQL
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('french'::regconfig, f_unaccent("
+            "coalesce(lieu, '') || ' ' || coalesce(commentaire_complementaire, '') || ' ' || coalesce(nom_agent, '')"
+            "))",
+            persisted=True
+        )
+    ))
+
+    # Index alignés sur les filtres de l'API (tri par created_at DESC)
+    __table_args__ = (
+        Index("ix_signalements_created_at_id", created_at.desc(), id.desc()),
+        Index("ix_signalements_id_agent_created_at", id_agent, created_at.desc()),
+        Index("ix_signalements_date_created_at", date_signalement, created_at.desc()),
+        Index("ix_signalements_type_created_at", type_evenement, created_at.desc()),
+        Index("ix_signalements_gravite_created_at", gravite, created_at.desc()),
+        Index("ix_signalements_source_created_at", source_information, created_at.desc()),
+        # Recherche : GIN plein texte + trigrammes pour ILIKE et correspondances approchées
+        Index("ix_signalements_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_signalements_lieu_trgm",
+            func.f_unaccent(lieu).label("lieu_unaccent"),
+            postgresql_using="gin",
+            postgresql_ops={"lieu_unaccent": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_signalements_nom_agent_trgm",
+            func.f_unaccent(nom_agent).label("nom_agent_unaccent"),
+            postgresql_using="gin",
+            postgresql_ops={"nom_agent_unaccent": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_signalements_id_agent_trgm",
+            id_agent,
+            postgresql_using="gin",
+            postgresql_ops={"id_agent": "gin_trgm_ops"}
+        ),
+        # Carte : préfixes de geohash (LIKE 'sfn9%') pour les boîtes, rayons et regroupements
+        Index(
+            "ix_signalements_geohash",
+            geohash,
+            postgresql_ops={"geohash": "varchar_pattern_ops"},
+            postgresql_where=text("geohash IS NOT NULL")
+        ),
+    )
+
+
+class SignalementDailyStats(Base):
+    """
+    Agrégat journalier des signalements (table de rollup).
+
+    Une ligne par (date, type, gravité, source), tenue à jour de façon
+    incrémentale par le CRUD et reconstructible avec refresh_stats.py.
+    """
+    __tablename__ = "signalement_daily_stats"
+
+    date_signalement = Column(Date, primary_key=True)
+    type_evenement = Column(SQLEnum(TypeEvenement), primary_key=True)
+    gravite = Column(SQLEnum(GraviteEvenement), primary_key=True)
+    source_information = Column(SQLEnum(SourceInformation), primary_key=True)
+    nombre = Column(Integer, nullable=False, default=0)
+
+
+class Gazetteer(Base):
+    """
+    Référentiel des lieux de Djibouti (quartiers, villes, localités) servant
+    au géocodage de Signalement.lieu. Une ligne par graphie reconnue : les
+    variantes d'un même lieu ont chacune leur clé.
+    """
+    __tablename__ = "gazetteer"
+
+    cle = Column(String(200), primary_key=True)  # nom normalisé (normalize_lieu)
+    nom = Column(String(200), nullable=False)
+    region = Column(String(100), nullable=True)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+
+
+class OutboxEvent(Base):
+    """
+    Traitement différé d'une écriture sur signalements (outbox transactionnelle).
+
+    Inséré dans la transaction de l'écriture : il n'existe que si elle est
+    validée. outbox_worker.py le traite hors requête puis le supprime ; en
+    cas d'échec il est repris plus tard (available_at), puis déplacé dans
+    outbox_dead_letters après OUTBOX_MAX_ATTEMPTS tentatives.
+    """
+    __tablename__ = "outbox_events"
+
+    id = Column(BigInteger, primary_key=True)
+    topic = Column(String(100), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    available_at = Column(DateTime, nullable=False, server_default=func.now())
+    attempts = Column(Integer, nullable=False, server_default=text("0"))
+    last_error = Column(Text, nullable=True)
+
+    # File des workers : événements disponibles dans l'ordre d'insertion
+    __table_args__ = (
+        Index("ix_outbox_events_available_at_id", available_at, id),
+    )
+
+
+class OutboxDeadLetter(Base):
+    """Événement de l'outbox abandonné après trop d'échecs (rejouable avec outbox_worker.py --requeue)"""
+    __tablename__ = "outbox_dead_letters"
 
+    id = Column(BigInteger, primary_key=True)  # id d'origine dans outbox_events
+    topic = Column(String(100), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    attempts = Column(Integer, nullable=False)
+    last_error = Column(Text, nullable=True)
+    failed_at = Column(DateTime, nullable=False, server_default=func.now())
 
 
 class User(Base):
@@ -1,9 +1,11 @@
 
-from .schemas import SignalementBase, SignalementCreate, SignalementUpdate, SignalementResponse
+from .schemas import SignalementBase, SignalementCreate, SignalementUpdate, SignalementResponse, BulkItemResult, BulkResponse
 
 __all__ = [
     "SignalementBase",
     "SignalementCreate", 
     "SignalementUpdate",
-    "SignalementResponse"
+    "SignalementResponse",
+    "BulkItemResult",
+    "BulkResponse"
 ]
\ No newline at end of file
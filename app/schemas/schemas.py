@@ -1,7 +1,7 @@
 import re
 from pydantic import BaseModel, Field, validator
 from datetime import date, time, datetime
-from typing import Optional
+from typing import List, Optional
 from app.models.models import TypeEvenement, GraviteEvenement, SourceInformation, ActionEntreprise
 
 class SignalementBase(BaseModel):
@@ -55,8 +55,23 @@ class SignalementUpdate(BaseModel):
     action_autre: Optional[str] = Field(None, max_length=200)
     commentaire_complementaire: Optional[str] = None
 
+class BulkItemResult(BaseModel):
+    """Résultat d'un élément de POST /signalements/bulk"""
+    index: int
+    status: str  # "created" ou "invalid"
+    id: Optional[int] = None
+    errors: Optional[List[dict]] = None
+
+class BulkResponse(BaseModel):
+    created: int
+    invalid: int
+    results: List[BulkItemResult]
+
 class SignalementResponse(SignalementBase):
     id: int
+    # Position géocodée à partir de lieu (None si le lieu est inconnu du gazetteer)
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     created_at: datetime
     updated_at: datetime
 
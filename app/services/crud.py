@@ -1,21 +1,617 @@
+import base64
+import json
+from collections import Counter
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
-from typing import List, Optional
-from datetime import datetime, timedelta, date  
-from app.models import Signalement
-from app.schemas import SignalementCreate, SignalementUpdate
+from sqlalchemy import DateTime, and_, or_, cast, delete, func, insert, literal_column, select, text, tuple_, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, date
+from app.core.live_feed import build_event, notify_signalements
+from app.core.response_cache import mark_signalements_changed
+from app.models import Signalement, SignalementDailyStats
+from app.models.models import GraviteEvenement, SourceInformation, TypeEvenement
+from app.schemas import SignalementCreate, SignalementResponse, SignalementUpdate
+from app.services.geo import EARTH_RADIUS_M, bbox_cover, radius_bbox
+from app.services.geocoding import geocoder, select_gazetteer
+from app.services.outbox import enqueue_statements
+
+# Colonnes formant la clé du rollup journalier
+STATS_KEY_COLUMNS = (
+    Signalement.date_signalement,
+    Signalement.type_evenement,
+    Signalement.gravite,
+    Signalement.source_information,
+)
+
+
+def encode_cursor(signalement: Signalement) -> str:
+    """Curseur opaque désignant la position d'un signalement dans la liste"""
+    brut = json.dumps([signalement.created_at.isoformat(), signalement.id])
+    return base64.urlsafe_b64encode(brut.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Décode un curseur produit par encode_cursor (ValueError si invalide)"""
+    try:
+        brut = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, signalement_id = json.loads(brut)
+        return datetime.fromisoformat(created_at), int(signalement_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Curseur invalide") from e
+
+
+class StaleSignalementError(Exception):
+    """La version attendue (If-Match) n'est plus la version courante du signalement"""
+
+
+def etag_for(signalement) -> str:
+    """ETag fort d'un signalement, dérivé de son id et de updated_at"""
+    return f'"{signalement.id}@{signalement.updated_at.isoformat()}"'
+
+
+def parse_etag(etag: str) -> Tuple[int, datetime]:
+    """Décode un ETag fort produit par etag_for (ValueError si invalide)"""
+    try:
+        signalement_id, updated_at = etag.strip().strip('"').split("@", 1)
+        return int(signalement_id), datetime.fromisoformat(updated_at)
+    except (TypeError, ValueError) as e:
+        raise ValueError("ETag invalide") from e
+
+
+# =====================================
+# Construction des requêtes (partagée par les CRUD sync et async)
+# =====================================
+
+def filter_signalements(
+    query,
+    type_evenement: Optional[str] = None,
+    gravite: Optional[str] = None,
+    nom_agent: Optional[str] = None,
+    source_information: Optional[str] = None,
+    date_debut: Optional[date] = None,
+    date_fin: Optional[date] = None,
+    modele=Signalement
+):
+    """
+    Applique les filtres de la liste des signalements à une requête (Query ou select).
+
+    `modele` peut être SignalementDailyStats pour filtrer le rollup, qui n'a
+    pas de colonne nom_agent.
+    """
+    if type_evenement:
+        query = query.filter(modele.type_evenement == type_evenement)
+    if gravite:
+        query = query.filter(modele.gravite == gravite)
+    if nom_agent:
+        query = query.filter(modele.nom_agent.ilike(f"%{nom_agent}%"))
+    if source_information:
+        query = query.filter(modele.source_information == source_information)
+    if date_debut:
+        query = query.filter(modele.date_signalement >= date_debut)
+    if date_fin:
+        query = query.filter(modele.date_signalement <= date_fin)
+    return query
+
+
+def select_signalements(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[Tuple[datetime, int]] = None,
+    **filtres
+):
+    """
+    Page de signalements, du plus récent au plus ancien.
+
+    Deux modes : OFFSET (`skip`) pour la compatibilité, ou keyset quand
+    `cursor` (created_at, id) est fourni — la page suivante commence
+    strictement après ce couple, quel que soit le rang de la page.
+    """
+    stmt = filter_signalements(select(Signalement), **filtres)
+    if cursor is not None:
+        stmt = stmt.filter(tuple_(Signalement.created_at, Signalement.id) < tuple_(*cursor))
+    elif skip:
+        stmt = stmt.offset(skip)
+    return stmt.order_by(
+        Signalement.created_at.desc(),
+        Signalement.id.desc()
+    ).limit(limit)
+
+
+def select_count(**filtres):
+    """Nombre exact de signalements correspondant aux filtres"""
+    return filter_signalements(select(func.count(Signalement.id)), **filtres)
+
+
+def explain_estimate(**filtres):
+    """
+    EXPLAIN (FORMAT JSON) de la liste filtrée, pour estimer son nombre de lignes.
+
+    La requête est compilée en paramètres nommés puis enveloppée dans text(),
+    ce qui fonctionne quel que soit le driver (psycopg2 ou asyncpg).
+    """
+    stmt = filter_signalements(select(Signalement.id), **filtres)
+    compiled = stmt.compile(dialect=postgresql.dialect(paramstyle="named"))
+    return text("EXPLAIN (FORMAT JSON) " + str(compiled)), compiled.params
+
+
+def plan_rows(plan) -> int:
+    """Nombre de lignes prévu par le planificateur dans un plan EXPLAIN JSON"""
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def select_stats():
+    """
+    Statistiques lues dans la table de rollup signalement_daily_stats,
+    en une seule requête : les répartitions par gravité et par type sont
+    obtenues avec GROUPING SETS, les compteurs temporels avec des agrégats
+    conditionnels (SUM(...) FILTER (WHERE ...)).
+    """
+    aujourdhui = datetime.now().date()
+    hier = aujourdhui - timedelta(days=1)
+    semaine = aujourdhui - timedelta(days=7)
+    mois = aujourdhui - timedelta(days=30)
+
+    def somme(condition=None):
+        total = func.sum(SignalementDailyStats.nombre)
+        if condition is not None:
+            total = total.filter(condition)
+        return func.coalesce(total, 0)
+
+    # GROUPING(gravite, type_evenement) : 1 = ligne "par gravité",
+    # 2 = ligne "par type", 3 = ligne du total général
+    niveau = func.grouping(SignalementDailyStats.gravite, SignalementDailyStats.type_evenement)
+    return select(
+        niveau.label("niveau"),
+        SignalementDailyStats.gravite,
+        SignalementDailyStats.type_evenement,
+        somme().label("total"),
+        somme(SignalementDailyStats.date_signalement == aujourdhui).label("aujourdhui"),
+        somme(SignalementDailyStats.date_signalement == hier).label("hier"),
+        somme(SignalementDailyStats.date_signalement >= semaine).label("cette_semaine"),
+        somme(SignalementDailyStats.date_signalement >= mois).label("ce_mois"),
+    ).group_by(
+        func.grouping_sets(
+            tuple_(SignalementDailyStats.gravite),
+            tuple_(SignalementDailyStats.type_evenement),
+            text("()")
+        )
+    )
+
+
+def stats_from_rows(rows) -> dict:
+    """Met en forme le résultat de select_stats() pour /statistiques"""
+    stats = {
+        "total": 0,
+        "par_gravite": {},
+        "par_type": {},
+        "aujourdhui": 0,
+        "hier": 0,
+        "cette_semaine": 0,
+        "ce_mois": 0
+    }
+    for row in rows:
+        if row.niveau == 1:
+            if row.total:
+                stats["par_gravite"][row.gravite] = row.total
+        elif row.niveau == 2:
+            if row.total:
+                stats["par_type"][row.type_evenement] = row.total
+        else:
+            stats["total"] = row.total
+            stats["aujourdhui"] = row.aujourdhui
+            stats["hier"] = row.hier
+            stats["cette_semaine"] = row.cette_semaine
+            stats["ce_mois"] = row.ce_mois
+    return stats
+
+
+# Séries temporelles (GET /timeseries) : pas des intervalles, plage par
+# défaut et regroupements possibles
+TIMESERIES_STEPS = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1)}
+TIMESERIES_DEFAULT_SPANS = {"hour": timedelta(days=2), "day": timedelta(days=90), "week": timedelta(weeks=52)}
+TIMESERIES_GROUPS = {
+    "gravite": GraviteEvenement,
+    "type_evenement": TypeEvenement,
+    "source_information": SourceInformation,
+}
+TIMESERIES_MAX_BUCKETS = 2000
+
+
+def truncate_datetime(valeur: datetime, bucket: str) -> datetime:
+    """Début de l'intervalle contenant `valeur`, comme date_trunc (semaines ISO, lundi)"""
+    valeur = valeur.replace(minute=0, second=0, microsecond=0)
+    if bucket == "hour":
+        return valeur
+    valeur = valeur.replace(hour=0)
+    if bucket == "week":
+        valeur -= timedelta(days=valeur.weekday())
+    return valeur
+
+
+def timeseries_range(
+    bucket: str,
+    debut: Optional[datetime] = None,
+    fin: Optional[datetime] = None,
+    group_by: Optional[str] = None
+) -> Tuple[datetime, datetime]:
+    """
+    Valide les paramètres d'une série temporelle et renvoie la plage
+    (début aligné sur un intervalle, fin). Les dates sont celles, sans
+    fuseau, de date_signalement + heure_signalement. ValueError si invalide.
+    """
+    if bucket not in TIMESERIES_STEPS:
+        raise ValueError(f"bucket doit valoir {', '.join(TIMESERIES_STEPS)}")
+    if group_by is not None and group_by not in TIMESERIES_GROUPS:
+        raise ValueError(f"group_by doit valoir {', '.join(TIMESERIES_GROUPS)}")
+    fin = (fin or datetime.now()).replace(tzinfo=None)
+    debut = (debut or fin - TIMESERIES_DEFAULT_SPANS[bucket]).replace(tzinfo=None)
+    if debut > fin:
+        raise ValueError("from doit précéder to")
+    debut = truncate_datetime(debut, bucket)
+    if (fin - debut) / TIMESERIES_STEPS[bucket] >= TIMESERIES_MAX_BUCKETS:
+        raise ValueError(f"Plage trop longue : {TIMESERIES_MAX_BUCKETS} intervalles au plus")
+    return debut, fin
+
+
+def select_timeseries(
+    bucket: str,
+    debut: datetime,
+    fin: datetime,
+    group_by: Optional[str] = None,
+    **filtres
+):
+    """
+    Nombre de signalements par intervalle (hour, day, week), éventuellement
+    par gravité, type ou source, sur une plage issue de timeseries_range().
+
+    Les intervalles d'un jour ou plus sont lus dans le rollup journalier
+    (bornes arrondies au jour) ; à l'heure, ou filtrée par agent, la série
+    est calculée sur signalements, la plage de dates limitant les
+    partitions lues. generate_series fournit tous les intervalles : ceux
+    sans signalement sortent avec un groupe NULL et un nombre à 0.
+    """
+    if bucket != "hour" and not filtres.get("nom_agent"):
+        modele = SignalementDailyStats
+        instant = cast(SignalementDailyStats.date_signalement, DateTime)
+        nombre = func.sum(SignalementDailyStats.nombre)
+        bornes = []
+    else:
+        modele = Signalement
+        instant = Signalement.date_signalement + Signalement.heure_signalement
+        nombre = func.count(Signalement.id)
+        bornes = [instant >= debut, instant <= fin]
+    intervalle = func.date_trunc(bucket, instant)
+    cles = [intervalle.label("bucket")]
+    if group_by:
+        cles.append(getattr(modele, group_by).label("groupe"))
+
+    comptes = filter_signalements(
+        select(*cles, nombre.label("nombre")).filter(
+            modele.date_signalement >= debut.date(),
+            modele.date_signalement <= fin.date(),
+            *bornes
+        ),
+        modele=modele,
+        **filtres
+    ).group_by(*[cle.element for cle in cles]).subquery("comptes")
+
+    intervalles = select(
+        func.generate_series(debut, fin, TIMESERIES_STEPS[bucket]).label("bucket")
+    ).subquery("intervalles")
+    colonnes = [intervalles.c.bucket]
+    if group_by:
+        colonnes.append(comptes.c.groupe)
+    return select(*colonnes, func.coalesce(comptes.c.nombre, 0).label("nombre")).select_from(
+        intervalles.outerjoin(comptes, comptes.c.bucket == intervalles.c.bucket)
+    ).order_by(intervalles.c.bucket)
+
+
+def timeseries_from_rows(rows, bucket: str, debut: datetime, fin: datetime, group_by: Optional[str] = None) -> dict:
+    """
+    Met en forme le résultat de select_timeseries() en tableaux colonnes :
+    `timestamps[i]` est le début de l'intervalle i, `total[i]` et
+    `series[groupe][i]` ses comptes (toutes les valeurs du groupe, à 0 si absentes).
+    """
+    timestamps = []
+    positions = {}
+    for row in rows:
+        if row.bucket not in positions:
+            positions[row.bucket] = len(timestamps)
+            timestamps.append(row.bucket)
+    total = [0] * len(timestamps)
+    series = {membre.value: [0] * len(timestamps) for membre in TIMESERIES_GROUPS[group_by]} if group_by else None
+    for row in rows:
+        i = positions[row.bucket]
+        total[i] += row.nombre
+        if group_by and row.groupe is not None:
+            series[row.groupe.value][i] += row.nombre
+
+    resultat = {
+        "bucket": bucket,
+        "from": debut.isoformat(),
+        "to": fin.isoformat(),
+        "timestamps": [t.isoformat() for t in timestamps],
+        "total": total,
+    }
+    if group_by:
+        resultat["group_by"] = group_by
+        resultat["series"] = series
+    return resultat
+
+
+def stats_key(signalement) -> Tuple:
+    """Clé du rollup journalier pour un signalement"""
+    return tuple(getattr(signalement, c.key) for c in STATS_KEY_COLUMNS)
+
+
+def stats_key_from_values(valeurs: dict) -> Tuple:
+    """Clé du rollup journalier à partir d'un dictionnaire de colonnes"""
+    return tuple(valeurs[c.key] for c in STATS_KEY_COLUMNS)
+
+
+def upsert_daily_stats(deltas: Dict[Tuple, int]):
+    """
+    Upsert incrémental du rollup journalier, ou None s'il n'y a rien à faire.
+
+    `deltas` associe une clé (date, type, gravité, source) à la variation
+    du nombre de signalements. L'instruction doit être exécutée dans la
+    transaction qui modifie signalements pour que les deux restent cohérents.
+    """
+    valeurs = [
+        dict(zip([c.key for c in STATS_KEY_COLUMNS], cle), nombre=delta)
+        # Ordre stable des clés pour éviter les interblocages entre upserts
+        for cle, delta in sorted(deltas.items(), key=lambda item: repr(item[0]))
+        if delta
+    ]
+    if not valeurs:
+        return None
+    stmt = pg_insert(SignalementDailyStats).values(valeurs)
+    return stmt.on_conflict_do_update(
+        index_elements=[c.key for c in STATS_KEY_COLUMNS],
+        set_={"nombre": SignalementDailyStats.nombre + stmt.excluded.nombre}
+    )
+
+
+def update_returning(signalement_id: int, update_data: dict, if_match: Optional[datetime] = None):
+    """
+    UPDATE ... RETURNING des seules colonnes modifiées, en une instruction.
+
+    Si une colonne de la clé du rollup change, un CTE verrouille la ligne
+    (FOR UPDATE) et renvoie aussi l'ancienne clé, nécessaire pour ajuster
+    signalement_daily_stats. `if_match` ajoute la condition de version.
+    """
+    valeurs = dict(update_data, updated_at=func.now())
+    if any(c.key in update_data for c in STATS_KEY_COLUMNS):
+        ancien = select(Signalement.id, *STATS_KEY_COLUMNS).filter(
+            Signalement.id == signalement_id
+        ).with_for_update().cte("ancien")
+        stmt = update(Signalement).where(Signalement.id == ancien.c.id).returning(
+            Signalement, *[ancien.c[c.key] for c in STATS_KEY_COLUMNS]
+        )
+    else:
+        stmt = update(Signalement).where(Signalement.id == signalement_id).returning(Signalement)
+    if if_match is not None:
+        stmt = stmt.where(Signalement.updated_at == if_match)
+    return stmt.values(**valeurs).execution_options(synchronize_session=False)
+
+
+def update_deltas(row) -> Dict[Tuple, int]:
+    """Deltas du rollup pour une ligne renvoyée par update_returning()"""
+    if len(row) == 1:
+        return {}
+    ancienne_cle, nouvelle_cle = tuple(row[1:]), stats_key(row[0])
+    return {} if ancienne_cle == nouvelle_cle else {ancienne_cle: -1, nouvelle_cle: 1}
+
+
+def delete_returning(signalement_id: int, if_match: Optional[datetime] = None):
+    """DELETE ... RETURNING de la clé du rollup, en une instruction"""
+    stmt = delete(Signalement).where(Signalement.id == signalement_id)
+    if if_match is not None:
+        stmt = stmt.where(Signalement.updated_at == if_match)
+    return stmt.returning(*STATS_KEY_COLUMNS).execution_options(synchronize_session=False)
+
+
+def select_exists(signalement_id: int):
+    return select(Signalement.id).filter(Signalement.id == signalement_id)
+
+
+# Colonnes de SignalementResponse, dans l'ordre de ses champs
+RESPONSE_COLUMNS = tuple(Signalement.__table__.c[nom] for nom in SignalementResponse.model_fields)
+
+
+def rows_only(stmt):
+    """Variante d'un select(Signalement) qui lit des lignes (Row) au lieu d'objets ORM"""
+    return stmt.with_only_columns(*RESPONSE_COLUMNS)
+
+
+def select_search(search_term: str, limit: int = 50):
+    """
+    Recherche dans lieu, commentaires et nom d'agent, triée par pertinence.
+
+    Combine la recherche plein texte (search_vector, français, sans accents)
+    et les index trigrammes pg_trgm : sous-chaînes (ILIKE) et correspondances
+    approchées (opérateur %) sur le lieu et les agents.
+    """
+    terme = search_term.strip()
+    terme_sans_accent = func.f_unaccent(terme)
+    motif = func.f_unaccent(f"%{terme}%")
+    tsquery = func.websearch_to_tsquery(literal_column("'french'::regconfig"), terme_sans_accent)
+    lieu = func.f_unaccent(Signalement.lieu)
+    nom_agent = func.f_unaccent(Signalement.nom_agent)
+
+    pertinence = func.ts_rank(Signalement.search_vector, tsquery) + func.greatest(
+        func.similarity(lieu, terme_sans_accent),
+        func.similarity(nom_agent, terme_sans_accent)
+    )
+    return select(Signalement).filter(
+        or_(
+            Signalement.search_vector.op("@@")(tsquery),
+            lieu.ilike(motif),
+            nom_agent.ilike(motif),
+            Signalement.id_agent.ilike(f"%{terme}%"),
+            lieu.op("%")(terme_sans_accent),
+            nom_agent.op("%")(terme_sans_accent)
+        )
+    ).order_by(pertinence.desc(), Signalement.created_at.desc()).limit(limit)
+
+
+def select_recent(days: int = 7, limit: int = 20):
+    """Signalements des X derniers jours"""
+    date_limite = datetime.now().date() - timedelta(days=days)
+    return select(Signalement).filter(
+        Signalement.date_signalement >= date_limite
+    ).order_by(Signalement.created_at.desc()).limit(limit)
+
+
+def select_by_agent(id_agent: str, limit: int = 100):
+    """Tous les signalements d'un agent spécifique"""
+    return select(Signalement).filter(
+        Signalement.id_agent == id_agent
+    ).order_by(Signalement.created_at.desc()).limit(limit)
+
+
+# =====================================
+# Carte : boîte, rayon et regroupements (geohash)
+# =====================================
+
+# Colonnes d'un point de la carte
+MAP_COLUMNS = (
+    Signalement.id,
+    Signalement.latitude,
+    Signalement.longitude,
+    Signalement.gravite,
+    Signalement.type_evenement,
+    Signalement.date_signalement,
+    Signalement.lieu,
+)
+
+
+def filter_bbox(stmt, min_lat: float, min_lon: float, max_lat: float, max_lon: float):
+    """
+    Restreint aux signalements géocodés dans la boîte : les préfixes de
+    geohash couvrant la boîte parcourent l'index ix_signalements_geohash,
+    les bornes exactes écartent ce qui dépasse des cellules.
+    """
+    prefixes = bbox_cover(min_lat, min_lon, max_lat, max_lon)
+    stmt = stmt.filter(
+        Signalement.latitude.between(min_lat, max_lat),
+        Signalement.longitude.between(min_lon, max_lon),
+    )
+    if prefixes == [""]:
+        return stmt.filter(Signalement.geohash.isnot(None))
+    return stmt.filter(or_(*[Signalement.geohash.like(f"{prefixe}%") for prefixe in prefixes]))
+
+
+def select_bbox(min_lat: float, min_lon: float, max_lat: float, max_lon: float, limit: int = 5000, **filtres):
+    """Points de la boîte, les plus récents d'abord"""
+    stmt = filter_signalements(select(*MAP_COLUMNS), **filtres)
+    return filter_bbox(stmt, min_lat, min_lon, max_lat, max_lon).order_by(
+        Signalement.created_at.desc(), Signalement.id.desc()
+    ).limit(limit)
+
+
+def distance_m(latitude: float, longitude: float):
+    """Distance (haversine, mètres) entre le signalement et le point donné"""
+    dlat = func.radians(Signalement.latitude - latitude)
+    dlon = func.radians(Signalement.longitude - longitude)
+    a = func.power(func.sin(dlat / 2), 2) + func.cos(func.radians(latitude)) * func.cos(
+        func.radians(Signalement.latitude)
+    ) * func.power(func.sin(dlon / 2), 2)
+    return 2 * EARTH_RADIUS_M * func.asin(func.sqrt(func.least(a, 1.0)))
+
+
+def select_near(latitude: float, longitude: float, rayon_m: float, limit: int = 500, **filtres):
+    """Points à moins de `rayon_m` mètres, du plus proche au plus lointain"""
+    distance = distance_m(latitude, longitude)
+    stmt = filter_signalements(select(*MAP_COLUMNS, distance.label("distance_m")), **filtres)
+    return filter_bbox(stmt, *radius_bbox(latitude, longitude, rayon_m)).filter(
+        distance <= rayon_m
+    ).order_by(distance, Signalement.id).limit(limit)
+
+
+def select_clusters(min_lat: float, min_lon: float, max_lat: float, max_lon: float, precision: int, **filtres):
+    """
+    Regroupement des points de la boîte par cellule de geohash de
+    `precision` caractères : nombre, barycentre et nombre de gravité élevée.
+    """
+    cellule = func.left(Signalement.geohash, precision)
+    stmt = filter_signalements(
+        select(
+            cellule.label("cellule"),
+            func.count(Signalement.id).label("nombre"),
+            func.avg(Signalement.latitude).label("latitude"),
+            func.avg(Signalement.longitude).label("longitude"),
+            func.count(Signalement.id).filter(Signalement.gravite == GraviteEvenement.ELEVEE).label("elevee"),
+        ),
+        **filtres
+    )
+    return filter_bbox(stmt, min_lat, min_lon, max_lat, max_lon).group_by(cellule).order_by(cellule)
+
+
+def clusters_from_rows(rows, precision: int) -> dict:
+    """Met en forme le résultat de select_clusters() en tableaux colonnes"""
+    return {
+        "precision": precision,
+        "geohash": [row.cellule for row in rows],
+        "count": [row.nombre for row in rows],
+        "lat": [round(row.latitude, 6) for row in rows],
+        "lon": [round(row.longitude, 6) for row in rows],
+        "elevee": [row.elevee for row in rows],
+    }
+
+
+# =====================================
+# CRUD synchrone (Session)
+# =====================================
 
 class SignalementCRUD:
     def create_signalement(self, db: Session, signalement: SignalementCreate) -> Signalement:
-        db_signalement = Signalement(**signalement.model_dump())
+        self._load_gazetteer(db)
+        db_signalement = Signalement(**signalement.model_dump(), **geocoder.columns(signalement.lieu))
         db.add(db_signalement)
+        db.flush()
+        deltas = {stats_key(db_signalement): 1}
+        self._adjust_daily_stats(db, deltas)
+        notify_signalements(db, build_event("created", db_signalement, stats_deltas=deltas))
+        self._enqueue(db, "signalement.created", {"ids": [db_signalement.id]})
+        mark_signalements_changed(db)
         db.commit()
         db.refresh(db_signalement)
         return db_signalement
-    
+
+    def create_signalements_bulk(self, db: Session, signalements: List[SignalementCreate]) -> List[int]:
+        """
+        Insère un lot de signalements dans une seule transaction.
+
+        Un seul INSERT multi-lignes ... RETURNING id (découpé en pages par
+        SQLAlchemy) et un seul upsert du rollup. Les identifiants sont
+        retournés dans l'ordre du lot.
+        """
+        if not signalements:
+            return []
+        self._load_gazetteer(db)
+        lignes = [
+            dict(signalement.model_dump(), **geocoder.columns(signalement.lieu))
+            for signalement in signalements
+        ]
+        ids = db.execute(
+            insert(Signalement).returning(Signalement.id, sort_by_parameter_order=True),
+            lignes
+        ).scalars().all()
+        deltas = Counter(stats_key_from_values(ligne) for ligne in lignes)
+        self._adjust_daily_stats(db, deltas)
+        notify_signalements(db, build_event("bulk_created", ids=ids, stats_deltas=deltas))
+        self._enqueue(db, "signalement.created", {"ids": ids})
+        mark_signalements_changed(db)
+        db.commit()
+        return ids
+
     def get_signalement(self, db: Session, signalement_id: int) -> Optional[Signalement]:
         return db.query(Signalement).filter(Signalement.id == signalement_id).first()
-    
+
     def get_signalements(
         self,
         db: Session,
@@ -26,27 +622,34 @@ class SignalementCRUD:
         nom_agent: Optional[str] = None,
         source_information: Optional[str] = None,
         date_debut: Optional[date] = None,  # 👈 AJOUT
-        date_fin: Optional[date] = None      # 👈 AJOUT
+        date_fin: Optional[date] = None,     # 👈 AJOUT
+        cursor: Optional[Tuple[datetime, int]] = None,
+        as_rows: bool = False
     ) -> List[Signalement]:
-        query = db.query(Signalement)
-       
-        if type_evenement:
-            query = query.filter(Signalement.type_evenement == type_evenement)
-        if gravite:
-            query = query.filter(Signalement.gravite == gravite)
-        if nom_agent:
-            query = query.filter(Signalement.nom_agent.ilike(f"%{nom_agent}%"))
-        if source_information:
-            query = query.filter(Signalement.source_information == source_information)
-        
-        # 👇 AJOUTS pour filtrage par date
-        if date_debut:
-            query = query.filter(Signalement.date_signalement >= date_debut)
-        if date_fin:
-            query = query.filter(Signalement.date_signalement <= date_fin)
-           
-        return query.order_by(Signalement.created_at.desc()).offset(skip).limit(limit).all()
-    
+        """
+        Liste paginée (OFFSET ou curseur keyset) des signalements filtrés.
+
+        `as_rows` : lignes (Row) des seules colonnes de SignalementResponse, sans
+        objets ORM ; de même pour la recherche, les récents et les listes par agent.
+        """
+        stmt = select_signalements(
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            type_evenement=type_evenement,
+            gravite=gravite,
+            nom_agent=nom_agent,
+            source_information=source_information,
+            date_debut=date_debut,
+            date_fin=date_fin
+        )
+        return self._fetch(db, stmt, as_rows)
+
+    def _fetch(self, db: Session, stmt, as_rows: bool):
+        if as_rows:
+            return db.execute(rows_only(stmt)).all()
+        return db.execute(stmt).scalars().all()
+
     # 👇 NOUVELLE MÉTHODE : Compter le total (pour la pagination)
     def count_signalements(
         self,
@@ -59,135 +662,205 @@ class SignalementCRUD:
         date_fin: Optional[date] = None
     ) -> int:
         """Compte le nombre total de signalements (avec filtres)"""
-        query = db.query(Signalement)
-        
-        if type_evenement:
-            query = query.filter(Signalement.type_evenement == type_evenement)
-        if gravite:
-            query = query.filter(Signalement.gravite == gravite)
-        if nom_agent:
-            query = query.filter(Signalement.nom_agent.ilike(f"%{nom_agent}%"))
-        if source_information:
-            query = query.filter(Signalement.source_information == source_information)
-        if date_debut:
-            query = query.filter(Signalement.date_signalement >= date_debut)
-        if date_fin:
-            query = query.filter(Signalement.date_signalement <= date_fin)
-        
-        return query.count()
-    
+        return db.execute(select_count(
+            type_evenement=type_evenement,
+            gravite=gravite,
+            nom_agent=nom_agent,
+            source_information=source_information,
+            date_debut=date_debut,
+            date_fin=date_fin
+        )).scalar()
+
+    def estimate_signalements(
+        self,
+        db: Session,
+        type_evenement: Optional[str] = None,
+        gravite: Optional[str] = None,
+        nom_agent: Optional[str] = None,
+        source_information: Optional[str] = None,
+        date_debut: Optional[date] = None,
+        date_fin: Optional[date] = None
+    ) -> int:
+        """
+        Estimation du nombre de signalements (avec filtres) sans les compter.
+
+        Lit le nombre de lignes prévu par le planificateur (EXPLAIN) à partir
+        des statistiques de la table : coût constant, précision approximative.
+        """
+        stmt, params = explain_estimate(
+            type_evenement=type_evenement,
+            gravite=gravite,
+            nom_agent=nom_agent,
+            source_information=source_information,
+            date_debut=date_debut,
+            date_fin=date_fin
+        )
+        return plan_rows(db.execute(stmt, params).scalar())
+
     def update_signalement(
         self,
         db: Session,
         signalement_id: int,
-        signalement_update: SignalementUpdate
+        signalement_update: SignalementUpdate,
+        if_match: Optional[datetime] = None
     ) -> Optional[Signalement]:
-        db_signalement = self.get_signalement(db, signalement_id)
-        if not db_signalement:
-            return None
-           
+        """
+        Met à jour les seules colonnes fournies, en une instruction UPDATE ... RETURNING.
+
+        `if_match` (updated_at attendu, issu de l'ETag) active le contrôle
+        de concurrence optimiste : StaleSignalementError si le signalement a
+        été modifié entre-temps. Retourne None s'il n'existe pas.
+        """
         update_data = signalement_update.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_signalement, field, value)
-           
+        if "lieu" in update_data:
+            self._load_gazetteer(db)
+            update_data.update(geocoder.columns(update_data["lieu"]))
+        row = db.execute(update_returning(signalement_id, update_data, if_match)).first()
+        if row is None:
+            db.rollback()
+            self._raise_if_stale(db, signalement_id, if_match)
+            return None
+
+        db_signalement = row[0]
+        deltas = update_deltas(row)
+        self._adjust_daily_stats(db, deltas)
+        notify_signalements(db, build_event("updated", db_signalement, stats_deltas=deltas))
+        self._enqueue(db, "signalement.updated", {"ids": [signalement_id], "champs": sorted(update_data)})
+        # Détaché avant le commit : les valeurs renvoyées par RETURNING restent
+        # lisibles sans le SELECT de rafraîchissement qu'imposerait l'expiration
+        db.expunge(db_signalement)
+        mark_signalements_changed(db)
         db.commit()
-        db.refresh(db_signalement)
         return db_signalement
-    
-    def delete_signalement(self, db: Session, signalement_id: int) -> bool:
-        db_signalement = self.get_signalement(db, signalement_id)
-        if not db_signalement:
+
+    def delete_signalement(
+        self,
+        db: Session,
+        signalement_id: int,
+        if_match: Optional[datetime] = None
+    ) -> bool:
+        """Supprime en une instruction DELETE ... RETURNING (voir update_signalement pour if_match)"""
+        row = db.execute(delete_returning(signalement_id, if_match)).first()
+        if row is None:
+            db.rollback()
+            self._raise_if_stale(db, signalement_id, if_match)
             return False
-           
-        db.delete(db_signalement)
+
+        deltas = {tuple(row): -1}
+        self._adjust_daily_stats(db, deltas)
+        notify_signalements(db, build_event("deleted", ids=[signalement_id], stats_deltas=deltas))
+        self._enqueue(db, "signalement.deleted", {"ids": [signalement_id]})
+        mark_signalements_changed(db)
         db.commit()
         return True
-    
+
+    def _raise_if_stale(self, db: Session, signalement_id: int, if_match: Optional[datetime]) -> None:
+        """Après un échec d'UPDATE/DELETE conditionnel : distingue 404 et conflit de version"""
+        if if_match is not None and db.execute(select_exists(signalement_id)).first():
+            raise StaleSignalementError(signalement_id)
+
     def get_signalements_stats(self, db: Session):
-        """Statistiques des signalements"""
-        total = db.query(Signalement).count()
-        by_gravite = db.query(
-            Signalement.gravite, 
-            func.count(Signalement.id)
-        ).group_by(Signalement.gravite).all()
-        
-        by_type = db.query(
-            Signalement.type_evenement, 
-            func.count(Signalement.id)
-        ).group_by(Signalement.type_evenement).all()
-        
-        # 👇 AJOUT : Statistiques temporelles
-        aujourdhui = datetime.now().date()
-        hier = aujourdhui - timedelta(days=1)
-        semaine = aujourdhui - timedelta(days=7)
-        mois = aujourdhui - timedelta(days=30)
-        
-        stats_aujourdhui = db.query(Signalement).filter(
-            Signalement.date_signalement == aujourdhui
-        ).count()
-        
-        stats_hier = db.query(Signalement).filter(
-            Signalement.date_signalement == hier
-        ).count()
-        
-        stats_semaine = db.query(Signalement).filter(
-            Signalement.date_signalement >= semaine
-        ).count()
-        
-        stats_mois = db.query(Signalement).filter(
-            Signalement.date_signalement >= mois
-        ).count()
-       
-        return {
-            "total": total,
-            "par_gravite": dict(by_gravite),
-            "par_type": dict(by_type),
-            "aujourdhui": stats_aujourdhui,
-            "hier": stats_hier,
-            "cette_semaine": stats_semaine,
-            "ce_mois": stats_mois
-        }
-    
+        """
+        Statistiques des signalements.
+
+        Une seule requête sur la table de rollup (voir select_stats) : le coût
+        dépend du nombre de jours couverts, pas du nombre de signalements.
+        """
+        return stats_from_rows(db.execute(select_stats()).all())
+
+    def get_timeseries(
+        self,
+        db: Session,
+        bucket: str,
+        debut: datetime,
+        fin: datetime,
+        group_by: Optional[str] = None,
+        **filtres
+    ) -> dict:
+        """Série temporelle complétée par des zéros (voir select_timeseries)"""
+        rows = db.execute(select_timeseries(bucket, debut, fin, group_by, **filtres)).all()
+        return timeseries_from_rows(rows, bucket, debut, fin, group_by)
+
+    def _load_gazetteer(self, db: Session) -> None:
+        """Charge le gazetteer s'il ne l'est pas encore (dans l'API, rechargé en tâche de fond)"""
+        if geocoder.needs_reload():
+            geocoder.load(db.execute(select_gazetteer()).all())
+
+    def get_map_points(self, db: Session, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+                       limit: int = 5000, **filtres):
+        return db.execute(select_bbox(min_lat, min_lon, max_lat, max_lon, limit, **filtres)).all()
+
+    def get_nearby(self, db: Session, latitude: float, longitude: float, rayon_m: float, limit: int = 500, **filtres):
+        return db.execute(select_near(latitude, longitude, rayon_m, limit, **filtres)).all()
+
+    def get_clusters(self, db: Session, min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+                     precision: int, **filtres) -> dict:
+        rows = db.execute(select_clusters(min_lat, min_lon, max_lat, max_lon, precision, **filtres)).all()
+        return clusters_from_rows(rows, precision)
+
+    def rebuild_daily_stats(self, db: Session) -> int:
+        """
+        Reconstruit entièrement la table de rollup à partir de signalements.
+
+        Les écritures sur signalements sont bloquées (verrou SHARE) pendant
+        la reconstruction pour que le rollup reste cohérent. Retourne le
+        nombre de lignes d'agrégat produites.
+        """
+        db.execute(text("LOCK TABLE signalements IN SHARE MODE"))
+        db.query(SignalementDailyStats).delete(synchronize_session=False)
+        agregat = select(*STATS_KEY_COLUMNS, func.count(Signalement.id)).group_by(*STATS_KEY_COLUMNS)
+        result = db.execute(
+            insert(SignalementDailyStats).from_select(
+                [c.key for c in STATS_KEY_COLUMNS] + ["nombre"],
+                agregat
+            )
+        )
+        mark_signalements_changed(db)
+        db.commit()
+        return result.rowcount
+
+    def _adjust_daily_stats(self, db: Session, deltas: Dict[Tuple, int]) -> None:
+        """Applique des deltas au rollup journalier dans la transaction courante"""
+        stmt = upsert_daily_stats(deltas)
+        if stmt is not None:
+            db.execute(stmt)
+
+    def _enqueue(self, db: Session, topic: str, payload: dict) -> None:
+        """Événement outbox dans la transaction courante (traité par outbox_worker.py)"""
+        for stmt in enqueue_statements(topic, payload):
+            db.execute(stmt)
+
     # 👇 NOUVELLE MÉTHODE : Recherche par mot-clé
     def search_signalements(
         self,
         db: Session,
         search_term: str,
-        limit: int = 50
+        limit: int = 50,
+        as_rows: bool = False
     ) -> List[Signalement]:
-        """Recherche dans lieu, commentaires et nom d'agent"""
-        return db.query(Signalement).filter(
-            or_(
-                Signalement.lieu.ilike(f"%{search_term}%"),
-                Signalement.commentaire_complementaire.ilike(f"%{search_term}%"),
-                Signalement.nom_agent.ilike(f"%{search_term}%"),
-                Signalement.id_agent.ilike(f"%{search_term}%")
-            )
-        ).order_by(Signalement.created_at.desc()).limit(limit).all()
-    
+        """Recherche dans lieu, commentaires et nom d'agent (par pertinence)"""
+        return self._fetch(db, select_search(search_term, limit), as_rows)
+
     # 👇 NOUVELLE MÉTHODE : Signalements récents
     def get_recent_signalements(
         self,
         db: Session,
         days: int = 7,
-        limit: int = 20
+        limit: int = 20,
+        as_rows: bool = False
     ) -> List[Signalement]:
         """Récupère les signalements des X derniers jours"""
-        date_limite = datetime.now().date() - timedelta(days=days)
-        return db.query(Signalement).filter(
-            Signalement.date_signalement >= date_limite
-        ).order_by(Signalement.created_at.desc()).limit(limit).all()
-    
+        return self._fetch(db, select_recent(days, limit), as_rows)
+
     # 👇 NOUVELLE MÉTHODE : Signalements par agent
     def get_signalements_by_agent(
         self,
         db: Session,
         id_agent: str,
-        limit: int = 100
+        limit: int = 100,
+        as_rows: bool = False
     ) -> List[Signalement]:
         """Tous les signalements d'un agent spécifique"""
-        return db.query(Signalement).filter(
-            Signalement.id_agent == id_agent
-        ).order_by(Signalement.created_at.desc()).limit(limit).all()
+        return self._fetch(db, select_by_agent(id_agent, limit), as_rows)
 
-crud_signalement = SignalementCRUD()
\ No newline at end of file
+crud_signalement = SignalementCRUD()
@@ -0,0 +1,175 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from app.core.live_feed import build_event, notify_signalements_async
+from app.core.response_cache import mark_signalements_changed
+from app.models import Signalement
+from app.schemas import SignalementCreate, SignalementUpdate
+from app.services.geocoding import geocoder, select_gazetteer
+from app.services.outbox import enqueue_statements
+from app.services.crud import (
+    StaleSignalementError,
+    delete_returning,
+    explain_estimate,
+    plan_rows,
+    rows_only,
+    select_by_agent,
+    select_count,
+    select_exists,
+    select_recent,
+    select_search,
+    select_signalements,
+    select_stats,
+    select_timeseries,
+    stats_from_rows,
+    stats_key,
+    timeseries_from_rows,
+    update_deltas,
+    update_returning,
+    upsert_daily_stats,
+)
+
+
+class AsyncSignalementCRUD:
+    """
+    Équivalent asynchrone de SignalementCRUD (AsyncSession + asyncpg).
+
+    Les requêtes sont construites par les mêmes fonctions que le CRUD
+    synchrone : seules l'exécution et la gestion de session diffèrent.
+    """
+
+    async def create_signalement(self, db: AsyncSession, signalement: SignalementCreate) -> Signalement:
+        await self._load_gazetteer(db)
+        db_signalement = Signalement(**signalement.model_dump(), **geocoder.columns(signalement.lieu))
+        db.add(db_signalement)
+        await db.flush()
+        deltas = {stats_key(db_signalement): 1}
+        await self._adjust_daily_stats(db, deltas)
+        await notify_signalements_async(db, build_event("created", db_signalement, stats_deltas=deltas))
+        await self._enqueue(db, "signalement.created", {"ids": [db_signalement.id]})
+        mark_signalements_changed(db)
+        await db.commit()
+        await db.refresh(db_signalement)
+        return db_signalement
+
+    async def get_signalement(self, db: AsyncSession, signalement_id: int) -> Optional[Signalement]:
+        result = await db.execute(select(Signalement).filter(Signalement.id == signalement_id))
+        return result.scalars().first()
+
+    async def get_signalements(
+        self,
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[Tuple[datetime, int]] = None,
+        as_rows: bool = False,
+        **filtres
+    ) -> List[Signalement]:
+        stmt = select_signalements(skip=skip, limit=limit, cursor=cursor, **filtres)
+        return await self._fetch(db, stmt, as_rows)
+
+    async def _fetch(self, db: AsyncSession, stmt, as_rows: bool):
+        if as_rows:
+            return (await db.execute(rows_only(stmt))).all()
+        return (await db.execute(stmt)).scalars().all()
+
+    async def count_signalements(self, db: AsyncSession, **filtres) -> int:
+        result = await db.execute(select_count(**filtres))
+        return result.scalar()
+
+    async def estimate_signalements(self, db: AsyncSession, **filtres) -> int:
+        stmt, params = explain_estimate(**filtres)
+        result = await db.execute(stmt, params)
+        return plan_rows(result.scalar())
+
+    async def update_signalement(
+        self,
+        db: AsyncSession,
+        signalement_id: int,
+        signalement_update: SignalementUpdate,
+        if_match: Optional[datetime] = None
+    ) -> Optional[Signalement]:
+        update_data = signalement_update.model_dump(exclude_unset=True)
+        if "lieu" in update_data:
+            await self._load_gazetteer(db)
+            update_data.update(geocoder.columns(update_data["lieu"]))
+        result = await db.execute(update_returning(signalement_id, update_data, if_match))
+        row = result.first()
+        if row is None:
+            await db.rollback()
+            await self._raise_if_stale(db, signalement_id, if_match)
+            return None
+
+        deltas = update_deltas(row)
+        await self._adjust_daily_stats(db, deltas)
+        await notify_signalements_async(db, build_event("updated", row[0], stats_deltas=deltas))
+        await self._enqueue(db, "signalement.updated", {"ids": [signalement_id], "champs": sorted(update_data)})
+        mark_signalements_changed(db)
+        await db.commit()
+        return row[0]
+
+    async def delete_signalement(
+        self,
+        db: AsyncSession,
+        signalement_id: int,
+        if_match: Optional[datetime] = None
+    ) -> bool:
+        result = await db.execute(delete_returning(signalement_id, if_match))
+        row = result.first()
+        if row is None:
+            await db.rollback()
+            await self._raise_if_stale(db, signalement_id, if_match)
+            return False
+
+        deltas = {tuple(row): -1}
+        await self._adjust_daily_stats(db, deltas)
+        await notify_signalements_async(db, build_event("deleted", ids=[signalement_id], stats_deltas=deltas))
+        await self._enqueue(db, "signalement.deleted", {"ids": [signalement_id]})
+        mark_signalements_changed(db)
+        await db.commit()
+        return True
+
+    async def _raise_if_stale(self, db: AsyncSession, signalement_id: int, if_match: Optional[datetime]) -> None:
+        if if_match is not None and (await db.execute(select_exists(signalement_id))).first():
+            raise StaleSignalementError(signalement_id)
+
+    async def get_signalements_stats(self, db: AsyncSession):
+        result = await db.execute(select_stats())
+        return stats_from_rows(result.all())
+
+    async def get_timeseries(
+        self, db: AsyncSession, bucket: str, debut: datetime, fin: datetime, group_by: Optional[str] = None, **filtres
+    ) -> dict:
+        result = await db.execute(select_timeseries(bucket, debut, fin, group_by, **filtres))
+        return timeseries_from_rows(result.all(), bucket, debut, fin, group_by)
+
+    async def _load_gazetteer(self, db: AsyncSession) -> None:
+        if geocoder.needs_reload():
+            geocoder.load((await db.execute(select_gazetteer())).all())
+
+    async def _adjust_daily_stats(self, db: AsyncSession, deltas: Dict[Tuple, int]) -> None:
+        stmt = upsert_daily_stats(deltas)
+        if stmt is not None:
+            await db.execute(stmt)
+
+    async def _enqueue(self, db: AsyncSession, topic: str, payload: dict) -> None:
+        for stmt in enqueue_statements(topic, payload):
+            await db.execute(stmt)
+
+    async def search_signalements(
+        self, db: AsyncSession, search_term: str, limit: int = 50, as_rows: bool = False
+    ) -> List[Signalement]:
+        return await self._fetch(db, select_search(search_term, limit), as_rows)
+
+    async def get_recent_signalements(
+        self, db: AsyncSession, days: int = 7, limit: int = 20, as_rows: bool = False
+    ) -> List[Signalement]:
+        return await self._fetch(db, select_recent(days, limit), as_rows)
+
+    async def get_signalements_by_agent(
+        self, db: AsyncSession, id_agent: str, limit: int = 100, as_rows: bool = False
+    ) -> List[Signalement]:
+        return await self._fetch(db, select_by_agent(id_agent, limit), as_rows)
+
+async_crud_signalement = AsyncSignalementCRUD()
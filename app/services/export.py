@@ -0,0 +1,181 @@
+import csv
+import enum
+import io
+import json
+from datetime import date, datetime, time
+from typing import Iterator, List
+
+from sqlalchemy import select
+
+from app.database import SessionLocal
+from app.models import Signalement
+from app.services.crud import filter_signalements
+
+# Colonnes exportées (la colonne technique search_vector est exclue)
+EXPORT_COLUMNS = [
+    Signalement.id,
+    Signalement.date_signalement,
+    Signalement.heure_signalement,
+    Signalement.nom_agent,
+    Signalement.id_agent,
+    Signalement.type_evenement,
+    Signalement.gravite,
+    Signalement.lieu,
+    Signalement.latitude,
+    Signalement.longitude,
+    Signalement.source_information,
+    Signalement.source_autre,
+    Signalement.action_entreprise,
+    Signalement.action_autre,
+    Signalement.commentaire_complementaire,
+    Signalement.created_at,
+    Signalement.updated_at,
+]
+EXPORT_FIELDS = [colonne.key for colonne in EXPORT_COLUMNS]
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def _valeur(v):
+    """Valeur exportable : énumérations par libellé, dates au format ISO"""
+    if isinstance(v, enum.Enum):
+        return v.value
+    if isinstance(v, (date, time, datetime)):
+        return v.isoformat()
+    return v
+
+
+def iter_batches(batch_size: int = 2000, session_factory=SessionLocal, **filtres) -> Iterator[List[tuple]]:
+    """
+    Parcourt les signalements filtrés par lots via un curseur serveur.
+
+    yield_per active un curseur nommé côté PostgreSQL : seul un lot de
+    `batch_size` lignes est en mémoire à la fois, quelle que soit la taille
+    du résultat. La session, ouverte par `session_factory` au premier lot
+    (primaire par défaut, réplica pour la route d'export), est propre au
+    flux et fermée à la fin (ou à l'abandon du flux par le client).
+    """
+    db = session_factory()
+    try:
+        stmt = filter_signalements(select(*EXPORT_COLUMNS), **filtres).order_by(Signalement.id)
+        result = db.execute(stmt.execution_options(yield_per=batch_size))
+        for lot in result.partitions():
+            yield lot
+    finally:
+        db.close()
+
+
+def stream_csv(batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+    tampon = io.StringIO()
+    writer = csv.writer(tampon)
+    writer.writerow(EXPORT_FIELDS)
+    for lot in batches:
+        writer.writerows([_valeur(v) for v in ligne] for ligne in lot)
+        yield tampon.getvalue().encode("utf-8")
+        tampon.seek(0)
+        tampon.truncate()
+    if tampon.tell():
+        yield tampon.getvalue().encode("utf-8")
+
+
+def stream_ndjson(batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+    for lot in batches:
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_FIELDS, map(_valeur, ligne))), ensure_ascii=False) + "\n"
+            for ligne in lot
+        ).encode("utf-8")
+
+
+class _ChunkSink:
+    """Fichier en écriture qui accumule les octets jusqu'au prochain drain()"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def stream_parquet(batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+    """Un row group Parquet par lot, émis dès qu'il est écrit (requiert pyarrow)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.int64()),
+        ("date_signalement", pa.date32()),
+        ("heure_signalement", pa.time64("us")),
+        ("nom_agent", pa.string()),
+        ("id_agent", pa.string()),
+        ("type_evenement", pa.string()),
+        ("gravite", pa.string()),
+        ("lieu", pa.string()),
+        ("latitude", pa.float64()),
+        ("longitude", pa.float64()),
+        ("source_information", pa.string()),
+        ("source_autre", pa.string()),
+        ("action_entreprise", pa.string()),
+        ("action_autre", pa.string()),
+        ("commentaire_complementaire", pa.string()),
+        ("created_at", pa.timestamp("us")),
+        ("updated_at", pa.timestamp("us")),
+    ])
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for lot in batches:
+            colonnes = list(zip(*lot))
+            table = pa.Table.from_arrays(
+                [
+                    pa.array(
+                        [v.value if isinstance(v, enum.Enum) else v for v in valeurs],
+                        type=champ.type
+                    )
+                    for champ, valeurs in zip(schema, colonnes)
+                ],
+                schema=schema
+            )
+            writer.write_table(table)
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+STREAMERS = {
+    "csv": stream_csv,
+    "ndjson": stream_ndjson,
+    "parquet": stream_parquet,
+}
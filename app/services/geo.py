@@ -0,0 +1,102 @@
+"""Geohash et distances, sans dépendance (pas de PostGIS requis)"""
+
+import math
+from typing import List, Tuple
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+# Précision stockée dans signalements.geohash (cellules d'environ 5 m)
+GEOHASH_PRECISION = 9
+EARTH_RADIUS_M = 6_371_000.0
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Geohash de `precision` caractères du point (latitude, longitude)"""
+    lat_min, lat_max = -90.0, 90.0
+    lon_min, lon_max = -180.0, 180.0
+    caracteres = []
+    bits = 0
+    valeur = 0
+    pair = True  # les bits pairs codent la longitude
+    while len(caracteres) < precision:
+        if pair:
+            milieu = (lon_min + lon_max) / 2
+            if longitude >= milieu:
+                valeur = valeur * 2 + 1
+                lon_min = milieu
+            else:
+                valeur *= 2
+                lon_max = milieu
+        else:
+            milieu = (lat_min + lat_max) / 2
+            if latitude >= milieu:
+                valeur = valeur * 2 + 1
+                lat_min = milieu
+            else:
+                valeur *= 2
+                lat_max = milieu
+        pair = not pair
+        bits += 1
+        if bits == 5:
+            caracteres.append(BASE32[valeur])
+            bits = 0
+            valeur = 0
+    return "".join(caracteres)
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """(hauteur, largeur) en degrés d'une cellule de geohash"""
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def bbox_cells(min_lat: float, min_lon: float, max_lat: float, max_lon: float, precision: int) -> List[str]:
+    """Cellules de geohash de `precision` caractères couvrant la boîte"""
+    hauteur, largeur = cell_size(precision)
+    cellules = set()
+    lat = math.floor(min_lat / hauteur) * hauteur
+    while lat <= max_lat:
+        lon = math.floor(min_lon / largeur) * largeur
+        while lon <= max_lon:
+            cellules.add(geohash_encode(lat + hauteur / 2, lon + largeur / 2, precision))
+            lon += largeur
+        lat += hauteur
+    return sorted(cellules)
+
+
+def bbox_cover(min_lat: float, min_lon: float, max_lat: float, max_lon: float, max_cells: int = 32) -> List[str]:
+    """
+    Préfixes de geohash couvrant la boîte : la précision la plus fine qui
+    tient en `max_cells` cellules, chacune devenant un LIKE 'prefixe%'
+    servi par l'index B-tree sur geohash.
+    """
+    couverture = [""]
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        hauteur, largeur = cell_size(precision)
+        estimation = (math.floor(max_lat / hauteur) - math.floor(min_lat / hauteur) + 1) * (
+            math.floor(max_lon / largeur) - math.floor(min_lon / largeur) + 1
+        )
+        if estimation > max_cells:
+            break
+        couverture = bbox_cells(min_lat, min_lon, max_lat, max_lon, precision)
+    return couverture
+
+
+def cluster_precision(min_lat: float, min_lon: float, max_lat: float, max_lon: float, cells: int = 400) -> int:
+    """Précision de regroupement donnant au plus environ `cells` groupes dans la boîte"""
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        hauteur, largeur = cell_size(precision)
+        if ((max_lat - min_lat) / hauteur + 1) * ((max_lon - min_lon) / largeur + 1) > cells:
+            return max(1, precision - 1)
+    return GEOHASH_PRECISION
+
+
+def radius_bbox(latitude: float, longitude: float, rayon_m: float) -> Tuple[float, float, float, float]:
+    """Boîte (min_lat, min_lon, max_lat, max_lon) contenant le cercle"""
+    dlat = math.degrees(rayon_m / EARTH_RADIUS_M)
+    dlon = math.degrees(rayon_m / (EARTH_RADIUS_M * max(math.cos(math.radians(latitude)), 1e-6)))
+    return (
+        max(-90.0, latitude - dlat),
+        max(-180.0, longitude - dlon),
+        min(90.0, latitude + dlat),
+        min(180.0, longitude + dlon),
+    )
@@ -0,0 +1,205 @@
+"""
+Géocodage du champ libre `lieu` par la table gazetteer (quartiers, villes
+et localités de Djibouti), sans service externe.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import bindparam, select, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+from sqlalchemy.types import Float, String
+
+from app.core.config import settings
+from app.core.live_feed import notify_signalements
+from app.core.response_cache import mark_signalements_changed
+from app.models import Gazetteer, Signalement
+from app.services.geo import geohash_encode
+from app.services.partitions import list_partitions
+
+logger = logging.getLogger(__name__)
+
+Position = Tuple[float, float]
+
+
+def normalize_lieu(lieu: str) -> str:
+    """Clé de comparaison : minuscules, sans accents ni ponctuation"""
+    sans_accents = unicodedata.normalize("NFKD", lieu).encode("ascii", "ignore").decode("ascii")
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", sans_accents.lower()).split())
+
+
+def select_gazetteer():
+    return select(Gazetteer.cle, Gazetteer.latitude, Gazetteer.longitude)
+
+
+class Geocoder:
+    """
+    Résolution lieu -> (latitude, longitude).
+
+    Le gazetteer, petit, est chargé en mémoire et rechargé toutes les
+    `reload_seconds` secondes ; dans l'API, par une tâche de fond (start),
+    hors du chemin des requêtes d'écriture. Chaque chaîne `lieu` déjà vue est résolue
+    depuis un cache LRU, y compris les échecs (None) : une même saisie
+    n'est analysée qu'une fois. Une saisie correspond à une entrée du
+    gazetteer si elle lui est égale une fois normalisée, sinon si elle la
+    contient comme suite de mots (« marché de Balbala » -> Balbala) ; la
+    première entrée citée l'emporte (« Balbala, Djibouti » -> Balbala), la
+    plus longue en cas d'égalité.
+    """
+
+    def __init__(self, max_size: int, reload_seconds: float):
+        self.max_size = max_size
+        self.reload_seconds = reload_seconds
+        self._lock = threading.Lock()
+        self._entrees: Dict[str, Position] = {}
+        self._charge_a: Optional[float] = None
+        self._cache: "OrderedDict[str, Optional[Position]]" = OrderedDict()
+        self._task = None
+        self.hits = 0
+        self.misses = 0
+
+    def needs_reload(self) -> bool:
+        """
+        Vrai si l'appelant doit charger le gazetteer lui-même : jamais chargé,
+        ou expiré sans tâche de fond pour le recharger (scripts, workers)
+        """
+        if self._charge_a is None:
+            return True
+        return self._task is None and time.monotonic() - self._charge_a > self.reload_seconds
+
+    def load(self, rows) -> None:
+        """Remplace le gazetteer en mémoire par les lignes de select_gazetteer()"""
+        entrees = {row.cle: (row.latitude, row.longitude) for row in rows}
+        with self._lock:
+            self._entrees = entrees
+            self._cache.clear()
+            self._charge_a = time.monotonic()
+
+    def refresh(self) -> None:
+        """Recharge le gazetteer depuis le primaire, dans une session dédiée"""
+        from app.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            self.load(db.execute(select_gazetteer()).all())
+        finally:
+            db.close()
+
+    async def run(self) -> None:
+        from starlette.concurrency import run_in_threadpool
+
+        while True:
+            try:
+                await run_in_threadpool(self.refresh)
+            except Exception:
+                logger.exception("Rechargement du gazetteer interrompu")
+            await asyncio.sleep(self.reload_seconds)
+
+    def start(self) -> None:
+        """Lance le rechargement périodique dans la boucle d'événements du worker"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def locate(self, lieu: Optional[str]) -> Optional[Position]:
+        if not lieu:
+            return None
+        with self._lock:
+            if lieu in self._cache:
+                self._cache.move_to_end(lieu)
+                self.hits += 1
+                return self._cache[lieu]
+            self.misses += 1
+            position = self._resoudre(normalize_lieu(lieu))
+            if self.max_size > 0:
+                self._cache[lieu] = position
+                if len(self._cache) > self.max_size:
+                    self._cache.popitem(last=False)
+            return position
+
+    def _resoudre(self, cle: str) -> Optional[Position]:
+        if cle in self._entrees:
+            return self._entrees[cle]
+        mots = f" {cle} "
+        candidats = [(mots.find(f" {entree} "), -len(entree), entree) for entree in self._entrees]
+        candidats = [candidat for candidat in candidats if candidat[0] >= 0]
+        if not candidats:
+            return None
+        return self._entrees[min(candidats)[2]]
+
+    def columns(self, lieu: Optional[str]) -> dict:
+        """Valeurs latitude / longitude / geohash d'un signalement (None si non géocodé)"""
+        position = self.locate(lieu)
+        if position is None:
+            return {"latitude": None, "longitude": None, "geohash": None}
+        latitude, longitude = position
+        return {"latitude": latitude, "longitude": longitude, "geohash": geohash_encode(latitude, longitude)}
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entrees), "cached": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+
+geocoder = Geocoder(settings.geocode_cache_size, settings.geocode_reload_seconds)
+
+
+UPDATE_SQL = """
+UPDATE {table} AS s
+SET latitude = v.latitude, longitude = v.longitude, geohash = v.geohash
+FROM unnest(:lieux, :latitudes, :longitudes, :geohashes) AS v(lieu, latitude, longitude, geohash)
+WHERE s.lieu = v.lieu{condition}
+"""
+
+
+def geocode_existing(db: Session, tous: bool = False) -> Tuple[int, int, int]:
+    """
+    Géocode les signalements enregistrés : chaque lieu distinct est résolu
+    une fois, puis un UPDATE ... FROM unnest(...) par partition applique
+    toutes les positions (une transaction courte par partition). updated_at
+    n'est pas modifié. Retourne (lieux géocodés, lieux distincts, lignes).
+    """
+    geocoder.load(db.execute(select_gazetteer()).all())
+    lieux = select(Signalement.lieu).distinct()
+    if not tous:
+        lieux = lieux.filter(Signalement.geohash.is_(None))
+    positions = {lieu: geocoder.columns(lieu) for lieu in db.execute(lieux).scalars()}
+    trouves = {lieu: valeurs for lieu, valeurs in positions.items() if valeurs["geohash"] is not None}
+    if not trouves:
+        db.rollback()
+        return 0, len(positions), 0
+
+    params = {
+        "lieux": list(trouves),
+        "latitudes": [valeurs["latitude"] for valeurs in trouves.values()],
+        "longitudes": [valeurs["longitude"] for valeurs in trouves.values()],
+        "geohashes": [valeurs["geohash"] for valeurs in trouves.values()],
+    }
+    tables = [partition["nom"] for partition in list_partitions(db)] or ["signalements"]
+    condition = "" if tous else " AND s.geohash IS NULL"
+    lignes = 0
+    for table in tables:
+        stmt = text(UPDATE_SQL.format(table=table, condition=condition)).bindparams(
+            bindparam("lieux", type_=ARRAY(String)),
+            bindparam("latitudes", type_=ARRAY(Float)),
+            bindparam("longitudes", type_=ARRAY(Float)),
+            bindparam("geohashes", type_=ARRAY(String)),
+        )
+        lignes += db.execute(stmt, params).rowcount
+        mark_signalements_changed(db)
+        db.commit()
+
+    # Positions modifiées hors API : caches des réponses et tableaux de bord à resynchroniser
+    notify_signalements(db, json.dumps({"action": "resync", "resync": True}))
+    db.commit()
+    return len(trouves), len(positions), lignes
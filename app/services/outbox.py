@@ -0,0 +1,222 @@
+"""
+Outbox transactionnelle : traitements différés des écritures sur signalements.
+
+Le CRUD n'ajoute qu'un INSERT outbox_events à la transaction de l'écriture
+(enqueue_statements) ; les traitements enregistrés ici s'exécutent ensuite
+hors requête, dans outbox_worker.py. La latence des POST ne dépend donc pas
+de leur nombre, et plusieurs workers peuvent consommer la file en parallèle
+(SELECT ... FOR UPDATE SKIP LOCKED).
+
+Livraison au moins une fois : un événement peut être traité de nouveau
+(worker interrompu avant le commit, échec après un effet externe), les
+traitements doivent donc être idempotents.
+"""
+
+import json
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, text, true, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import OutboxDeadLetter, OutboxEvent, Signalement
+from app.models.models import GraviteEvenement
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY émis avec chaque événement : réveille les workers en attente
+OUTBOX_CHANNEL = "outbox_events"
+# Alertes des signalements de gravité élevée, pour les consommateurs en LISTEN
+ALERTES_CHANNEL = "signalements_alertes"
+
+Handler = Callable[[Session, dict], None]
+HANDLERS: Dict[str, List[Handler]] = defaultdict(list)
+
+
+def handler(*topics: str):
+    """Décorateur : enregistre un traitement pour un ou plusieurs topics"""
+    def enregistrer(fonction: Handler) -> Handler:
+        for topic in topics:
+            HANDLERS[topic].append(fonction)
+        return fonction
+    return enregistrer
+
+
+def enqueue_statements(topic: str, payload: dict) -> list:
+    """
+    Instructions à exécuter dans la transaction de l'écriture : INSERT de
+    l'événement et NOTIFY (livré au commit). Aucune si l'outbox est
+    désactivée ou si aucun traitement n'est enregistré pour `topic`.
+    """
+    if not settings.outbox_enabled or not HANDLERS.get(topic):
+        return []
+    return [
+        insert(OutboxEvent).values(topic=topic, payload=payload),
+        text("SELECT pg_notify(:canal, :topic)").bindparams(canal=OUTBOX_CHANNEL, topic=topic),
+    ]
+
+
+def retry_delay(attempts: int) -> float:
+    """Délai avant la tentative suivante : exponentiel, borné par OUTBOX_RETRY_MAX"""
+    return min(settings.outbox_retry_base * 2 ** (attempts - 1), settings.outbox_retry_max)
+
+
+def select_batch(batch_size: int):
+    """Événements disponibles, verrouillés ; ceux déjà pris par un autre worker sont sautés"""
+    return (
+        select(
+            OutboxEvent.id,
+            OutboxEvent.topic,
+            OutboxEvent.payload,
+            OutboxEvent.created_at,
+            OutboxEvent.attempts,
+        )
+        .where(OutboxEvent.available_at <= func.now())
+        .order_by(OutboxEvent.available_at, OutboxEvent.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def dispatch(db: Session, topic: str, payload: dict) -> None:
+    traitements = HANDLERS.get(topic)
+    if not traitements:
+        raise LookupError(f"Aucun traitement enregistré pour le topic {topic!r}")
+    for traitement in traitements:
+        traitement(db, payload)
+
+
+def process_batch(db: Session, batch_size: Optional[int] = None) -> Tuple[int, int, int]:
+    """
+    Traite un lot d'événements dans une transaction.
+
+    Chaque événement est traité dans un SAVEPOINT : un échec n'annule que
+    ses propres effets en base. Les événements réussis sont supprimés ;
+    un échec incrémente attempts et repousse available_at (retry_delay),
+    jusqu'à OUTBOX_MAX_ATTEMPTS où l'événement passe dans
+    outbox_dead_letters. Les verrous sont libérés au commit. Retourne
+    (traités, reportés, abandonnés).
+    """
+    evenements = db.execute(select_batch(batch_size or settings.outbox_batch_size)).all()
+    traites: List[int] = []
+    reportes = abandonnes = 0
+    for evenement in evenements:
+        try:
+            with db.begin_nested():
+                dispatch(db, evenement.topic, evenement.payload)
+        except Exception as e:
+            attempts = evenement.attempts + 1
+            erreur = f"{type(e).__name__}: {e}"[:2000]
+            if attempts >= settings.outbox_max_attempts:
+                db.execute(insert(OutboxDeadLetter).values(
+                    id=evenement.id,
+                    topic=evenement.topic,
+                    payload=evenement.payload,
+                    created_at=evenement.created_at,
+                    attempts=attempts,
+                    last_error=erreur,
+                ))
+                db.execute(delete(OutboxEvent).where(OutboxEvent.id == evenement.id))
+                abandonnes += 1
+                logger.error("Événement %s (%s) abandonné après %d tentatives : %s",
+                             evenement.id, evenement.topic, attempts, erreur)
+            else:
+                delai = retry_delay(attempts)
+                db.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id == evenement.id)
+                    .values(
+                        attempts=attempts,
+                        last_error=erreur,
+                        available_at=func.now() + timedelta(seconds=delai),
+                    )
+                )
+                reportes += 1
+                logger.warning("Événement %s (%s) en échec, tentative %d, reprise dans %.0fs : %s",
+                               evenement.id, evenement.topic, attempts, delai, erreur)
+        else:
+            traites.append(evenement.id)
+    if traites:
+        db.execute(delete(OutboxEvent).where(OutboxEvent.id.in_(traites)))
+    db.commit()
+    return len(traites), reportes, abandonnes
+
+
+def outbox_stats(db: Session) -> dict:
+    """Taille de la file, âge du plus ancien événement et nombre de dead letters"""
+    en_attente, disponibles, plus_ancien = db.execute(
+        select(
+            func.count(),
+            func.count().filter(OutboxEvent.available_at <= func.now()),
+            func.extract("epoch", func.now() - func.min(OutboxEvent.created_at)),
+        )
+    ).one()
+    abandonnes = db.execute(select(func.count()).select_from(OutboxDeadLetter)).scalar()
+    db.rollback()
+    return {
+        "pending": en_attente,
+        "ready": disponibles,
+        "oldest_seconds": round(float(plus_ancien), 1) if plus_ancien is not None else None,
+        "dead": abandonnes,
+    }
+
+
+def requeue_dead_letters(db: Session, ids: Optional[List[int]] = None) -> int:
+    """Remet en file les dead letters (toutes, ou celles de `ids`) avec un compteur à zéro"""
+    condition = OutboxDeadLetter.id.in_(ids) if ids else true()
+    remis = db.execute(
+        insert(OutboxEvent).from_select(
+            ["topic", "payload", "created_at"],
+            select(OutboxDeadLetter.topic, OutboxDeadLetter.payload, OutboxDeadLetter.created_at)
+            .where(condition)
+            .order_by(OutboxDeadLetter.id)
+        )
+    ).rowcount
+    db.execute(delete(OutboxDeadLetter).where(condition))
+    db.execute(text("SELECT pg_notify(:canal, 'requeue')"), {"canal": OUTBOX_CHANNEL})
+    db.commit()
+    return remis
+
+
+# =====================================
+# Traitements
+# =====================================
+
+@handler("signalement.created", "signalement.updated")
+def alert_high_severity(db: Session, payload: dict) -> None:
+    """
+    Alerte pour chaque signalement de gravité élevée : un NOTIFY sur
+    ALERTES_CHANNEL par signalement. Pour une mise à jour, seulement si la
+    gravité fait partie des champs modifiés. Un événement rejoué peut
+    renvoyer une alerte : les consommateurs dédoublonnent sur l'id.
+    """
+    if "champs" in payload and "gravite" not in payload["champs"]:
+        return
+    rows = db.execute(
+        select(
+            Signalement.id,
+            Signalement.date_signalement,
+            Signalement.heure_signalement,
+            Signalement.lieu,
+            Signalement.type_evenement,
+            Signalement.nom_agent,
+        )
+        .where(Signalement.id.in_(payload["ids"]), Signalement.gravite == GraviteEvenement.ELEVEE)
+        .order_by(Signalement.id)
+    ).all()
+    for row in rows:
+        alerte = {
+            "id": row.id,
+            "date_signalement": row.date_signalement.isoformat(),
+            "heure_signalement": row.heure_signalement.isoformat(),
+            "lieu": row.lieu,
+            "type_evenement": row.type_evenement.value,
+            "nom_agent": row.nom_agent,
+        }
+        db.execute(text("SELECT pg_notify(:canal, :payload)"),
+                   {"canal": ALERTES_CHANNEL, "payload": json.dumps(alerte, separators=(",", ":"))})
+    if rows:
+        logger.warning("Gravité élevée : %d signalement(s) %s", len(rows), [row.id for row in rows])
@@ -0,0 +1,80 @@
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+TABLE = "signalements"
+DEFAULT_PARTITION = "signalements_default"
+
+
+def partition_name(mois: date) -> str:
+    return f"{TABLE}_p{mois:%Y_%m}"
+
+
+def _premier_du_mois(jour: date) -> date:
+    return date(jour.year, jour.month, 1)
+
+
+def _mois_suivant(mois: date) -> date:
+    return date(mois.year + (mois.month == 12), mois.month % 12 + 1, 1)
+
+
+def list_partitions(db: Session) -> List[dict]:
+    """Partitions attachées à signalements, avec leurs bornes et leur taille estimée"""
+    rows = db.execute(text("""
+        SELECT c.relname AS nom,
+               pg_get_expr(c.relpartbound, c.oid) AS bornes,
+               c.reltuples::bigint AS lignes_estimees
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = :table
+        ORDER BY c.relname
+    """), {"table": TABLE}).mappings().all()
+    return [dict(row) for row in rows]
+
+
+def ensure_partitions(db: Session, months_ahead: int = 3, today: Optional[date] = None) -> List[str]:
+    """
+    Crée à l'avance les partitions mensuelles manquantes, du mois courant
+    jusqu'à `months_ahead` mois plus tard. Retourne les partitions créées.
+
+    À lancer régulièrement (cron, manage_partitions.py ensure) : les lignes
+    hors de toute partition mensuelle tombent dans signalements_default,
+    et une partition ne peut pas être créée pour un mois déjà présent dans
+    la partition par défaut.
+    """
+    existantes = {p["nom"] for p in list_partitions(db)}
+    mois = _premier_du_mois(today or date.today())
+    creees = []
+    for _ in range(months_ahead + 1):
+        suivant = _mois_suivant(mois)
+        nom = partition_name(mois)
+        if nom not in existantes:
+            db.execute(text(
+                f"CREATE TABLE {nom} PARTITION OF {TABLE} "
+                f"FOR VALUES FROM ('{mois.isoformat()}') TO ('{suivant.isoformat()}')"
+            ))
+            creees.append(nom)
+        mois = suivant
+    db.commit()
+    return creees
+
+
+def detach_partition(db: Session, mois: date, archive_schema: Optional[str] = None) -> str:
+    """
+    Détache la partition d'un mois (et la déplace dans `archive_schema`).
+
+    Les lignes détachées ne sont plus visibles par l'API mais restent
+    interrogeables dans la table détachée, qui peut être exportée puis
+    supprimée. Le rollup signalement_daily_stats n'est pas modifié :
+    lancer refresh_stats.py pour retirer ces lignes des statistiques.
+    """
+    nom = partition_name(_premier_du_mois(mois))
+    db.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {nom}"))
+    if archive_schema:
+        db.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"'))
+        db.execute(text(f'ALTER TABLE {nom} SET SCHEMA "{archive_schema}"'))
+    db.commit()
+    return nom
@@ -0,0 +1,45 @@
+import enum
+import json
+from datetime import date, datetime, time
+from typing import Sequence
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # encodeur de la bibliothèque standard en repli
+    orjson = None
+
+
+def _default(valeur):
+    if isinstance(valeur, enum.Enum):
+        return valeur.value
+    if isinstance(valeur, (date, datetime, time)):
+        return valeur.isoformat()
+    raise TypeError(f"Type non sérialisable : {type(valeur).__name__}")
+
+
+def dumps_rows(rows: Sequence) -> bytes:
+    """
+    Encode des lignes SQLAlchemy (Row) en tableau JSON d'objets.
+
+    Les lignes viennent de la base : aucune validation Pydantic n'est
+    rejouée. Dates, heures et enums sont encodés comme par
+    SignalementResponse (ISO 8601, valeur de l'enum).
+    """
+    if not rows:
+        return b"[]"
+    noms = rows[0]._fields
+    objets = [dict(zip(noms, row)) for row in rows]
+    if orjson is not None:
+        return orjson.dumps(objets)
+    return json.dumps(objets, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class RowsResponse(Response):
+    """Réponse JSON d'une liste de Row, sans passer par response_model ni jsonable_encoder"""
+
+    media_type = "application/json"
+
+    def render(self, content: Sequence) -> bytes:
+        return dumps_rows(content)
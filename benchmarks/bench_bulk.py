@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'ingestion : création unitaire vs lot.
+
+Compare le débit (signalements/s) de SignalementCRUD.create_signalement
+appelé N fois et de create_signalements_bulk appelé une fois sur N lignes.
+Les lignes insérées sont supprimées à la fin (id_agent BENCH-BULK).
+
+Usage : python -m benchmarks.bench_bulk [--rows 5000]
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+from benchmarks.common import QueryCounter
+from app.database import engine, SessionLocal
+from app.models import Signalement
+from app.models.models import ActionEntreprise, GraviteEvenement, SourceInformation, TypeEvenement
+from app.schemas import SignalementCreate
+from app.services.crud import crud_signalement
+
+ID_AGENT = "BENCH-BULK"
+
+
+def lot(n: int):
+    return [
+        SignalementCreate(
+            date_signalement=datetime.now().date(),
+            heure_signalement=datetime.now().time(),
+            nom_agent="Agent benchmark",
+            id_agent=ID_AGENT,
+            type_evenement=list(TypeEvenement)[i % 3],
+            gravite=list(GraviteEvenement)[i % 3],
+            lieu="Balbala",
+            source_information=list(SourceInformation)[i % 3],
+            action_entreprise=list(ActionEntreprise)[i % 3],
+            commentaire_complementaire=f"Ligne de benchmark {i}",
+        )
+        for i in range(n)
+    ]
+
+
+def nettoyer(db):
+    for signalement in db.query(Signalement).filter(Signalement.id_agent == ID_AGENT):
+        crud_signalement.delete_signalement(db, signalement.id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+    signalements = lot(args.rows)
+
+    db = SessionLocal()
+    try:
+        with QueryCounter(engine) as unitaire:
+            debut = time.perf_counter()
+            for signalement in signalements:
+                crud_signalement.create_signalement(db, signalement)
+            duree_unitaire = time.perf_counter() - debut
+        nettoyer(db)
+
+        with QueryCounter(engine) as en_lot:
+            debut = time.perf_counter()
+            crud_signalement.create_signalements_bulk(db, signalements)
+            duree_lot = time.perf_counter() - debut
+        nettoyer(db)
+    finally:
+        db.close()
+
+    print(f"Unitaire : {args.rows / duree_unitaire:,.0f} signalements/s ({unitaire.count} requêtes)")
+    print(f"Lot      : {args.rows / duree_lot:,.0f} signalements/s ({en_lot.count} requêtes)")
+    print(f"Gain     : x{duree_unitaire / duree_lot:.1f}")
+
+
+if __name__ == "__main__":
+    main()
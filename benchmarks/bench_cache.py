@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark du cache des réponses GET /signalements.
+
+Pour chaque URL : une première requête (MISS) récupère l'ETag, puis deux
+charges sont comparées, requêtes simples servies depuis le cache (HIT) et
+requêtes conditionnelles If-None-Match (304 sans corps ni PostgreSQL).
+Pour la référence sans cache, relancer l'API avec RESPONSE_CACHE_BACKEND=off.
+
+Usage : python -m benchmarks.bench_cache --base-url http://localhost:8000 \\
+            [--concurrency 50] [--duration 10]
+"""
+
+import argparse
+import asyncio
+import json
+
+import httpx
+
+from benchmarks.load import run_load
+
+CHEMINS = [
+    "/api/v1/signalements/statistiques",
+    "/api/v1/signalements/?limit=50",
+    "/api/v1/signalements/?limit=50&gravite=Élevée",
+]
+
+
+async def bench(base_url: str, concurrency: int, duration: float):
+    resultats = {}
+    async with httpx.AsyncClient(timeout=60.0) as client:
+        for chemin in CHEMINS:
+            url = base_url + chemin
+            premiere = await client.get(url)
+            etag = premiere.headers.get("etag")
+            revalidation = await client.get(url, headers={"If-None-Match": etag} if etag else None)
+            resultats[chemin] = {
+                "first": {"status": premiere.status_code, "x_cache": premiere.headers.get("x-cache")},
+                "revalidation_status": revalidation.status_code,
+                "cached": await run_load([url], concurrency, duration),
+                "conditional": await run_load(
+                    [url], concurrency, duration, headers={"If-None-Match": etag} if etag else None
+                ),
+            }
+    return resultats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    resultats = asyncio.run(bench(args.base_url, args.concurrency, args.duration))
+    print(json.dumps(resultats, indent=2))
+    for chemin, resultat in resultats.items():
+        print(f"{chemin}")
+        print(f"   cache (200) : {resultat['cached'].get('rps')} req/s, p99 {resultat['cached'].get('p99_ms')} ms")
+        print(f"   If-None-Match (304) : {resultat['conditional'].get('rps')} req/s, p99 {resultat['conditional'].get('p99_ms')} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Vérifie que l'export en flux garde une mémoire constante.
+
+Consomme l'intégralité de l'export (sans filtre) dans le processus courant
+et compare le pic de RSS au pic mesuré avant l'export. Échoue (code 1) si
+l'augmentation dépasse le budget. Peupler d'abord la base, par exemple
+`python -m benchmarks.seed --rows 5000000`.
+
+Usage : python -m benchmarks.bench_export [--format csv] [--budget-mb 150]
+"""
+
+import argparse
+import resource
+import sys
+import time
+
+from app.services.export import STREAMERS, iter_batches, parquet_available
+
+
+def pic_rss_mb() -> float:
+    # ru_maxrss est en kilo-octets sous Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--format", choices=sorted(STREAMERS), default="csv")
+    parser.add_argument("--budget-mb", type=float, default=150.0)
+    args = parser.parse_args()
+
+    if args.format == "parquet" and not parquet_available():
+        sys.exit("pyarrow n'est pas installé")
+    if args.format == "parquet":
+        import pyarrow.parquet  # noqa: F401  (chargé avant la mesure de référence)
+
+    avant = pic_rss_mb()
+    octets, lignes = 0, 0
+
+    def compter(batches):
+        nonlocal lignes
+        for lot in batches:
+            lignes += len(lot)
+            yield lot
+
+    debut = time.perf_counter()
+    for morceau in STREAMERS[args.format](compter(iter_batches())):
+        octets += len(morceau)
+    duree = time.perf_counter() - debut
+    apres = pic_rss_mb()
+
+    print(f"Lignes exportées : {lignes:,}")
+    print(f"Volume           : {octets / 1024 / 1024:,.1f} Mo en {duree:.1f}s ({lignes / duree:,.0f} lignes/s)")
+    print(f"Pic RSS          : {avant:.1f} Mo -> {apres:.1f} Mo (+{apres - avant:.1f} Mo, budget {args.budget_mb} Mo)")
+    sys.exit(0 if apres - avant <= args.budget_mb else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark « tempête de connexions » (changement d'équipe).
+
+Lance simultanément N clients qui enchaînent des POST /auth/login et M
+clients qui interrogent un endpoint léger, puis compare les latences p99
+des deux flux. Sans pool bcrypt dédié, la latence de l'endpoint léger
+s'envole pendant la tempête ; avec, elle doit rester proche du repos.
+
+Usage : python -m benchmarks.bench_login_storm --base-url http://localhost:8000 \\
+            [--logins 100] [--probes 20] [--duration 20] [--username user --password user123]
+"""
+
+import argparse
+import asyncio
+import json
+
+from benchmarks.load import run_load
+
+
+async def storm(base_url: str, logins: int, probes: int, duration: float, username: str, password: str):
+    login_url = f"{base_url}/api/v1/auth/login"
+    probe_url = f"{base_url}/api/v1/signalements/statistiques"
+
+    repos = await run_load([probe_url], probes, duration / 2)
+    connexion, sonde = await asyncio.gather(
+        run_load(
+            [login_url], logins, duration, method="POST",
+            data={"username": username, "password": password},
+        ),
+        run_load([probe_url], probes, duration),
+    )
+    return {"probe_idle": repos, "login_storm": connexion, "probe_during_storm": sonde}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--probes", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--username", default="user")
+    parser.add_argument("--password", default="user123")
+    args = parser.parse_args()
+
+    resultat = asyncio.run(storm(args.base_url, args.logins, args.probes, args.duration, args.username, args.password))
+    print(json.dumps(resultat, indent=2))
+    print(f"p99 login             : {resultat['login_storm'].get('p99_ms')} ms")
+    print(f"p99 sonde (repos)     : {resultat['probe_idle'].get('p99_ms')} ms")
+    print(f"p99 sonde (tempête)   : {resultat['probe_during_storm'].get('p99_ms')} ms")
+
+
+if __name__ == "__main__":
+    main()
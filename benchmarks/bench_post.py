@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la latence de création (chemin de POST /signalements).
+
+Mesure SignalementCRUD.create_signalement appelé N fois, latences
+p50/p95/p99 et requêtes SQL par appel, dans trois configurations :
+
+    sans_outbox   OUTBOX_ENABLED=false, gazetteer déjà chargé
+    outbox        OUTBOX_ENABLED=true (INSERT outbox_events + NOTIFY en plus)
+    gazetteer     OUTBOX_ENABLED=false, gazetteer rechargé dans la requête à
+                  chaque appel (ce que payait un POST à chaque expiration de
+                  GEOCODE_RELOAD_SECONDS avant le rechargement en tâche de fond)
+
+Les lignes insérées sont supprimées à la fin (id_agent BENCH-POST) ; les
+événements d'outbox créés sont consommés par outbox_worker.py (l'alerte
+ignore les signalements supprimés).
+
+Usage : python -m benchmarks.bench_post [--rows 2000]
+"""
+
+import argparse
+import itertools
+
+from benchmarks.bench_bulk import lot
+from benchmarks.common import QueryCounter, summarize, time_calls
+from app.core.config import settings
+from app.database import engine, SessionLocal
+from app.models import Signalement
+from app.services.crud import crud_signalement
+from app.services.geocoding import geocoder
+
+ID_AGENT = "BENCH-POST"
+
+
+def mesurer(db, signalements, outbox: bool, rechargement: bool):
+    settings.outbox_enabled = outbox
+    geocoder.reload_seconds = 0 if rechargement else settings.geocode_reload_seconds
+    suivants = itertools.cycle(signalements)
+    with QueryCounter(engine) as requetes:
+        durees = time_calls(lambda: crud_signalement.create_signalement(db, next(suivants)), len(signalements))
+    return summarize(durees), requetes.count / (len(signalements) + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+    signalements = [signalement.model_copy(update={"id_agent": ID_AGENT}) for signalement in lot(args.rows)]
+    outbox_initial = settings.outbox_enabled
+
+    db = SessionLocal()
+    try:
+        resultats = {
+            "sans_outbox": mesurer(db, signalements, outbox=False, rechargement=False),
+            "outbox": mesurer(db, signalements, outbox=True, rechargement=False),
+            "gazetteer": mesurer(db, signalements, outbox=False, rechargement=True),
+        }
+        settings.outbox_enabled = False
+        for signalement in db.query(Signalement.id).filter(Signalement.id_agent == ID_AGENT).all():
+            crud_signalement.delete_signalement(db, signalement.id)
+    finally:
+        settings.outbox_enabled = outbox_initial
+        geocoder.reload_seconds = settings.geocode_reload_seconds
+        db.close()
+
+    for nom, (resume, requetes) in resultats.items():
+        print(f"{nom:<12} p50 {resume['p50_ms']:7.2f} ms  p95 {resume['p95_ms']:7.2f} ms  "
+              f"p99 {resume['p99_ms']:7.2f} ms  {requetes:.1f} requêtes/appel")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Passage à l'échelle du serveur de production sur plusieurs cœurs.
+
+Pour chaque nombre de workers (1, 2, 4... jusqu'au nombre de cœurs), lance
+`gunicorn -c gunicorn.conf.py app.main:app` avec WEB_CONCURRENCY=N, attend
+/ready, charge les URL pendant --duration secondes puis arrête le serveur
+par SIGTERM (arrêt gracieux). Affiche le débit et l'efficacité par rapport
+à un passage à l'échelle linéaire (débit N / (N x débit 1 worker)).
+
+Le cache des réponses est désactivé pour mesurer le travail réel des
+workers. Le générateur de charge tourne dans --load-processes processus :
+sur la même machine, il consomme lui aussi des cœurs, à prendre en compte
+dans la lecture des résultats. Lancer d'abord `python -m benchmarks.seed`.
+
+Usage : python -m benchmarks.bench_scaling [--workers 1,2,4,8] [--duration 15] \\
+            [--concurrency 64] [--load-processes 2] [--port 8100] [URL_PATH ...]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+
+from app.core.config import settings
+from benchmarks.load import run_load
+
+CHEMINS = ["/api/v1/signalements/?limit=50", "/api/v1/signalements/statistiques"]
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        WEB_CONCURRENCY=str(workers),
+        PORT=str(port),
+        RESPONSE_CACHE_BACKEND="off",
+        DEBUG="False",
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_ready(base_url: str, timeout: float = 30.0) -> None:
+    fin = time.monotonic() + timeout
+    while time.monotonic() < fin:
+        try:
+            if httpx.get(f"{base_url}/ready", timeout=2.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Serveur non prêt après {timeout:.0f} s")
+
+
+def stop_server(process: subprocess.Popen) -> float:
+    """SIGTERM puis attente : retourne la durée de l'arrêt gracieux"""
+    debut = time.perf_counter()
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=settings.graceful_timeout + 10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    return time.perf_counter() - debut
+
+
+def _charge(urls, concurrency, duration):
+    return asyncio.run(run_load(urls, concurrency, duration))
+
+
+def measure(urls, concurrency: int, duration: float, processes: int) -> dict:
+    """Charge répartie sur plusieurs processus ; débits additionnés"""
+    par_processus = max(1, concurrency // processes)
+    with ProcessPoolExecutor(processes) as pool:
+        resultats = list(pool.map(_charge, [urls] * processes, [par_processus] * processes, [duration] * processes))
+    return {
+        "requests": sum(r["requests"] for r in resultats),
+        "errors": sum(r["errors"] for r in resultats),
+        "rps": round(sum(r["rps"] for r in resultats), 1),
+        "p50_ms": max(r.get("p50_ms", 0.0) for r in resultats),
+        "p95_ms": max(r.get("p95_ms", 0.0) for r in resultats),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", default=CHEMINS)
+    parser.add_argument("--workers", default="")
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--load-processes", type=int, default=2)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    if args.workers:
+        paliers = [int(n) for n in args.workers.split(",")]
+    else:
+        paliers = [n for n in (1, 2, 4, 8, 16, 32) if n <= settings.workers] or [1]
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    urls = [base_url + chemin for chemin in args.paths]
+    resultats = []
+    for workers in paliers:
+        process = start_server(workers, args.port)
+        try:
+            wait_ready(base_url)
+            _charge(urls, args.concurrency, 2.0)  # chauffe : connexions des pools
+            resultat = measure(urls, args.concurrency, args.duration, args.load_processes)
+        finally:
+            arret = stop_server(process)
+        resultat.update(workers=workers, shutdown_s=round(arret, 2))
+        resultats.append(resultat)
+
+    reference = resultats[0]["rps"] / resultats[0]["workers"] if resultats[0]["rps"] else 0.0
+    print(json.dumps(resultats, indent=2))
+    print(f"{'Workers':>8} {'req/s':>10} {'efficacité':>11} {'p95 ms':>9} {'arrêt s':>8}")
+    for r in resultats:
+        efficacite = r["rps"] / (r["workers"] * reference) if reference else 0.0
+        print(f"{r['workers']:>8} {r['rps']:>10.1f} {efficacite:>10.0%} {r['p95_ms']:>9.1f} {r['shutdown_s']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la recherche (/signalements/search) avant / après indexation.
+
+« avant » rejoue l'ancienne requête (quatre ILIKE '%terme%' combinés par OR,
+triés par created_at), « après » appelle SignalementCRUD.search_signalements
+(tsvector + pg_trgm, tri par pertinence). Lancer d'abord
+`python -m benchmarks.seed --rows 1000000`.
+
+Usage : python -m benchmarks.bench_search [--iterations 10] [--terme balbala ...]
+"""
+
+import argparse
+
+from benchmarks.common import summarize, time_calls
+from sqlalchemy import or_
+from app.database import SessionLocal
+from app.models import Signalement
+from app.services.crud import crud_signalement
+
+
+def recherche_ilike(db, terme: str, limit: int = 50):
+    """Ancienne implémentation, conservée comme référence"""
+    motif = f"%{terme}%"
+    return db.query(Signalement).filter(
+        or_(
+            Signalement.lieu.ilike(motif),
+            Signalement.commentaire_complementaire.ilike(motif),
+            Signalement.nom_agent.ilike(motif),
+            Signalement.id_agent.ilike(motif)
+        )
+    ).order_by(Signalement.created_at.desc()).limit(limit).all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--terme", action="append", default=None)
+    args = parser.parse_args()
+    termes = args.terme or ["balbala", "Agent 42", "AG00042", "synthétique 12345", "tadjoura"]
+
+    db = SessionLocal()
+    try:
+        for terme in termes:
+            avant = summarize(time_calls(lambda: recherche_ilike(db, terme), args.iterations))
+            apres = summarize(time_calls(lambda: crud_signalement.search_signalements(db, terme), args.iterations))
+            print(f"« {terme} »")
+            print(f"   avant : p50 {avant['p50_ms']:.1f} ms, p95 {avant['p95_ms']:.1f} ms")
+            print(f"   après : p50 {apres['p50_ms']:.1f} ms, p95 {apres['p95_ms']:.1f} ms")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
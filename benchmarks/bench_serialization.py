@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark de la sérialisation des listes de signalements.
+
+Compare, pour une page de N signalements lue en base :
+  - avant : objets ORM validés par List[SignalementResponse] (validateurs
+    source_autre / action_autre compris), jsonable_encoder puis json.dumps,
+    comme le fait FastAPI avec response_model ;
+  - après : lignes des seules colonnes utiles (as_rows=True) encodées par
+    dumps_rows (orjson).
+Le chargement (objets ORM vs lignes) et l'encodage sont mesurés séparément.
+Lancer d'abord `python -m benchmarks.seed`.
+
+Usage : python -m benchmarks.bench_serialization [--rows 500] [--iterations 50]
+"""
+
+import argparse
+import json
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from benchmarks.common import summarize, time_calls
+from app.database import SessionLocal
+from app.schemas import SignalementResponse
+from app.services.crud import crud_signalement
+from app.services.serialization import dumps_rows, orjson
+
+ADAPTER = TypeAdapter(List[SignalementResponse])
+
+
+def avant(objets) -> bytes:
+    valides = ADAPTER.validate_python(objets, from_attributes=True)
+    contenu = jsonable_encoder(ADAPTER.dump_python(valides, mode="json"))
+    return json.dumps(contenu, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        lecture_objets = time_calls(lambda: crud_signalement.get_signalements(db, limit=args.rows), args.iterations)
+        lecture_lignes = time_calls(
+            lambda: crud_signalement.get_signalements(db, limit=args.rows, as_rows=True), args.iterations
+        )
+        objets = crud_signalement.get_signalements(db, limit=args.rows)
+        lignes = crud_signalement.get_signalements(db, limit=args.rows, as_rows=True)
+    finally:
+        db.close()
+
+    if json.loads(avant(objets)) != json.loads(dumps_rows(lignes)):
+        print("⚠️ Les deux encodages diffèrent")
+
+    n = len(lignes)
+    encodage_avant = time_calls(lambda: avant(objets), args.iterations)
+    encodage_apres = time_calls(lambda: dumps_rows(lignes), args.iterations)
+
+    print(f"Lignes par page          : {n} (encodeur : {'orjson' if orjson else 'json (repli)'})")
+    for nom, durees in (
+        ("Lecture objets ORM", lecture_objets),
+        ("Lecture lignes", lecture_lignes),
+        ("Encodage avant", encodage_avant),
+        ("Encodage après", encodage_apres),
+    ):
+        resume = summarize(durees)
+        debit = n / (resume["p50_ms"] / 1000) if resume["p50_ms"] else float("inf")
+        print(f"{nom:<25}: médiane {resume['p50_ms']:.2f} ms, p95 {resume['p95_ms']:.2f} ms, {debit:,.0f} lignes/s")
+
+
+if __name__ == "__main__":
+    main()
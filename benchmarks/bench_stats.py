@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Benchmark de SignalementCRUD.get_signalements_stats.
+
+Mesure le nombre de requêtes SQL émises et la latence (min / médiane / p95)
+d'un appel aux statistiques. Lancer d'abord `python -m benchmarks.seed`.
+
+Usage : python -m benchmarks.bench_stats [--iterations 20]
+"""
+
+import argparse
+
+from benchmarks.common import QueryCounter, summarize, time_calls
+from sqlalchemy import text
+from app.database import engine, SessionLocal
+from app.services.crud import crud_signalement
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        lignes = db.execute(text("SELECT count(*) FROM signalements")).scalar()
+        with QueryCounter(engine) as compteur:
+            durees = time_calls(lambda: crud_signalement.get_signalements_stats(db), args.iterations, warmup=0)
+    finally:
+        db.close()
+
+    resume = summarize(durees)
+    print(f"Lignes dans signalements : {lignes}")
+    print(f"Requêtes par appel       : {compteur.count / args.iterations:.1f}")
+    print(f"Latence min              : {resume['min_ms']:.1f} ms")
+    print(f"Latence médiane          : {resume['p50_ms']:.1f} ms")
+    print(f"Latence p95              : {resume['p95_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark du flux temps réel GET /signalements/stream.
+
+Ouvre N connexions SSE sur une API démarrée (un seul worker, LIVE_FEED=true),
+compte les connexions PostgreSQL avant et après (pg_stat_activity), puis
+crée un signalement et mesure le délai jusqu'à sa réception par tous les
+clients. Le nombre de connexions doit rester constant quel que soit N :
+une connexion LISTEN par worker. Le signalement créé est supprimé à la fin.
+
+Usage : python -m benchmarks.bench_stream --base-url http://localhost:8000 [--clients 1000]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+from sqlalchemy import text
+
+from benchmarks.bench_bulk import lot
+from benchmarks.common import summarize
+from app.database import SessionLocal
+from app.services.crud import crud_signalement
+
+
+def connexions_postgres() -> int:
+    db = SessionLocal()
+    try:
+        return db.execute(text(
+            "SELECT count(*) FROM pg_stat_activity "
+            "WHERE datname = current_database() AND pid <> pg_backend_pid()"
+        )).scalar()
+    finally:
+        db.close()
+
+
+async def client_sse(client: httpx.AsyncClient, url: str, pret: asyncio.Event, connectes: list, recus: dict, cible: dict):
+    async with client.stream("GET", url) as response:
+        async for ligne in response.aiter_lines():
+            if ligne.startswith("event: ready"):
+                connectes.append(1)
+                if len(connectes) == cible["clients"]:
+                    pret.set()
+            elif ligne.startswith("data: ") and cible.get("id") is not None:
+                evenement = json.loads(ligne[len("data: "):])
+                if evenement.get("signalement", {}).get("id") == cible["id"]:
+                    recus[id(response)] = time.perf_counter()
+                    return
+
+
+async def bench(base_url: str, clients: int, timeout: float):
+    url = f"{base_url}/api/v1/signalements/stream"
+    avant = connexions_postgres()
+
+    pret = asyncio.Event()
+    connectes, recus = [], {}
+    cible = {"clients": clients, "id": None}
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(limits=limits, timeout=None) as client:
+        taches = [asyncio.create_task(client_sse(client, url, pret, connectes, recus, cible)) for _ in range(clients)]
+        await asyncio.wait_for(pret.wait(), timeout)
+        pendant = connexions_postgres()
+
+        db = SessionLocal()
+        try:
+            debut = time.perf_counter()
+            signalement = crud_signalement.create_signalement(db, lot(1)[0])
+            cible["id"] = signalement.id
+            await asyncio.wait(taches, timeout=timeout)
+            crud_signalement.delete_signalement(db, signalement.id)
+        finally:
+            db.close()
+        for tache in taches:
+            tache.cancel()
+
+    delais = [(recu - debut) * 1000 for recu in recus.values()]
+    resultat = {
+        "clients": clients,
+        "pg_connections_before": avant,
+        "pg_connections_with_clients": pendant,
+        "received": len(delais),
+    }
+    if delais:
+        resultat["fanout_latency"] = summarize(delais)
+    return resultat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    resultat = asyncio.run(bench(args.base_url, args.clients, args.timeout))
+    print(json.dumps(resultat, indent=2))
+    print(f"Connexions PostgreSQL : {resultat['pg_connections_before']} sans client, "
+          f"{resultat['pg_connections_with_clients']} avec {args.clients} clients")
+
+
+if __name__ == "__main__":
+    main()
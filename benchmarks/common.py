@@ -0,0 +1,60 @@
+"""Outils partagés par les scripts de benchmark"""
+
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """Compte les requêtes exécutées sur un engine"""
+
+    def __init__(self, bind):
+        self.count = 0
+        self.bind = bind
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.bind, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.bind, "before_cursor_execute", self._on_execute)
+
+
+def percentile(valeurs: List[float], p: float) -> float:
+    """Percentile (méthode du rang le plus proche) d'une liste non vide"""
+    ordonnees = sorted(valeurs)
+    rang = max(0, min(len(ordonnees) - 1, int(round(p / 100 * len(ordonnees) + 0.5)) - 1))
+    return ordonnees[rang]
+
+
+def summarize(durees_ms: List[float]) -> Dict[str, float]:
+    """Résumé min / p50 / p95 / p99 / max d'une série de latences"""
+    return {
+        "min_ms": round(min(durees_ms), 3),
+        "p50_ms": round(statistics.median(durees_ms), 3),
+        "p95_ms": round(percentile(durees_ms, 95), 3),
+        "p99_ms": round(percentile(durees_ms, 99), 3),
+        "max_ms": round(max(durees_ms), 3),
+    }
+
+
+def time_calls(fn: Callable[[], object], iterations: int, warmup: int = 1) -> List[float]:
+    """Exécute fn() `iterations` fois et retourne les durées en millisecondes"""
+    for _ in range(warmup):
+        fn()
+    durees = []
+    for _ in range(iterations):
+        debut = time.perf_counter()
+        fn()
+        durees.append((time.perf_counter() - debut) * 1000)
+    return durees
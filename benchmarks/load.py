@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Générateur de charge HTTP minimal (httpx + asyncio).
+
+Envoie des requêtes GET en boucle sur une ou plusieurs URL avec N clients
+concurrents pendant une durée fixe, puis affiche le débit et les latences.
+Permet par exemple de comparer DATABASE_ASYNC=false et DATABASE_ASYNC=true :
+
+    python -m benchmarks.load --concurrency 200 --duration 30 \\
+        http://localhost:8000/api/v1/signalements/statistiques \\
+        "http://localhost:8000/api/v1/signalements/?limit=50"
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import summarize
+
+
+async def run_load(
+    urls: List[str],
+    concurrency: int,
+    duration: float,
+    method: str = "GET",
+    headers: Optional[Dict[str, str]] = None,
+    data=None,
+    json_body=None,
+    once: bool = False,
+) -> Dict[str, object]:
+    """
+    Charge les URL pendant `duration` secondes ; retourne débit et latences.
+
+    Avec once=True, chaque URL n'est appelée qu'une fois (suppressions, par
+    exemple) et la charge s'arrête plus tôt si la liste est épuisée.
+    """
+    durees: List[float] = []
+    erreurs = 0
+    cycle = iter(urls) if once else itertools.cycle(urls)
+    fin = time.perf_counter() + duration
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60.0, headers=headers) as client:
+        async def worker():
+            nonlocal erreurs
+            while time.perf_counter() < fin:
+                url = next(cycle, None)
+                if url is None:
+                    return
+                debut = time.perf_counter()
+                try:
+                    response = await client.request(method, url, data=data, json=json_body)
+                    if response.status_code >= 400:
+                        erreurs += 1
+                except httpx.HTTPError:
+                    erreurs += 1
+                durees.append((time.perf_counter() - debut) * 1000)
+
+        debut = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        ecoule = time.perf_counter() - debut
+
+    resultat = {
+        "requests": len(durees),
+        "errors": erreurs,
+        "concurrency": concurrency,
+        "duration_s": round(ecoule, 3),
+        "rps": round(len(durees) / ecoule, 1) if ecoule else 0.0,
+    }
+    if durees:
+        resultat.update(summarize(durees))
+    return resultat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=15.0)
+    args = parser.parse_args()
+
+    resultat = asyncio.run(run_load(args.urls, args.concurrency, args.duration))
+    print(json.dumps(resultat, indent=2))
+
+
+if __name__ == "__main__":
+    main()
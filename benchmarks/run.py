@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks de l'API : chaque route de /api/v1/signalements et de
+/api/v1/auth est chargée tour à tour contre un serveur en cours d'exécution.
+
+Pour chaque scénario : débit (req/s), latences p50/p95/p99, erreurs et
+nombre moyen de requêtes SQL par requête HTTP (différence de l'histogramme
+http_request_db_queries de /metrics avant et après le scénario). Les
+métriques étant propres à chaque worker, lancer le serveur avec un seul
+worker pour des requêtes SQL par requête fiables :
+
+    WEB_CONCURRENCY=1 RESPONSE_CACHE_BACKEND=off gunicorn -c gunicorn.conf.py app.main:app
+
+Les résultats sont écrits en JSON (--output) ; avec --baseline, ils sont
+comparés à un résultat précédent et le code de sortie vaut 1 si un
+scénario régresse au-delà de --threshold (débit, p95) ou émet plus de
+requêtes SQL.
+
+Les écritures portent sur des signalements créés par la suite (agent
+BENCH_SUITE), supprimés à la fin. /stream (connexions longues) est mesuré
+par bench_stream.py.
+
+Usage : python -m benchmarks.run [--base-url http://localhost:8000] [--seed-rows 1000000]
+            [--concurrency 32] [--duration 10] [--only liste,statistiques]
+            [--output resultats.json] [--baseline precedent.json] [--threshold 0.15]
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import httpx
+from sqlalchemy import text
+
+from benchmarks.load import run_load
+from benchmarks.seed import seed
+from app.database import engine
+from app.models.models import ActionEntreprise, GraviteEvenement, SourceInformation, TypeEvenement
+
+API = "/api/v1"
+ID_AGENT = "BENCH_SUITE"
+
+_SERIE = re.compile(r'^(?P<nom>[a-z_]+)\{(?P<labels>[^}]*)\} (?P<valeur>\S+)$')
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+class Scenario(NamedTuple):
+    name: str
+    method: str
+    route: str  # route déclarée, label des métriques
+    build: Callable[[dict], dict]  # contexte -> arguments de run_load
+
+
+def signalement(i: int) -> dict:
+    return {
+        "nom_agent": "Agent benchmark",
+        "id_agent": ID_AGENT,
+        "type_evenement": list(TypeEvenement)[i % len(TypeEvenement)].value,
+        "gravite": list(GraviteEvenement)[i % len(GraviteEvenement)].value,
+        "lieu": "Balbala",
+        "source_information": SourceInformation.OBSERVATION_DIRECTE.value,
+        "action_entreprise": ActionEntreprise.ALERTE_TRANSMISE.value,
+        "commentaire_complementaire": f"Benchmark {i}",
+    }
+
+
+def _ids(ctx, cle):
+    return [f"{ctx['base']}{API}/signalements/{i}" for i in ctx[cle]]
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("auth_health", "GET", f"{API}/auth/health", lambda ctx: {
+        "urls": [f"{ctx['base']}{API}/auth/health"]}),
+    Scenario("auth_login", "POST", f"{API}/auth/login", lambda ctx: {
+        "urls": [f"{ctx['base']}{API}/auth/login"],
+        "data": {"username": ctx["username"], "password": ctx["password"]}}),
+    Scenario("auth_me", "GET", f"{API}/auth/me", lambda ctx: {
+        "urls": [f"{ctx['base']}{API}/auth/me"], "headers": ctx["auth"]}),
+    Scenario("liste", "GET", f"{API}/signalements/", lambda ctx: {
+        "urls": [f"{ctx['base']}{API}/signalements/?limit=50"]}),
+    Scenario("liste_filtres", "GET", f"{API}/signalements/", lambda ctx: {
+        "urls": [
+            f"{ctx['base']}{API}/signalements/?limit=50&gravite={g.name}&date_debut={ctx['il_y_a_30j']}"
+            for g in GraviteEvenement
+        ]}),
+    Scenario("liste_total", "GET", f"{API}/signalements/", lambda ctx: {
+        "urls": [f"{ctx['base']}{API}/signalements/?limit=50&total=true&type_evenement={t.name}" for t in TypeEvenement]}),
+    Scenario("export_csv", "GET", f"{API}/signalements/export", lambda ctx: {
+        "urls": [f"{ctx['base']}{API}/signalements/export?format=csv&date_debut={ctx['hier']}"]}),
+    Scenario("statistiques", "GET", f"{API}/signalements/statistiques", lambda ctx: {
+        "urls": [f"{ctx['base']}{API}/signalements/statistiques"]}),
+    Scenario("timeseries", "GET", f"{API}/signalements/timeseries", lambda ctx: {
+        "urls": [
+            f"{ctx['base']}{API}/signalements/timeseries?bucket=day&group_by=gravite",
+            f"{ctx['base']}{API}/signalements/timeseries?bucket=week&from={ctx['il_y_a_1an']}",
+            f"{ctx['base']}{API}/signalements/timeseries?bucket=hour&group_by=type_evenement",
+        ]}),
+    Scenario("geo_bbox", "GET", f"{API}/signalements/geo/bbox", lambda ctx: {
+        "urls": [f"{ctx['base']}{API}/signalements/geo/bbox?min_lat=11.50&min_lon=43.05&max_lat=11.62&max_lon=43.20&limit=2000"]}),
+    Scenario("geo_near", "GET", f"{API}/signalements/geo/near", lambda ctx: {
+        "urls": [f"{ctx['base']}{API}/signalements/geo/near?lat=11.5886&lon=43.1450&radius_m=2000&limit=200"]}),
+    Scenario("geo_clusters", "GET", f"{API}/signalements/geo/clusters", lambda ctx: {
+        "urls": [
+            f"{ctx['base']}{API}/signalements/geo/clusters?min_lat=10.9&min_lon=41.7&max_lat=12.8&max_lon=43.5",
+            f"{ctx['base']}{API}/signalements/geo/clusters?min_lat=11.50&min_lon=43.05&max_lat=11.62&max_lon=43.20",
+        ]}),
+    Scenario("recent", "GET", f"{API}/signalements/recent", lambda ctx: {
+        "urls": [f"{ctx['base']}{API}/signalements/recent?days=7&limit=20"]}),
+    Scenario("search", "GET", f"{API}/signalements/search", lambda ctx: {
+        "urls": [f"{ctx['base']}{API}/signalements/search?q={q}&limit=50" for q in ("Balbala", "Dikhil", "numéro 42")]}),
+    Scenario("agent", "GET", f"{API}/signalements/agent/{{id_agent}}", lambda ctx: {
+        "urls": [f"{ctx['base']}{API}/signalements/agent/AG{n:05d}?limit=100" for n in range(0, 50, 7)]}),
+    Scenario("detail", "GET", f"{API}/signalements/{{signalement_id}}", lambda ctx: {
+        "urls": _ids(ctx, "ids_lecture")}),
+    Scenario("creation", "POST", f"{API}/signalements/", lambda ctx: {
+        "urls": [f"{ctx['base']}{API}/signalements/"], "json_body": signalement(0)}),
+    Scenario("creation_bulk", "POST", f"{API}/signalements/bulk", lambda ctx: {
+        "urls": [f"{ctx['base']}{API}/signalements/bulk"], "json_body": [signalement(i) for i in range(100)]}),
+    Scenario("modification_put", "PUT", f"{API}/signalements/{{signalement_id}}", lambda ctx: {
+        "urls": _ids(ctx, "ids_ecriture"), "json_body": {"lieu": "Boulaos"}}),
+    Scenario("modification_patch", "PATCH", f"{API}/signalements/{{signalement_id}}", lambda ctx: {
+        "urls": _ids(ctx, "ids_ecriture"), "json_body": {"gravite": GraviteEvenement.ELEVEE.value}}),
+    Scenario("suppression", "DELETE", f"{API}/signalements/{{signalement_id}}", lambda ctx: {
+        "urls": _ids(ctx, "ids_ecriture"), "once": True}),
+]
+
+
+def scrape_db_queries(base_url: str) -> Dict[tuple, tuple]:
+    """(méthode, route) -> (somme, nombre) de l'histogramme http_request_db_queries"""
+    series: Dict[tuple, list] = {}
+    contenu = httpx.get(f"{base_url}/metrics", timeout=10.0).text
+    for ligne in contenu.splitlines():
+        match = _SERIE.match(ligne)
+        if not match or match["nom"] not in ("http_request_db_queries_sum", "http_request_db_queries_count"):
+            continue
+        labels = dict(_LABEL.findall(match["labels"]))
+        cle = (labels.get("method"), labels.get("route"))
+        valeurs = series.setdefault(cle, [0.0, 0.0])
+        valeurs[0 if match["nom"].endswith("_sum") else 1] = float(match["valeur"])
+    return {cle: tuple(valeurs) for cle, valeurs in series.items()}
+
+
+def queries_per_request(avant: dict, apres: dict, method: str, route: str) -> Optional[float]:
+    somme_avant, nombre_avant = avant.get((method, route), (0.0, 0.0))
+    somme_apres, nombre_apres = apres.get((method, route), (0.0, 0.0))
+    if nombre_apres <= nombre_avant:
+        return None  # /metrics servi par un autre worker
+    return round((somme_apres - somme_avant) / (nombre_apres - nombre_avant), 2)
+
+
+def bench_ids(limit: int) -> List[int]:
+    with engine.connect() as conn:
+        return list(conn.execute(
+            text("SELECT id FROM signalements WHERE id_agent = :agent ORDER BY id LIMIT :limit"),
+            {"agent": ID_AGENT, "limit": limit},
+        ).scalars())
+
+
+def prepare(base_url: str, username: str, password: str) -> dict:
+    connexion = httpx.post(
+        f"{base_url}{API}/auth/login", data={"username": username, "password": password}, timeout=30.0
+    )
+    connexion.raise_for_status()
+    lecture = httpx.get(f"{base_url}{API}/signalements/?limit=200", timeout=30.0).json()
+    statistiques = httpx.get(f"{base_url}{API}/signalements/statistiques", timeout=30.0).json()
+    return {
+        "base": base_url,
+        "username": username,
+        "password": password,
+        "auth": {"Authorization": f"Bearer {connexion.json()['access_token']}"},
+        "ids_lecture": [s["id"] for s in lecture] or [1],
+        "ids_ecriture": [],
+        "hier": (date.today() - timedelta(days=1)).isoformat(),
+        "il_y_a_30j": (date.today() - timedelta(days=30)).isoformat(),
+        "il_y_a_1an": (date.today() - timedelta(days=365)).isoformat(),
+        "total": statistiques.get("total"),
+    }
+
+
+def run_scenario(scenario: Scenario, ctx: dict, concurrency: int, duration: float) -> dict:
+    if scenario.method in ("PUT", "PATCH", "DELETE"):
+        ctx["ids_ecriture"] = bench_ids(100_000)
+        if not ctx["ids_ecriture"]:
+            return {"skipped": "aucun signalement BENCH_SUITE (lancer les scénarios de création)"}
+    avant = scrape_db_queries(ctx["base"])
+    resultat = asyncio.run(run_load(concurrency=concurrency, duration=duration, method=scenario.method, **scenario.build(ctx)))
+    apres = scrape_db_queries(ctx["base"])
+    resultat["queries_per_request"] = queries_per_request(avant, apres, scenario.method, scenario.route)
+    return resultat
+
+
+def cleanup(ctx: dict, concurrency: int) -> int:
+    """Supprime par l'API (rollup et cache à jour) les signalements créés par la suite"""
+    supprimes = 0
+    while True:
+        ids = bench_ids(10_000)
+        if not ids:
+            return supprimes
+        ctx["ids_ecriture"] = ids
+        resultat = asyncio.run(run_load(_ids(ctx, "ids_ecriture"), concurrency, 3600, method="DELETE", once=True))
+        if resultat["errors"] == resultat["requests"]:
+            return supprimes  # aucune suppression possible : on n'insiste pas
+        supprimes += resultat["requests"] - resultat["errors"]
+
+
+def compare(resultats: dict, reference: dict, seuil: float) -> List[str]:
+    """Régressions par rapport à un résultat précédent"""
+    regressions = []
+    for nom, actuel in resultats.items():
+        ancien = reference.get(nom)
+        if not ancien or "rps" not in ancien or "rps" not in actuel:
+            continue
+        if ancien["rps"] and actuel["rps"] < ancien["rps"] * (1 - seuil):
+            regressions.append(f"{nom}: débit {ancien['rps']} -> {actuel['rps']} req/s")
+        if ancien.get("p95_ms") and actuel.get("p95_ms", 0) > ancien["p95_ms"] * (1 + seuil):
+            regressions.append(f"{nom}: p95 {ancien['p95_ms']} -> {actuel['p95_ms']} ms")
+        if (
+            ancien.get("queries_per_request") is not None
+            and actuel.get("queries_per_request") is not None
+            and actuel["queries_per_request"] > ancien["queries_per_request"]
+        ):
+            regressions.append(
+                f"{nom}: requêtes SQL {ancien['queries_per_request']} -> {actuel['queries_per_request']} par requête"
+            )
+    return regressions
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--seed-rows", type=int, default=0, help="Peupler la base avant (100 000 à 10 000 000)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--only", default="", help="Scénarios à lancer, séparés par des virgules")
+    parser.add_argument("--username", default="user")
+    parser.add_argument("--password", default="user123")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args()
+
+    if args.seed_rows:
+        debut = time.perf_counter()
+        seed(args.seed_rows, truncate=True)
+        print(f"✅ {args.seed_rows} signalements insérés en {time.perf_counter() - debut:.1f}s")
+
+    choisis = set(filter(None, args.only.split(",")))
+    ctx = prepare(args.base_url, args.username, args.password)
+    resultats = {}
+    try:
+        for scenario in SCENARIOS:
+            if choisis and scenario.name not in choisis:
+                continue
+            resultat = run_scenario(scenario, ctx, args.concurrency, args.duration)
+            resultats[scenario.name] = resultat
+            if "skipped" in resultat:
+                print(f"⏭️  {scenario.name:<20} {resultat['skipped']}")
+                continue
+            print(
+                f"{scenario.name:<22} {resultat['rps']:>9.1f} req/s  p50 {resultat.get('p50_ms', 0):>8.2f}  "
+                f"p95 {resultat.get('p95_ms', 0):>8.2f}  p99 {resultat.get('p99_ms', 0):>8.2f} ms  "
+                f"SQL/req {resultat['queries_per_request']}  erreurs {resultat['errors']}"
+            )
+    finally:
+        nettoyes = cleanup(ctx, args.concurrency)
+
+    rapport = {
+        "meta": {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": git_revision(),
+            "base_url": args.base_url,
+            "rows": ctx["total"],
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "cleaned_up": nettoyes,
+        },
+        "results": resultats,
+    }
+    with open(args.output, "w") as fichier:
+        json.dump(rapport, fichier, indent=2, ensure_ascii=False)
+    print(f"Résultats écrits dans {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as fichier:
+            reference = json.load(fichier)["results"]
+        regressions = compare(resultats, reference, args.threshold)
+        for regression in regressions:
+            print(f"❌ {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ Aucune régression au-delà de {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
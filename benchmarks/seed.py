@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Génère un jeu de signalements synthétiques pour les benchmarks.
+
+Les lignes sont produites côté serveur avec generate_series, ce qui permet
+d'insérer plusieurs millions de lignes en quelques secondes.
+
+Les valeurs de TypeEvenement, GraviteEvenement, SourceInformation et
+ActionEntreprise sont toutes représentées, avec des fréquences inégales.
+Prévu pour 100 000 à 10 000 000 de lignes.
+
+Usage : python -m benchmarks.seed --rows 1000000 [--days 730] [--truncate]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.database import engine, SessionLocal
+from app.services.crud import crud_signalement
+from app.services.geocoding import geocode_existing
+
+
+# Distribution inspirée du terrain, chaque colonne tirée indépendamment :
+# beaucoup de publications sur les réseaux et de faible gravité, quelques
+# sources et actions « Autre » (avec leur précision), et des agents dont
+# l'activité suit une loi de puissance (quelques agents très actifs).
+SEED_SQL = """
+INSERT INTO signalements (
+    date_signalement, heure_signalement, nom_agent, id_agent,
+    type_evenement, gravite, lieu, source_information, source_autre,
+    action_entreprise, action_autre, commentaire_complementaire,
+    created_at, updated_at
+)
+SELECT
+    d::date,
+    d::time,
+    'Agent ' || agent,
+    'AG' || lpad(agent::text, 5, '0'),
+    CASE WHEN r_type < 0.40 THEN 'PUBLICATION_RESEAUX'
+         WHEN r_type < 0.70 THEN 'REUNION_QUARTIER'
+         WHEN r_type < 0.92 THEN 'RASSEMBLEMENT_PUBLIC'
+         ELSE 'AUTRE' END::typeevenement,
+    CASE WHEN r_gravite < 0.55 THEN 'FAIBLE'
+         WHEN r_gravite < 0.88 THEN 'MOYENNE'
+         ELSE 'ELEVEE' END::graviteevenement,
+    (ARRAY['Balbala', 'Boulaos', 'Ras Dika', 'Arta', 'Ali Sabieh', 'Dikhil', 'Tadjourah', 'Obock', 'PK12', 'Quartier 7'])[1 + floor(r_lieu * r_lieu * 10)::int],
+    source::sourceinformation,
+    CASE WHEN source = 'AUTRE' THEN 'Autre source' END,
+    action::actionentreprise,
+    CASE WHEN action = 'AUTRE' THEN 'Autre action' END,
+    CASE WHEN g % 3 = 0 THEN NULL ELSE 'Commentaire synthétique numéro ' || g END,
+    d,
+    d
+FROM (
+    SELECT
+        g,
+        now() - (random() * :days * interval '1 day') AS d,
+        floor(:agents * power(random(), 2))::int AS agent,
+        random() AS r_type,
+        random() AS r_gravite,
+        random() AS r_lieu,
+        CASE WHEN r_source < 0.45 THEN 'OBSERVATION_DIRECTE'
+             WHEN r_source < 0.70 THEN 'RESEAUX_SOCIAUX'
+             WHEN r_source < 0.93 THEN 'INFORMATEUR'
+             ELSE 'AUTRE' END AS source,
+        CASE WHEN r_action < 0.60 THEN 'OBSERVATION'
+             WHEN r_action < 0.85 THEN 'ALERTE_TRANSMISE'
+             WHEN r_action < 0.95 THEN 'INTERVENTION'
+             ELSE 'AUTRE' END AS action
+    FROM (
+        SELECT g, random() AS r_source, random() AS r_action
+        FROM generate_series(1, :rows) AS g
+    ) AS tirages
+) AS src
+"""
+
+
+def seed(rows: int, days: int = 730, agents: int = 500, truncate: bool = False, batch: int = 500_000):
+    """Insère `rows` signalements répartis sur les `days` derniers jours"""
+    with engine.begin() as conn:
+        if truncate:
+            conn.execute(text("TRUNCATE signalements RESTART IDENTITY"))
+
+    restant = rows
+    while restant > 0:
+        n = min(batch, restant)
+        with engine.begin() as conn:
+            conn.execute(text(SEED_SQL), {"rows": n, "days": days, "agents": agents})
+        restant -= n
+
+    # Insertion hors API : rollup des statistiques et positions recalculés
+    db = SessionLocal()
+    try:
+        crud_signalement.rebuild_daily_stats(db)
+        geocode_existing(db)
+    finally:
+        db.close()
+
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE signalements"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--agents", type=int, default=500)
+    parser.add_argument("--truncate", action="store_true", help="Vider la table avant insertion")
+    args = parser.parse_args()
+
+    debut = time.perf_counter()
+    seed(args.rows, days=args.days, agents=args.agents, truncate=args.truncate)
+    print(f"✅ {args.rows} signalements insérés en {time.perf_counter() - debut:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
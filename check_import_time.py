@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Vérifie le coût d'import de l'application (démarrage à froid d'un worker).
+
+Lance `python -X importtime -c "import app.main"` dans un processus neuf,
+additionne les temps cumulés des modules de premier niveau et échoue si le
+total dépasse le budget. Vérifie aussi que l'import est sans effet de bord :
+aucun engine SQLAlchemy n'est créé et rien n'est écrit sur la sortie
+standard.
+
+Usage : python check_import_time.py [--budget-ms 1500] [--top 15]
+        (code de sortie 1 en cas d'échec)
+"""
+
+import argparse
+import subprocess
+import sys
+
+MODULE = "app.main"
+
+# Exécuté dans le processus fils après l'import
+SONDE = (
+    f"import {MODULE}, app.database as d; "
+    "import sys; sys.exit(3 if d._engine is not None or d._async_engine is not None else 0)"
+)
+
+
+def parse_importtime(stderr: str):
+    """Lignes `import time: self | cumulative | module` -> [(module, self_us, cumul_us, niveau)]"""
+    modules = []
+    for ligne in stderr.splitlines():
+        if not ligne.startswith("import time:") or "self [us]" in ligne:
+            continue
+        self_us, cumul_us, nom = ligne[len("import time:"):].split("|", 2)
+        niveau = (len(nom) - len(nom.lstrip())) // 2
+        modules.append((nom.strip(), int(self_us), int(cumul_us), niveau))
+    return modules
+
+
+def check_import_time(budget_ms: float, top: int) -> bool:
+    resultat = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SONDE],
+        capture_output=True,
+        text=True,
+    )
+    modules = parse_importtime(resultat.stderr)
+    if resultat.returncode not in (0, 3) or not modules:
+        print(f"❌ Import de {MODULE} impossible :\n{resultat.stderr[-2000:]}")
+        return False
+
+    # Les modules de niveau 0 (indentation minimale) ne se recouvrent pas
+    niveau_min = min(niveau for *_, niveau in modules)
+    total_ms = sum(cumul for _, _, cumul, niveau in modules if niveau == niveau_min) / 1000
+
+    print("Modules les plus coûteux (temps cumulé) :")
+    for nom, self_us, cumul_us, _ in sorted(modules, key=lambda m: m[2], reverse=True)[:top]:
+        print(f"  {cumul_us / 1000:8.1f} ms  (propre {self_us / 1000:6.1f} ms)  {nom}")
+
+    succes = total_ms <= budget_ms
+    statut = "✅" if succes else "❌"
+    print(f"{statut} Import de {MODULE} : {total_ms:.0f} ms (budget {budget_ms:.0f} ms)")
+
+    if resultat.returncode == 3:
+        succes = False
+        print("❌ Un engine SQLAlchemy est créé à l'import (attendu : au premier usage)")
+    else:
+        print("✅ Aucun engine créé à l'import")
+
+    if resultat.stdout.strip():
+        succes = False
+        print(f"❌ L'import écrit sur la sortie standard :\n{resultat.stdout.strip()[:500]}")
+    else:
+        print("✅ Aucune sortie à l'import")
+    return succes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    sys.exit(0 if check_import_time(args.budget_ms, args.top) else 1)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Vérifie, avec EXPLAIN, que chaque endpoint de l'API des signalements
+utilise un index au lieu d'un parcours séquentiel de la table.
+
+Chaque scénario appelle la méthode CRUD utilisée par l'endpoint, capture
+les requêtes SQL réellement émises puis les passe à EXPLAIN (FORMAT JSON).
+Pour la table partitionnée, le nombre de partitions effectivement lues
+est affiché afin de vérifier l'élagage (partition pruning) des requêtes
+bornées par date.
+
+À lancer sur une base peuplée (`python -m benchmarks.seed --rows 1000000`),
+sinon le planificateur préfère légitimement un Seq Scan sur une petite table.
+
+Usage : python check_indexes.py   (code de sortie 1 en cas d'échec)
+"""
+
+import json
+import sys
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import event
+
+from app.database import engine, SessionLocal
+from app.services.crud import crud_signalement
+from app.services.partitions import list_partitions
+
+TABLE = "signalements"
+
+
+def _est_signalements(relation: str) -> bool:
+    """La table signalements ou l'une de ses partitions"""
+    return relation == TABLE or relation.startswith(TABLE + "_p") or relation == TABLE + "_default"
+
+
+def _scenarios(aujourdhui: date):
+    """(nom, appel CRUD, seq scan toléré) pour chaque chemin de l'API"""
+    il_y_a_7_jours = aujourdhui - timedelta(days=7)
+    return [
+        ("GET / (sans filtre)", lambda db: crud_signalement.get_signalements(db, limit=100), False),
+        ("GET / ?cursor", lambda db: crud_signalement.get_signalements(db, cursor=(datetime.now() - timedelta(days=30), 0)), False),
+        ("GET / ?type_evenement", lambda db: crud_signalement.get_signalements(db, type_evenement="AUTRE"), False),
+        ("GET / ?gravite", lambda db: crud_signalement.get_signalements(db, gravite="ELEVEE"), False),
+        ("GET / ?source_information", lambda db: crud_signalement.get_signalements(db, source_information="INFORMATEUR"), False),
+        ("GET / ?date_debut&date_fin", lambda db: crud_signalement.get_signalements(db, date_debut=il_y_a_7_jours, date_fin=aujourdhui), False),
+        ("GET / ?gravite&date_debut", lambda db: crud_signalement.get_signalements(db, gravite="ELEVEE", date_debut=il_y_a_7_jours), False),
+        # Sans filtre, compter toute la table impose un parcours complet
+        ("GET / count (sans filtre)", lambda db: crud_signalement.count_signalements(db), True),
+        ("GET / count ?type_evenement&date_debut", lambda db: crud_signalement.count_signalements(db, type_evenement="AUTRE", date_debut=il_y_a_7_jours), False),
+        ("GET / count ?gravite", lambda db: crud_signalement.count_signalements(db, gravite="ELEVEE"), False),
+        ("GET /recent", lambda db: crud_signalement.get_recent_signalements(db, days=7), False),
+        ("GET /agent/{id_agent}", lambda db: crud_signalement.get_signalements_by_agent(db, id_agent="AG00042"), False),
+        ("GET /{id}", lambda db: crud_signalement.get_signalement(db, 1), False),
+        # Les statistiques lisent le rollup journalier, pas signalements
+        ("GET /statistiques", lambda db: crud_signalement.get_signalements_stats(db), False),
+        ("GET /search", lambda db: crud_signalement.search_signalements(db, "balbala"), False),
+        ("GET /search (approché)", lambda db: crud_signalement.search_signalements(db, "balbla"), False),
+    ]
+
+
+def _noeuds(plan):
+    yield plan
+    for enfant in plan.get("Plans", []):
+        yield from _noeuds(enfant)
+
+
+def _capturer(fn, db):
+    """Exécute fn(db) et retourne les requêtes SELECT émises"""
+    requetes = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            requetes.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        fn(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+    return requetes
+
+
+def _expliquer(db, statement, parameters):
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        plan = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def check_indexes() -> bool:
+    db = SessionLocal()
+    succes = True
+    try:
+        total_partitions = len(list_partitions(db))
+        for nom, appel, seq_scan_tolere in _scenarios(date.today()):
+            for statement, parameters in _capturer(appel, db):
+                plan = _expliquer(db, statement, parameters)
+                parcours = [
+                    f"{n['Node Type']}({n.get('Index Name', n.get('Relation Name'))})"
+                    for n in _noeuds(plan)
+                    if _est_signalements(n.get("Relation Name", "")) or "Index Name" in n
+                ]
+                seq_scans = [
+                    n for n in _noeuds(plan)
+                    if n["Node Type"] == "Seq Scan" and _est_signalements(n.get("Relation Name", ""))
+                ]
+                partitions = {
+                    n["Relation Name"] for n in _noeuds(plan)
+                    if _est_signalements(n.get("Relation Name", "")) and n["Relation Name"] != TABLE
+                }
+                if seq_scans and not seq_scan_tolere:
+                    succes = False
+                    statut = "❌"
+                elif seq_scans:
+                    statut = "⚠️ "
+                else:
+                    statut = "✅"
+                elagage = f" [{len(partitions)}/{total_partitions} partitions]" if total_partitions else ""
+                print(f"{statut} {nom}{elagage}: {', '.join(parcours) or plan['Node Type']}")
+    finally:
+        db.close()
+    return succes
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_indexes() else 1)
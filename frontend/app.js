@@ -1,6 +1,21 @@
 // Configuration API
 const API_BASE = 'http://localhost:8000/api/v1';
 
+// Lecture de ses propres écritures : après une écriture, l'API renvoie
+// X-Read-After (horodatage Unix) ; jusque-là, les lectures le renvoient pour
+// être servies par le serveur principal et non par un réplica en retard.
+// Conservé dans localStorage pour être partagé avec le tableau de bord.
+function memoriserEcriture(response) {
+    const jeton = response.headers.get('X-Read-After');
+    if (jeton) localStorage.setItem('readAfter', jeton);
+}
+
+function entetesLecture(headers = {}) {
+    const jeton = localStorage.getItem('readAfter');
+    if (jeton && Number(jeton) * 1000 > Date.now()) headers['X-Read-After'] = jeton;
+    return headers;
+}
+
 // État de l'application
 let currentUser = null;
 let signalements = [];
@@ -259,6 +274,7 @@ async function handleAgentReport(e) {
         });
         
         console.log('📡 STATUT:', response.status);
+        memoriserEcriture(response);
         
         if (response.ok) {
             const result = await response.json();
@@ -342,6 +358,7 @@ async function handleAdminReport(e) {
         });
         
         console.log('📡 ADMIN STATUT:', response.status);
+        memoriserEcriture(response);
         
         if (response.ok) {
             const result = await response.json();
@@ -393,9 +410,9 @@ async function chargerStatistiques() {
     try {
         const token = localStorage.getItem('token');
         const response = await fetch(`${API_BASE}/signalements/statistiques`, {
-            headers: {
+            headers: entetesLecture({
                 'Authorization': `Bearer ${token}`
-            }
+            })
         });
         
         if (!response.ok) {
@@ -435,9 +452,9 @@ async function chargerSignalements() {
 
         const token = localStorage.getItem('token');
         const response = await fetch(`${API_BASE}/signalements/?${params}`, {
-            headers: {
+            headers: entetesLecture({
                 'Authorization': `Bearer ${token}`
-            }
+            })
         });
         
         if (!response.ok) {
@@ -494,9 +511,9 @@ async function afficherDetails(id) {
     try {
         const token = localStorage.getItem('token');
         const response = await fetch(`${API_BASE}/signalements/${id}`, {
-            headers: {
+            headers: entetesLecture({
                 'Authorization': `Bearer ${token}`
-            }
+            })
         });
         
         if (!response.ok) {
@@ -1,6 +1,13 @@
 // Configuration API
 const API_BASE = 'http://localhost:8000/api/v1';
 
+// Jeton X-Read-After mémorisé par le formulaire après une écriture : tant
+// qu'il n'a pas expiré, les lectures sont servies par le serveur principal
+function entetesLecture() {
+    const jeton = localStorage.getItem('readAfter');
+    return jeton && Number(jeton) * 1000 > Date.now() ? { 'X-Read-After': jeton } : {};
+}
+
 // État de l'application
 let signalements = [];
 let currentPage = 1;
@@ -26,24 +33,46 @@ const graviteLabels = {
     'ELEVEE': 'Élevée'
 };
 
+// Valeurs renvoyées par l'API (et le flux temps réel) pour chaque code des filtres
+const typeValeurs = {
+    'REUNION_QUARTIER': 'Réunion de quartier',
+    'PUBLICATION_RESEAUX': 'Publication sur les réseaux',
+    'RASSEMBLEMENT_PUBLIC': 'Rassemblement public',
+    'AUTRE': 'Autre'
+};
+const graviteValeurs = { 'FAIBLE': 'Faible', 'MOYENNE': 'Moyenne', 'ELEVEE': 'Élevée' };
+
+// Compteurs affichés, tenus à jour par les deltas du flux temps réel
+let compteurs = { total: 0, elevee: 0, semaine: 0, aujourdhui: 0 };
+
 // =====================================
 // Chargement des données
 // =====================================
 
 async function chargerStatistiques() {
     try {
-        const response = await fetch(`${API_BASE}/signalements/statistiques`);
+        const response = await fetch(`${API_BASE}/signalements/statistiques`, { headers: entetesLecture() });
         const stats = await response.json();
         
-        document.getElementById('statTotal').textContent = stats.total || 0;
-        document.getElementById('statElevee').textContent = stats.par_gravite?.ELEVEE || 0;
-        document.getElementById('statSemaine').textContent = stats.cette_semaine || 0;
-        document.getElementById('statAujourdhui').textContent = stats.aujourdhui || 0;
+        compteurs = {
+            total: stats.total || 0,
+            elevee: stats.par_gravite?.[graviteValeurs.ELEVEE] || stats.par_gravite?.ELEVEE || 0,
+            semaine: stats.cette_semaine || 0,
+            aujourdhui: stats.aujourdhui || 0
+        };
+        afficherStatistiques();
     } catch (error) {
         console.error('Erreur chargement stats:', error);
     }
 }
 
+function afficherStatistiques() {
+    document.getElementById('statTotal').textContent = compteurs.total;
+    document.getElementById('statElevee').textContent = compteurs.elevee;
+    document.getElementById('statSemaine').textContent = compteurs.semaine;
+    document.getElementById('statAujourdhui').textContent = compteurs.aujourdhui;
+}
+
 async function chargerSignalements() {
     try {
         document.getElementById('loadingState').style.display = 'block';
@@ -61,7 +90,7 @@ async function chargerSignalements() {
         if (filtres.date_debut) params.append('date_debut', filtres.date_debut);
         if (filtres.date_fin) params.append('date_fin', filtres.date_fin);
 
-        const response = await fetch(`${API_BASE}/signalements/?${params}`);
+        const response = await fetch(`${API_BASE}/signalements/?${params}`, { headers: entetesLecture() });
         signalements = await response.json();
 
         document.getElementById('loadingState').style.display = 'none';
@@ -111,7 +140,7 @@ function afficherSignalements() {
 
 async function afficherDetails(id) {
     try {
-        const response = await fetch(`${API_BASE}/signalements/${id}`);
+        const response = await fetch(`${API_BASE}/signalements/${id}`, { headers: entetesLecture() });
         const sig = await response.json();
 
         document.getElementById('modalId').textContent = sig.id;
@@ -229,6 +258,135 @@ document.getElementById('detailModal').addEventListener('click', (e) => {
     }
 });
 
+// =====================================
+// Mises à jour en temps réel
+// =====================================
+
+let rafraichissementPrevu = null;
+let listePrevue = null;
+let pollingInterval = null;
+
+function planifierRafraichissement() {
+    // Rechargement complet (resync) : regroupe les demandes rapprochées
+    if (rafraichissementPrevu) return;
+    rafraichissementPrevu = setTimeout(() => {
+        rafraichissementPrevu = null;
+        chargerStatistiques();
+        chargerSignalements();
+    }, 1000);
+}
+
+function planifierListe() {
+    if (listePrevue || rafraichissementPrevu) return;
+    listePrevue = setTimeout(() => {
+        listePrevue = null;
+        chargerSignalements();
+    }, 1000);
+}
+
+function dateLocale(decalageJours = 0) {
+    const d = new Date();
+    d.setDate(d.getDate() - decalageJours);
+    const mois = String(d.getMonth() + 1).padStart(2, '0');
+    const jour = String(d.getDate()).padStart(2, '0');
+    return `${d.getFullYear()}-${mois}-${jour}`;
+}
+
+function appliquerDeltas(deltas) {
+    // [date, type, gravité, source, delta] : mêmes règles que /statistiques
+    const aujourdhui = dateLocale();
+    const semaine = dateLocale(7);
+    for (const [dateSignalement, , gravite, , delta] of deltas) {
+        compteurs.total += delta;
+        if (gravite === graviteValeurs.ELEVEE) compteurs.elevee += delta;
+        if (dateSignalement >= semaine) compteurs.semaine += delta;
+        if (dateSignalement === aujourdhui) compteurs.aujourdhui += delta;
+    }
+    afficherStatistiques();
+}
+
+function correspondAuxFiltres(sig) {
+    if (filtres.type_evenement && sig.type_evenement !== typeValeurs[filtres.type_evenement]
+        && sig.type_evenement !== filtres.type_evenement) return false;
+    if (filtres.gravite && sig.gravite !== graviteValeurs[filtres.gravite]
+        && sig.gravite !== filtres.gravite) return false;
+    if (filtres.date_debut && sig.date_signalement < filtres.date_debut) return false;
+    if (filtres.date_fin && sig.date_signalement > filtres.date_fin) return false;
+    return true;
+}
+
+function appliquerEvenement(message) {
+    const evenement = JSON.parse(message.data);
+    // Événement trop volumineux, abonné en retard ou reconnexion : tout recharger
+    if (evenement.resync) {
+        planifierRafraichissement();
+        return;
+    }
+    if (evenement.stats_delta) appliquerDeltas(evenement.stats_delta);
+
+    const sig = evenement.signalement;
+    const index = sig ? signalements.findIndex(s => s.id === sig.id) : -1;
+    if (evenement.action === 'created') {
+        // Seule la première page (plus récents d'abord) reçoit les créations
+        if (currentPage !== 1 || !correspondAuxFiltres(sig)) return;
+        signalements = [sig, ...signalements].slice(0, itemsPerPage);
+    } else if (evenement.action === 'updated') {
+        if (index === -1) return;
+        if (correspondAuxFiltres(sig)) {
+            signalements[index] = { ...signalements[index], ...sig };
+        } else {
+            signalements.splice(index, 1);
+        }
+    } else if (evenement.action === 'deleted') {
+        const avant = signalements.length;
+        signalements = signalements.filter(s => !evenement.ids.includes(s.id));
+        if (signalements.length === avant) return;
+    } else if (evenement.action === 'bulk_created') {
+        // Le lot ne transporte que des ids : seule la liste est relue
+        if (currentPage === 1) planifierListe();
+        return;
+    } else {
+        return;
+    }
+    if (signalements.length === 0) {
+        chargerSignalements();
+    } else {
+        document.getElementById('emptyState').style.display = 'none';
+        afficherSignalements();
+    }
+}
+
+function demarrerPolling() {
+    if (pollingInterval) return;
+    // Rafraîchir toutes les 60 secondes tant que le flux est indisponible
+    pollingInterval = setInterval(() => {
+        chargerStatistiques();
+        chargerSignalements();
+    }, 60000);
+}
+
+function arreterPolling() {
+    if (!pollingInterval) return;
+    clearInterval(pollingInterval);
+    pollingInterval = null;
+    // Des événements ont pu être manqués pendant la coupure
+    planifierRafraichissement();
+}
+
+function ecouterFlux() {
+    if (!window.EventSource) {
+        demarrerPolling();
+        return;
+    }
+    const source = new EventSource(`${API_BASE}/signalements/stream`);
+    source.addEventListener('ready', arreterPolling);
+    source.addEventListener('signalement', appliquerEvenement);
+    source.onerror = () => {
+        // EventSource se reconnecte seul ; polling en attendant
+        demarrerPolling();
+    };
+}
+
 // =====================================
 // Initialisation
 // =====================================
@@ -238,9 +396,6 @@ document.addEventListener('DOMContentLoaded', () => {
     chargerStatistiques();
     chargerSignalements();
     
-    // Rafraîchir toutes les 60 secondes
-    setInterval(() => {
-        chargerStatistiques();
-        chargerSignalements();
-    }, 60000);
+    // Rafraîchir à chaque création / modification / suppression (SSE)
+    ecouterFlux();
 });
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Géocode les signalements existants (latitude, longitude, geohash) à partir
+de leur lieu et de la table gazetteer.
+
+À lancer après la migration qui ajoute ces colonnes, après un import en
+masse hors API, ou après un ajout au gazetteer (avec --all, les
+signalements déjà géocodés sont aussi recalculés).
+
+Usage : python geocode_signalements.py [--all]
+"""
+
+import argparse
+import sys
+import os
+import time
+
+# Ajouter le chemin du projet
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app.services.geocoding import geocode_existing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--all", action="store_true", help="Recalculer aussi les signalements déjà géocodés")
+    args = parser.parse_args()
+
+    print("🔧 Géocodage des signalements...")
+    db = SessionLocal()
+    try:
+        debut = time.perf_counter()
+        trouves, distincts, lignes = geocode_existing(db, tous=args.all)
+        print(f"   {trouves} lieux reconnus sur {distincts} lieux distincts")
+        print(f"✅ {lignes} signalements géocodés en {time.perf_counter() - debut:.1f}s")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erreur lors du géocodage : {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
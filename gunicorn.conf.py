@@ -0,0 +1,64 @@
+# =====================================
+# gunicorn.conf.py - Serveur de production multi-workers
+# =====================================
+#
+#   gunicorn -c gunicorn.conf.py app.main:app
+#
+# Un maître gunicorn précharge l'application puis forke WEB_CONCURRENCY
+# workers uvicorn (un par cœur par défaut). Chaque worker a ses propres
+# pools de connexions, sa connexion LISTEN et son cache mémoire.
+
+import logging
+import os
+
+from app.core.config import settings
+
+logger = logging.getLogger("gunicorn.error")
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}"
+workers = settings.workers
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# L'import de l'application est fait une fois dans le maître (copy-on-write) ;
+# il ne crée ni engine ni connexion (voir check_import_time.py)
+preload_app = True
+
+# Recyclage des workers (fuites mémoire, fragmentation) ; le décalage évite
+# que tous les workers redémarrent en même temps
+max_requests = settings.max_requests
+max_requests_jitter = settings.max_requests_jitter
+
+# Arrêt (SIGTERM) ou recyclage : plus de nouvelles connexions, les requêtes en
+# cours disposent de graceful_timeout secondes, puis l'événement shutdown
+# ferme l'écoute NOTIFY et les pools. Les clients SSE encore connectés sont
+# coupés à l'échéance et se reconnectent sur un autre worker.
+graceful_timeout = settings.graceful_timeout
+timeout = max(60, settings.graceful_timeout * 2)
+keepalive = int(os.getenv("KEEPALIVE", "5"))
+
+accesslog = "-" if settings.debug else None
+errorlog = "-"
+loglevel = settings.log_level.lower()
+
+
+def on_starting(server):
+    connexions = settings.db_pool_size + settings.db_max_overflow
+    if settings.token_cache_pubsub or settings.live_feed:
+        connexions += 1
+    logger.info(
+        "%d workers, jusqu'à %d connexions PostgreSQL par worker (%d au total)",
+        workers, connexions, workers * connexions,
+    )
+
+
+def post_fork(server, worker):
+    # Engine éventuellement créé dans le maître : pool neuf dans chaque worker
+    from app.database import reset_engines_after_fork
+
+    reset_engines_after_fork()
+
+
+def worker_exit(server, worker):
+    from app.database import dispose_engines
+
+    dispose_engines()
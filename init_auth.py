@@ -11,7 +11,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from sqlalchemy.orm import Session
-import bcrypt  # Utiliser bcrypt directement
+from app.core.security import get_password_hash
 from app.database import engine, Base, SessionLocal
 from app.models.models import User
 
@@ -29,13 +29,8 @@ def create_users_table():
 
 
 def hash_password(password: str) -> str:
-    """Hash un mot de passe avec bcrypt"""
-    # Convertir en bytes et hasher
-    password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    # Retourner en string
-    return hashed.decode('utf-8')
+    """Hash un mot de passe avec bcrypt (même coût que l'API)"""
+    return get_password_hash(password)
 
 
 def create_user(db: Session, username: str, password: str, role: str = "USER"):
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Maintenance des partitions mensuelles de la table signalements
+
+    python manage_partitions.py list
+    python manage_partitions.py ensure [--months-ahead 3]     (à planifier, ex. cron quotidien)
+    python manage_partitions.py detach 2024-01 [--archive-schema archive]
+"""
+
+import argparse
+import sys
+import os
+from datetime import datetime
+
+# Ajouter le chemin du projet
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+from app.database import SessionLocal
+from app.services.partitions import detach_partition, ensure_partitions, list_partitions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commandes = parser.add_subparsers(dest="commande", required=True)
+    commandes.add_parser("list", help="Lister les partitions")
+    ensure = commandes.add_parser("ensure", help="Créer les partitions des mois à venir")
+    ensure.add_argument("--months-ahead", type=int, default=settings.partition_months_ahead)
+    detach = commandes.add_parser("detach", help="Détacher (archiver) la partition d'un mois")
+    detach.add_argument("mois", help="Mois au format AAAA-MM")
+    detach.add_argument("--archive-schema", default=None)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.commande == "list":
+            for partition in list_partitions(db):
+                print(f"{partition['nom']:<28} {partition['lignes_estimees']:>12}  {partition['bornes']}")
+        elif args.commande == "ensure":
+            creees = ensure_partitions(db, months_ahead=args.months_ahead)
+            print(f"✅ {len(creees)} partition(s) créée(s) {', '.join(creees)}")
+        elif args.commande == "detach":
+            mois = datetime.strptime(args.mois, "%Y-%m").date()
+            nom = detach_partition(db, mois, archive_schema=args.archive_schema)
+            print(f"✅ Partition {nom} détachée")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erreur : {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Worker de l'outbox : exécute les traitements différés des écritures sur
+signalements (voir app/services/outbox.py).
+
+    python outbox_worker.py                  (boucle jusqu'à SIGTERM / Ctrl+C)
+    python outbox_worker.py --once           (vide la file disponible puis s'arrête)
+    python outbox_worker.py --stats          (taille de la file et dead letters)
+    python outbox_worker.py --requeue [ID ...]   (remet en file des dead letters)
+
+Plusieurs workers peuvent tourner en parallèle (SKIP LOCKED) : pour monter
+en charge, lancer davantage de processus, par exemple
+`docker compose up --scale outbox_worker=4`. Entre deux lots, le worker
+attend un NOTIFY sur le canal outbox_events, au plus OUTBOX_POLL_SECONDS
+(événements reportés, NOTIFY perdu pendant une coupure).
+"""
+
+import argparse
+import json
+import logging
+import os
+import select
+import signal
+import sys
+import time
+
+import psycopg2
+import psycopg2.extensions
+
+# Ajouter le chemin du projet
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+from app.core.logging_config import configure_logging
+from app.database import SessionLocal, dispose_engines
+from app.services.outbox import OUTBOX_CHANNEL, outbox_stats, process_batch, requeue_dead_letters
+
+logger = logging.getLogger("outbox_worker")
+
+
+class Reveil:
+    """
+    Connexion LISTEN outbox_events et pipe de réveil : attendre() rend la
+    main sur un NOTIFY, un signal d'arrêt ou à l'expiration du délai.
+    """
+
+    def __init__(self):
+        self.arret = False
+        # Sans connexion directe (PgBouncer), réveil par scrutation seulement
+        self._ecoute = settings.check_listen_url(logger)
+        self._lecture, self._ecriture = os.pipe()
+        os.set_blocking(self._ecriture, False)
+        self._conn = None
+
+    def arreter(self, signum=None, frame=None) -> None:
+        self.arret = True
+        try:
+            os.write(self._ecriture, b"x")
+        except BlockingIOError:
+            pass
+
+    def _connecter(self) -> None:
+        try:
+            conn = psycopg2.connect(
+                settings.listen_url, application_name="event_form_outbox_worker", connect_timeout=10
+            )
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            conn.cursor().execute(f"LISTEN {OUTBOX_CHANNEL}")
+            self._conn = conn
+        except psycopg2.Error as e:
+            logger.warning("LISTEN %s indisponible, attente par scrutation : %s", OUTBOX_CHANNEL, e)
+            self._conn = None
+
+    def attendre(self, timeout: float) -> None:
+        if self._conn is None and self._ecoute:
+            self._connecter()
+        sources = [self._lecture] + ([self._conn] if self._conn is not None else [])
+        pretes, _, _ = select.select(sources, [], [], timeout)
+        if self._conn is not None and self._conn in pretes:
+            try:
+                self._conn.poll()
+                self._conn.notifies.clear()
+            except psycopg2.Error:
+                self.fermer()
+
+    def fermer(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except psycopg2.Error:
+                pass
+            self._conn = None
+
+
+def boucle(batch_size: int, once: bool) -> None:
+    reveil = Reveil()
+    signal.signal(signal.SIGTERM, reveil.arreter)
+    signal.signal(signal.SIGINT, reveil.arreter)
+    logger.info("Worker outbox démarré (lots de %d, pid %d)", batch_size, os.getpid())
+    try:
+        while not reveil.arret:
+            db = SessionLocal()
+            try:
+                debut = time.perf_counter()
+                traites, reportes, abandonnes = process_batch(db, batch_size)
+            except Exception:
+                db.rollback()
+                logger.exception("Lot de l'outbox interrompu")
+                if once:
+                    raise
+                reveil.attendre(settings.outbox_poll_seconds)
+                continue
+            finally:
+                db.close()
+            total = traites + reportes + abandonnes
+            if total:
+                logger.info("Lot de %d événements en %.0f ms : %d traités, %d reportés, %d abandonnés",
+                            total, (time.perf_counter() - debut) * 1000, traites, reportes, abandonnes)
+            # Lot incomplet : la file disponible est vide, on attend un NOTIFY
+            if total < batch_size:
+                if once:
+                    break
+                reveil.attendre(settings.outbox_poll_seconds)
+    finally:
+        reveil.fermer()
+        dispose_engines()
+        logger.info("Worker outbox arrêté")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=settings.outbox_batch_size)
+    parser.add_argument("--once", action="store_true", help="S'arrêter quand la file disponible est vide")
+    parser.add_argument("--stats", action="store_true", help="Afficher l'état de la file et quitter")
+    parser.add_argument("--requeue", nargs="*", type=int, metavar="ID",
+                        help="Remettre en file les dead letters (toutes si aucun id)")
+    args = parser.parse_args()
+
+    if args.stats or args.requeue is not None:
+        db = SessionLocal()
+        try:
+            if args.requeue is not None:
+                print(f"✅ {requeue_dead_letters(db, args.requeue)} événements remis en file")
+            else:
+                print(json.dumps(outbox_stats(db), indent=2))
+        except Exception as e:
+            db.rollback()
+            print(f"❌ Erreur : {e}")
+            sys.exit(1)
+        finally:
+            db.close()
+        return
+
+    configure_logging()
+    boucle(args.batch_size, args.once)
+
+
+if __name__ == "__main__":
+    main()
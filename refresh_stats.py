@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Script pour reconstruire la table de rollup signalement_daily_stats
+
+À lancer après une migration de données, un import en masse hors API,
+ou périodiquement (cron) pour corriger toute dérive du rollup incrémental.
+"""
+
+import sys
+import os
+import time
+
+# Ajouter le chemin du projet
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app.services.crud import crud_signalement
+
+
+def main():
+    """Reconstruction complète du rollup"""
+    print("🔧 Reconstruction de signalement_daily_stats...")
+    db = SessionLocal()
+    try:
+        debut = time.perf_counter()
+        lignes = crud_signalement.rebuild_daily_stats(db)
+        print(f"✅ {lignes} lignes d'agrégat écrites en {time.perf_counter() - debut:.1f}s")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Erreur lors de la reconstruction : {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()